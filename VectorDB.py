@@ -1,77 +1,390 @@
 import os
-from langchain_community.embeddings import HuggingFaceEmbeddings
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+import numpy as np
 from langchain_community.vectorstores import Chroma
 from langchain_community.document_loaders import TextLoader
 from langchain_core.documents import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter  # 텍스트 청크화
+from embedding_service import EmbeddingService
+from vector_registry import SINGLE_COLLECTION_DIR
+from lexical_index import LexicalIndex, LEXICAL_DIR
+from numpy_index import NumpyVectorIndex, NUMPY_DIR, EMBEDDINGS_FILE, DTYPES
+from structure_chunker import StructureChunker
+from embedding_backends import (
+    embedding_config_from_env, create_base_embeddings, check_index_embedding,
+    index_embedding_info, write_index_embedding_info, EmbeddingMismatchError
+)
 
-# 📌 카테고리별 문서를 벡터화하여 각각의 ChromaDB에 저장
-def prepare_chroma_db_by_category(base_data_dir, persist_base_dir):
+# 📌 증분 빌드 상태 파일 (카테고리 벡터DB 디렉토리 안에 저장)
+MANIFEST_FILE = "index_manifest.json"
+
+# 📌 저장 방식
+# - per-category: 카테고리마다 별도 persist 디렉토리 (기존 방식)
+# - single: vectorDB/_all 하나의 컬렉션에 모두 저장, category 는 metadata 로 필터링
+LAYOUTS = ("per-category", "single")
+
+# 📌 벡터 인덱스 백엔드
+# - chroma: Chroma (SQLite + HNSW)
+# - numpy: vectorDB/_numpy/<카테고리>/ 의 memory-map .npy + docs.jsonl (정확한 top-k, per-category 전용)
+BACKENDS = ("chroma", "numpy")
+
+# 텍스트 청크 설정 (추천값 적용)
+CHUNK_SIZE = 800  # 한 청크의 최대 토큰 수
+CHUNK_OVERLAP = 300  # 청크 간 겹치는 토큰 수
+
+# 📌 청크 분할 방식
+# - recursive: RecursiveCharacterTextSplitter (위 글자 수 설정, 기존 방식)
+# - structure: 질문 제목/번호 항목/문단 경계로 나누고 토큰 수로 크기 제한 (겹침 대신 섹션 제목을 앞에 붙임)
+CHUNKERS = ("recursive", "structure")
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "400"))
+
+
+def create_text_splitter(chunker="recursive"):
+    """청크 분할기와 설정 (설정이 manifest 와 다르면 해당 카테고리는 다시 청크화)"""
+    if chunker == "structure":
+        splitter = StructureChunker(max_tokens=CHUNK_MAX_TOKENS)
+        return splitter, splitter.config
+    if chunker != "recursive":
+        raise ValueError(f"지원하지 않는 청크 분할 방식: {chunker}")
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    return splitter, {"type": "recursive", "chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP}
+
+
+def split_document(text_splitter, text):
+    """문서 → [(청크, 청크 metadata)] (structure 분할기만 섹션 정보를 metadata 로 남김)"""
+    if isinstance(text_splitter, StructureChunker):
+        return text_splitter.split_chunks(text)
+    return [(chunk, {}) for chunk in text_splitter.split_text(text)]
+
+
+def sha256_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(relative_source, chunk):
+    """청크 ID = 원본 파일 상대 경로 + 청크 내용 해시 (내용이 같으면 ID도 같음)"""
+    return sha256_text(f"{relative_source}\0{chunk}")
+
+
+def manifest_path_for(persist_base_dir, category, layout):
+    if layout == "single":
+        return os.path.join(persist_base_dir, SINGLE_COLLECTION_DIR, "manifests", f"{category}.json")
+    return os.path.join(persist_base_dir, category, MANIFEST_FILE)
+
+
+def load_manifest(manifest_path):
+    if not os.path.exists(manifest_path):
+        return {"files": {}}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest_path, manifest):
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+
+def create_embedding_model(workers=1):
+    """임베딩 모델 초기화 (main.py 와 같은 서비스 계층으로 배치 임베딩)"""
+    try:
+        import torch
+        # 프로세스 여러 개가 CPU 코어를 나눠 쓰도록 스레드 수 제한
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    except ImportError:
+        pass
+    return EmbeddingService(
+        create_base_embeddings(embedding_config_from_env()),
+        ingest_batch_size=int(os.getenv("EMBEDDING_INGEST_BATCH_SIZE", "64"))
+    )
+
+
+def collect_category_chunks(base_data_dir, category, manifest, existing_ids, text_splitter):
+    """
+    카테고리의 txt 파일을 청크로 나눠 (현재 청크 ID 집합, 새 청크 {ID: Document}, 파일 기록) 반환
+
+    파일 해시가 manifest 와 같고 그 청크가 모두 벡터DB에 있으면 청크 분할도 건너뜁니다.
+    """
+    category_path = os.path.join(base_data_dir, category)
+    current_ids = set()
+    new_chunks = {}
+    files = {}
+
+    # 해당 카테고리의 모든 txt 파일 로드
+    for file in sorted(os.listdir(category_path)):
+        file_path = os.path.join(category_path, file)
+        if not file.endswith(".txt"):
+            continue  # txt 파일만 처리
+
+        relative_source = os.path.relpath(file_path, base_data_dir)
+        try:
+            # 텍스트 로드
+            loader = TextLoader(file_path, encoding="utf-8")
+            document_text = loader.load()[0].page_content
+        except Exception as e:
+            print(f"❌ 파일 처리 중 오류 발생: {file_path} - {str(e)}")
+            continue
+
+        file_hash = sha256_text(document_text)
+        previous = manifest["files"].get(relative_source)
+        if previous and previous["sha256"] == file_hash and existing_ids.issuperset(previous["chunk_ids"]):
+            current_ids.update(previous["chunk_ids"])
+            files[relative_source] = previous
+            continue  # 변경 없는 파일
+
+        print(f"📄 문서 처리: {file_path}")
+        # 텍스트를 청크로 나누기
+        file_chunk_ids = []
+        for chunk, chunk_metadata in split_document(text_splitter, document_text):
+            doc_id = chunk_id(relative_source, chunk)
+            file_chunk_ids.append(doc_id)
+            current_ids.add(doc_id)
+            if doc_id not in existing_ids:
+                new_chunks[doc_id] = Document(
+                    page_content=chunk, metadata={"source": file_path, "category": category, **chunk_metadata}
+                )
+        files[relative_source] = {"sha256": file_hash, "chunk_ids": file_chunk_ids}
+
+    return current_ids, new_chunks, files
+
+
+def build_category_index(base_data_dir, persist_base_dir, category, full_rebuild=False, workers=1, layout="per-category",
+                         backend="chroma", dtype="float32", chunker="recursive"):
+    """
+    카테고리 하나를 증분 빌드
+
+    - 벡터DB에 이미 있는 청크 ID 는 건너뜀
+    - 원본에서 사라진 청크는 삭제
+    - 새 청크만 임베딩 후 추가 (새 청크가 없으면 임베딩 모델도 로드하지 않음)
+    - single 레이아웃이면 공용 컬렉션에서 이 카테고리 청크만 대상으로 함
     """
-    카테고리별로 문서를 벡터화하여 ChromaDB에 저장
+    if backend == "numpy":
+        return build_numpy_category_index(base_data_dir, persist_base_dir, category, full_rebuild, workers, dtype, chunker)
+
+    started = time.perf_counter()
+    if layout == "single":
+        category_persist_dir = os.path.join(persist_base_dir, SINGLE_COLLECTION_DIR)
+        category_filter = {"category": category}
+    else:
+        category_persist_dir = os.path.join(persist_base_dir, category)
+        category_filter = None
+    os.makedirs(category_persist_dir, exist_ok=True)
+    manifest_path = manifest_path_for(persist_base_dir, category, layout)
+
+    text_splitter, splitter_config = create_text_splitter(chunker)
+
+    manifest = load_manifest(manifest_path)
+    if full_rebuild or manifest.get("splitter") != splitter_config:
+        manifest = {"files": {}}  # 청크 설정이 바뀌면 파일 해시 기록은 무효
+
+    vector_db = Chroma(persist_directory=category_persist_dir)
+    existing_ids = set(vector_db.get(where=category_filter, include=[])["ids"])
+
+    # 📌 다른 임베딩 모델로 만든 인덱스에 청크를 섞지 않도록 확인 (--full 이면 새 모델로 다시 만듦)
+    embedding_config = embedding_config_from_env()
+    if existing_ids and not full_rebuild:
+        try:
+            check_index_embedding(category_persist_dir, embedding_config)
+        except EmbeddingMismatchError as e:
+            raise EmbeddingMismatchError(f"{str(e)} - --full 옵션으로 다시 빌드하세요.")
+
+    stale_ids = set()
+    if full_rebuild:
+        stale_ids, existing_ids = existing_ids, set()
+
+    current_ids, new_chunks, files = collect_category_chunks(
+        base_data_dir, category, manifest, existing_ids, text_splitter
+    )
+
+    # 📌 삭제 대상: 원본에 없는 청크 (전체 재빌드면 전부)
+    stale_ids |= existing_ids - current_ids
+    if stale_ids:
+        vector_db.delete(ids=list(stale_ids))
+
+    # 📌 추가 대상: 벡터DB에 없는 청크만 임베딩
+    if new_chunks:
+        vector_db = Chroma(persist_directory=category_persist_dir, embedding_function=create_embedding_model(workers))
+        vector_db.add_documents(list(new_chunks.values()), ids=list(new_chunks))
+        sample = vector_db.get(limit=1, include=["embeddings"])["embeddings"]
+        write_index_embedding_info(category_persist_dir, index_embedding_info(embedding_config, len(sample[0])))
+
+    # 📌 키워드(BM25) 인덱스는 카테고리 전체 청크로 다시 생성 (임베딩이 없어 빠름)
+    lexical_dir = os.path.join(persist_base_dir, LEXICAL_DIR, category)
+    if new_chunks or stale_ids or not os.path.isdir(lexical_dir):
+        build_lexical_index(vector_db, category_filter, lexical_dir)
+
+    save_manifest(manifest_path, {"splitter": splitter_config, "files": files})
+    return {
+        "category": category,
+        "files": len(files),
+        "chunks": len(current_ids),
+        "added": len(new_chunks),
+        "deleted": len(stale_ids),
+        "seconds": round(time.perf_counter() - started, 2)
+    }
+
+
+def build_numpy_category_index(base_data_dir, persist_base_dir, category, full_rebuild=False, workers=1, dtype="float32",
+                               chunker="recursive"):
+    """
+    numpy 백엔드로 카테고리 하나를 증분 빌드 (vectorDB/_numpy/<카테고리>/)
+
+    기존 인덱스에 남아 있는 청크는 저장된 벡터를 그대로 쓰고, 새 청크만 임베딩합니다.
+    코퍼스가 작아 변경이 있으면 배열 파일 전체를 다시 씁니다.
     """
-    # 사용할 임베딩 모델 초기화
-    embedding_model = HuggingFaceEmbeddings(model_name="BAAI/bge-large-en")
+    started = time.perf_counter()
+    index_dir = os.path.join(persist_base_dir, NUMPY_DIR, category)
+    manifest_path = os.path.join(index_dir, MANIFEST_FILE)
+
+    text_splitter, splitter_config = create_text_splitter(chunker)
 
-    # 텍스트 청크 설정 (추천값 적용)
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=800,  # 한 청크의 최대 토큰 수
-        chunk_overlap=300  # 청크 간 겹치는 토큰 수
+    manifest = load_manifest(manifest_path)
+    if full_rebuild or manifest.get("splitter") != splitter_config:
+        manifest = {"files": {}}
+
+    embedding_config = embedding_config_from_env()
+    existing = None
+    if not full_rebuild and os.path.exists(os.path.join(index_dir, EMBEDDINGS_FILE)):
+        try:
+            check_index_embedding(index_dir, embedding_config)
+        except EmbeddingMismatchError as e:
+            raise EmbeddingMismatchError(f"{str(e)} - --full 옵션으로 다시 빌드하세요.")
+        existing = NumpyVectorIndex.load(index_dir, mmap=False)
+    existing_ids = set(existing.ids) if existing else set()
+
+    current_ids, new_chunks, files = collect_category_chunks(
+        base_data_dir, category, manifest, existing_ids, text_splitter
     )
+    stale_ids = existing_ids - current_ids
+    dtype_changed = existing is not None and existing.embeddings.dtype != np.dtype(dtype)
 
-    # 데이터 디렉토리 내 각 카테고리 디렉토리를 처리
-    for category in os.listdir(base_data_dir):
-        category_path = os.path.join(base_data_dir, category)
-        if not os.path.isdir(category_path):
-            continue  # 디렉토리가 아니면 스킵
+    index = existing
+    if new_chunks or stale_ids or dtype_changed or existing is None:
+        kept = [row for row, doc in enumerate(existing.docs) if doc["id"] in current_ids] if existing else []
+        docs = [existing.docs[row] for row in kept]
+        vectors = [np.asarray(existing.embeddings[kept], dtype=np.float32)] if kept else []
+        if new_chunks:
+            embedding_model = create_embedding_model(workers)
+            vectors.append(np.asarray(embedding_model.embed_documents([doc.page_content for doc in new_chunks.values()]), dtype=np.float32))
+            docs.extend({"id": doc_id, "page_content": doc.page_content, "metadata": doc.metadata} for doc_id, doc in new_chunks.items())
+        if docs or existing is not None:
+            dimension = existing.dimension if existing else 0
+            embeddings = np.vstack(vectors) if vectors else np.zeros((0, dimension), dtype=np.float32)
+            index = NumpyVectorIndex.build(docs, embeddings, dtype=dtype)
+            index.save(index_dir)
+            write_index_embedding_info(index_dir, index_embedding_info(embedding_config, index.dimension))
 
-        print(f"📂 카테고리 '{category}' 처리 중...")
+    # 📌 키워드(BM25) 인덱스는 카테고리 전체 청크로 다시 생성 (청크 ID 는 Chroma 백엔드와 동일)
+    lexical_dir = os.path.join(persist_base_dir, LEXICAL_DIR, category)
+    if index is not None and (new_chunks or stale_ids or not os.path.isdir(lexical_dir)):
+        LexicalIndex.build(index.ids, [doc["page_content"] for doc in index.docs], [doc["metadata"] for doc in index.docs]).save(lexical_dir)
 
-        all_documents = []  # 카테고리 내 모든 문서를 저장할 리스트
+    save_manifest(manifest_path, {"splitter": splitter_config, "files": files})
+    return {
+        "category": category,
+        "files": len(files),
+        "chunks": len(current_ids),
+        "added": len(new_chunks),
+        "deleted": len(stale_ids),
+        "seconds": round(time.perf_counter() - started, 2)
+    }
 
-        # 해당 카테고리의 모든 txt 파일 로드
-        for file in os.listdir(category_path):
-            file_path = os.path.join(category_path, file)
-            if not file.endswith(".txt"):
-                continue  # txt 파일만 처리
 
-            print(f"📄 문서 처리: {file_path}")
-            try:
-                # 텍스트 로드
-                loader = TextLoader(file_path, encoding="utf-8")
-                document_text = loader.load()[0].page_content
+# 📌 카테고리별 문서를 벡터화하여 각각의 ChromaDB에 저장
+def prepare_chroma_db_by_category(base_data_dir, persist_base_dir, workers=1, full_rebuild=False, layout="per-category",
+                                  backend="chroma", dtype="float32", chunker="recursive"):
+    """
+    카테고리별로 문서를 벡터화하여 ChromaDB(또는 numpy 인덱스)에 저장 (증분 빌드, 카테고리 단위 병렬 처리)
 
-                # 텍스트를 청크로 나누기
-                chunks = text_splitter.split_text(document_text)
+    single 레이아웃은 하나의 컬렉션을 여러 프로세스가 동시에 쓰지 않도록 순차 처리합니다.
+    """
+    if backend == "numpy" and layout == "single":
+        raise ValueError("numpy 백엔드는 per-category 레이아웃만 지원합니다.")
+    # 데이터 디렉토리 내 각 카테고리 디렉토리를 처리
+    categories = [
+        category for category in sorted(os.listdir(base_data_dir))
+        if os.path.isdir(os.path.join(base_data_dir, category))
+    ]
 
-                # ✅ 청크를 Document 객체로 변환
-                for chunk in chunks:
-                    doc = Document(page_content=chunk, metadata={"source": file_path, "category": category})
-                    all_documents.append(doc)
+    reports = []
+    if workers <= 1 or layout == "single":
+        for category in categories:
+            print(f"📂 카테고리 '{category}' 처리 중...")
+            reports.append(build_category_index(
+                base_data_dir, persist_base_dir, category, full_rebuild, layout=layout, backend=backend, dtype=dtype,
+                chunker=chunker
+            ))
+            print_report(reports[-1])
+        if layout == "single":
+            remove_orphan_categories(persist_base_dir, categories)
+        return reports
 
+    # 프로세스마다 임베딩 모델을 따로 로드하므로 spawn 방식으로 실행
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {
+            pool.submit(
+                build_category_index, base_data_dir, persist_base_dir, category, full_rebuild, workers,
+                backend=backend, dtype=dtype, chunker=chunker
+            ): category
+            for category in categories
+        }
+        for future in as_completed(futures):
+            try:
+                reports.append(future.result())
+                print_report(reports[-1])
             except Exception as e:
-                print(f"❌ 파일 처리 중 오류 발생: {file_path} - {str(e)}")
-                continue
+                print(f"❌ 카테고리 처리 중 오류 발생: {futures[future]} - {str(e)}")
+    return reports
+
+
+def build_lexical_index(vector_db, category_filter, lexical_dir):
+    """벡터DB에 저장된 청크로 BM25 인덱스 생성 (청크 ID 는 벡터DB 와 동일)"""
+    stored = vector_db.get(where=category_filter, include=["documents", "metadatas"])
+    LexicalIndex.build(stored["ids"], stored["documents"], stored["metadatas"]).save(lexical_dir)
 
-        # 📌 카테고리별 벡터DB 저장 디렉토리 생성
-        category_persist_dir = os.path.join(persist_base_dir, category)
-        os.makedirs(category_persist_dir, exist_ok=True)
 
-        # 📌 카테고리별 벡터DB 생성 및 저장
-        vector_db = Chroma.from_documents(
-            documents=all_documents,
-            embedding=embedding_model,
-            persist_directory=category_persist_dir
-        )
-        print(f"✅ 저장 완료: {category_persist_dir} (총 {len(all_documents)}개 청크 저장)")
+def remove_orphan_categories(persist_base_dir, categories):
+    """공용 컬렉션에서 data 디렉토리에 더 이상 없는 카테고리의 청크 삭제"""
+    vector_db = Chroma(persist_directory=os.path.join(persist_base_dir, SINGLE_COLLECTION_DIR))
+    orphan_ids = vector_db.get(where={"category": {"$nin": categories}}, include=[])["ids"]
+    if orphan_ids:
+        vector_db.delete(ids=orphan_ids)
+        print(f"🗑️ 사라진 카테고리 청크 {len(orphan_ids)}개 삭제")
+
+
+def print_report(report):
+    print(
+        f"✅ 저장 완료: {report['category']} (청크 {report['chunks']}개, 추가 {report['added']}개, "
+        f"삭제 {report['deleted']}개, 파일 {report['files']}개, {report['seconds']}초)"
+    )
+
 
 # 실행
 if __name__ == "__main__":
+    root_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="카테고리별 벡터DB 증분 빌드")
     # 📂 카테고리별 데이터가 저장된 경로 (data 디렉토리)
-    base_data_dir = "/home/ibmuser01/ibm_hackathon_rag/data"
-    
+    parser.add_argument("--data-dir", default=os.path.join(root_dir, "data"))
     # 📂 벡터DB 저장 경로
-    persist_base_dir = "/home/ibmuser01/ibm_hackathon_rag/vectorDB"
+    parser.add_argument("--persist-dir", default=os.path.join(root_dir, "vectorDB"))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("INDEX_WORKERS", "1")), help="동시에 처리할 카테고리 프로세스 수")
+    parser.add_argument("--full", action="store_true", help="기존 청크를 모두 지우고 다시 임베딩")
+    parser.add_argument("--layout", choices=LAYOUTS, default=os.getenv("VECTOR_DB_LAYOUT", "per-category"))
+    parser.add_argument("--backend", choices=BACKENDS, default=os.getenv("VECTOR_BACKEND", "chroma"))
+    parser.add_argument("--dtype", choices=DTYPES, default=os.getenv("VECTOR_INDEX_DTYPE", "float32"), help="numpy 백엔드 임베딩 저장 형식")
+    parser.add_argument("--chunker", choices=CHUNKERS, default=os.getenv("CHUNKER", "recursive"), help="청크 분할 방식")
+    args = parser.parse_args()
 
     # 카테고리별 벡터DB 생성
-    prepare_chroma_db_by_category(base_data_dir, persist_base_dir)
+    prepare_chroma_db_by_category(
+        args.data_dir, args.persist_dir, workers=args.workers, full_rebuild=args.full, layout=args.layout,
+        backend=args.backend, dtype=args.dtype, chunker=args.chunker
+    )
@@ -0,0 +1,189 @@
+import os
+import re
+import json
+import time
+import threading
+import logging
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(prompt):
+    """정확 일치 비교용 질문 정규화 (유니코드 정규화, 소문자, 공백/문장부호 정리)"""
+    text = unicodedata.normalize("NFKC", prompt).lower()
+    text = re.sub(r"[?!.,~\"'`]+", " ", text)
+    return " ".join(text.split())
+
+
+class AnswerCache:
+    """
+    카테고리별 답변 캐시
+
+    1) 정규화한 질문이 정확히 같으면 바로 반환
+    2) 아니면 질문 임베딩의 코사인 유사도가 similarity_threshold 이상인 가장 가까운 답변 반환
+    TTL 이 지난 항목은 버리고, max_entries 를 넘으면 가장 오래 쓰지 않은 항목부터 제거 (LRU)
+    persist_path 가 있으면 JSON 파일로 저장/복원
+    (임베딩 모델 이름과 차원도 함께 저장해 다른 모델로 만든 항목은 복원하지 않음)
+    """
+
+    def __init__(self, max_entries=1000, ttl_seconds=3600, similarity_threshold=0.95, persist_path=None, embedding_model=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.persist_path = persist_path
+        self.embedding_model = embedding_model
+        self._entries = OrderedDict()  # (category, 정규화 질문) -> 항목
+        self._lock = threading.Lock()
+        self.counters = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def _expired(self, entry, now):
+        return self.ttl_seconds and now - entry["created_at"] > self.ttl_seconds
+
+    def _drop_expired(self, now):
+        expired = [key for key, entry in self._entries.items() if self._expired(entry, now)]
+        for key in expired:
+            del self._entries[key]
+        self.counters["expirations"] += len(expired)
+
+    def get_exact(self, category, prompt):
+        """정규화한 질문이 같은 캐시 항목의 응답 반환 (없으면 None)"""
+        key = (category, normalize_prompt(prompt))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._expired(entry, time.time()):
+                del self._entries[key]
+                self.counters["expirations"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["exact_hits"] += 1
+            return entry["response"]
+
+    def get_similar(self, category, embedding):
+        """같은 카테고리에서 임베딩이 가장 가까운 응답 반환 (임계값 미만이면 None, miss 로 집계, 차원이 다른 항목은 건너뜀)"""
+        query = self._unit(embedding)
+        with self._lock:
+            self._drop_expired(time.time())
+            keys = [
+                key for key, entry in self._entries.items()
+                if key[0] == category and entry["embedding"].shape == query.shape
+            ]
+            if keys:
+                matrix = np.stack([self._entries[key]["embedding"] for key in keys])
+                scores = matrix @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity_threshold:
+                    self._entries.move_to_end(keys[best])
+                    self.counters["semantic_hits"] += 1
+                    return self._entries[keys[best]]["response"]
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, category, prompt, embedding, response):
+        key = (category, normalize_prompt(prompt))
+        with self._lock:
+            self._entries[key] = {
+                "embedding": self._unit(embedding),
+                "response": response,
+                "created_at": time.time()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    @staticmethod
+    def _unit(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def clear(self, category=None):
+        """항목 삭제 (category 를 주면 그 카테고리만) → 삭제한 항목 수"""
+        with self._lock:
+            keys = [key for key in self._entries if category is None or key[0] == category]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.counters["exact_hits"] + self.counters["semantic_hits"] + self.counters["misses"]
+            hits = lookups - self.counters["misses"]
+            return dict(
+                self.counters,
+                size=len(self._entries),
+                max_entries=self.max_entries,
+                hit_rate=round(hits / lookups, 4) if lookups else None
+            )
+
+    def save(self):
+        """캐시를 persist_path 에 JSON 으로 저장 (임베딩 모델 이름과 차원 포함)"""
+        if not self.persist_path:
+            return
+        with self._lock:
+            rows = [
+                {
+                    "category": category,
+                    "prompt": prompt,
+                    "embedding": entry["embedding"].tolist(),
+                    "response": entry["response"],
+                    "created_at": entry["created_at"]
+                }
+                for (category, prompt), entry in self._entries.items()
+            ]
+        data = {
+            "embedding_model": self.embedding_model,
+            "dimension": len(rows[0]["embedding"]) if rows else None,
+            "entries": rows
+        }
+        tmp_path = self.persist_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.persist_path)
+        logger.info(f"💾 답변 캐시 저장: {self.persist_path} ({len(rows)}개)")
+
+    def load(self):
+        """
+        persist_path 에서 캐시 복원 (TTL 이 지난 항목은 제외)
+
+        다른 임베딩 모델로 저장한 파일(모델 정보가 없는 이전 형식 포함)은 복원하지 않고,
+        차원이 파일의 dimension 과 다른 항목도 버립니다. (임베딩 모델을 바꾼 뒤 유사도 계산이 실패하지 않도록)
+        """
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"❌ 답변 캐시 로드 실패: {self.persist_path} - {str(e)}")
+            return
+
+        saved_model = data.get("embedding_model") if isinstance(data, dict) else None
+        if saved_model != self.embedding_model:
+            logger.warning(f"⚠️ 답변 캐시 임베딩 모델 불일치로 복원하지 않음: 파일={saved_model} / 현재={self.embedding_model}")
+            return
+
+        now = time.time()
+        dropped = 0
+        with self._lock:
+            for row in data["entries"]:
+                entry = {
+                    "embedding": np.asarray(row["embedding"], dtype=np.float32),
+                    "response": row["response"],
+                    "created_at": row["created_at"]
+                }
+                if entry["embedding"].shape != (data["dimension"],):
+                    dropped += 1
+                elif not self._expired(entry, now):
+                    self._entries[(row["category"], row["prompt"])] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if dropped:
+            logger.warning(f"⚠️ 임베딩 차원이 다른 답변 캐시 항목 {dropped}개 제외")
+        logger.info(f"✅ 답변 캐시 로드: {self.persist_path} ({len(self._entries)}개)")
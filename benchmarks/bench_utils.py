@@ -0,0 +1,110 @@
+"""벤치마크 스크립트 공용 함수"""
+import os
+import sys
+import json
+import resource
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUESTIONS_FILE = os.path.join(ROOT_DIR, "ragas", "generated_questions.json")
+
+# 📌 저장소 루트 모듈(main.py, VectorDB.py 등)을 import 할 수 있도록 경로 추가
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+def load_questions(path=QUESTIONS_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 3)
+
+
+def latency_summary(values_ms):
+    """밀리초 리스트 → p50/p95/p99/평균"""
+    return {
+        "count": len(values_ms),
+        "mean_ms": round(sum(values_ms) / len(values_ms), 3) if values_ms else None,
+        "p50_ms": percentile(values_ms, 50),
+        "p95_ms": percentile(values_ms, 95),
+        "p99_ms": percentile(values_ms, 99),
+    }
+
+
+def current_rss_mb():
+    """현재 RSS (MB, Linux 는 /proc 사용)"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def rss_breakdown_mb():
+    """RSS 중 익명 메모리(프로세스 전용)와 파일 매핑(page cache, 프로세스끼리 공유 가능) 크기 (MB, Linux 전용)"""
+    breakdown = {}
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                name = line.split(":")[0]
+                if name in ("RssAnon", "RssFile", "RssShmem"):
+                    breakdown[name] = round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return breakdown
+
+
+def peak_rss_mb():
+    """최대 RSS (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 는 bytes, Linux 는 KB
+    return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def write_report(report, output=None):
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+# ----------------------------------------------------------------------
+# 정답(gold) 라벨
+# ----------------------------------------------------------------------
+# 형식: [{"prompt": "...", "category": "...", "gold_passages": ["정답 청크에 들어 있어야 할 문장", ...]}]
+# 청크 ID 는 청크 방식마다 달라지므로, 정답 문장(예: 원문 소제목)이 청크에 포함되는지로 판단합니다.
+
+def normalize_space(text):
+    return " ".join(str(text).split())
+
+
+def load_gold(path):
+    """gold 라벨 파일 → {(category, prompt): [정답 문장]}"""
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        rows = json.load(f)
+    return {(row["category"], row["prompt"]): [normalize_space(p) for p in row["gold_passages"]] for row in rows}
+
+
+def relevance_flags(texts, gold_passages):
+    """검색된 청크마다 정답 문장을 포함하는지 여부"""
+    return [any(passage in normalize_space(text) for passage in gold_passages) for text in texts]
+
+
+def recall_and_mrr(texts, gold_passages):
+    """(찾은 정답 문장 비율, 첫 정답 청크의 역순위)"""
+    joined = [normalize_space(text) for text in texts]
+    found = sum(1 for passage in gold_passages if any(passage in text for text in joined))
+    flags = relevance_flags(texts, gold_passages)
+    first = next((rank for rank, flag in enumerate(flags, start=1) if flag), None)
+    return found / len(gold_passages), (1 / first if first else 0.0)
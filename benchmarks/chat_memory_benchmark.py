@@ -0,0 +1,84 @@
+"""
+긴 대화에서 세션당 메모리와 rerun 렌더링 비용 비교
+
+기존 방식(메시지 dict 리스트 + 매 rerun 마다 전체 HTML 재생성)과
+chat_history.ChatHistory(한도 + 최근 메시지 창 + 말풍선 HTML 캐시)를 같은 대화로 비교합니다.
+
+    python benchmarks/chat_memory_benchmark.py --turns 100 500 2000 --output chat_memory.json
+"""
+import time
+import argparse
+import tracemalloc
+
+from bench_utils import latency_summary, write_report
+
+from chat_history import ChatHistory
+
+QUESTION = "청년 전용 금융 상품에는 어떤 것들이 있나요? "
+ANSWER = "청년도약계좌와 청년희망적금 같은 상품이 있으며, 가입 조건과 혜택은 다음과 같습니다. " * 8
+
+
+def legacy_render(messages):
+    """기존 my_app.py 의 렌더링 방식"""
+    messages_html = '<div class="chat-container" id="chat-messages">'
+    for msg in reversed(messages):
+        if msg["role"] == "user":
+            messages_html += f'<div class="user-bubble"><strong>Q:</strong> {msg["content"]}</div>'
+        else:
+            messages_html += f'<div class="assistant-bubble"><strong>A:</strong> {msg["content"]}</div>'
+    messages_html += '</div>'
+    return messages_html
+
+
+def history_render(history):
+    return '<div class="chat-container" id="chat-messages">' + history.render_html() + '</div>'
+
+
+def measure(turns, build, append, render, reruns):
+    """대화 한 세션을 turns 턴까지 진행 → 세션 메모리(bytes), 마지막 턴 이후 rerun 렌더링 시간"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    session = build()
+    for turn in range(turns):
+        # 실제 앱처럼 질문/답변마다 새 문자열 (대화 내용이 공유되지 않도록 번호를 붙임)
+        append(session, "user", f"{turn}. {QUESTION}")
+        append(session, "assistant", f"{turn}. {ANSWER}")
+        render(session)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    session_bytes = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    rerun_ms = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        render(session)
+        rerun_ms.append((time.perf_counter() - started) * 1000)
+    return {"session_kb": round(session_bytes / 1024, 1), "rerun_render": latency_summary(rerun_ms)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대화 기록 메모리/렌더링 벤치마크")
+    parser.add_argument("--turns", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--reruns", type=int, default=50)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    results = []
+    for turns in args.turns:
+        results.append({
+            "turns": turns,
+            "legacy": measure(
+                turns, list, lambda messages, role, content: messages.append({"role": role, "content": content}),
+                legacy_render, args.reruns
+            ),
+            "chat_history": measure(
+                turns, ChatHistory, lambda history, role, content: history.append(role, content),
+                history_render, args.reruns
+            ),
+        })
+
+    write_report({"answer_chars": len(ANSWER), "results": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
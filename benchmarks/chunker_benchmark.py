@@ -0,0 +1,167 @@
+"""
+청크 분할 방식(recursive vs structure) 비교 벤치마크
+
+    python benchmarks/chunker_benchmark.py --gold gold.json --output chunker.json
+
+분할 방식마다 임시 디렉토리에 인덱스를 처음부터(--full) 만들어
+청크 수, 청크 토큰 수, 겹침으로 중복 저장된 글자 비율, 인덱스 크기, 빌드 시간을 측정하고
+같은 질문 임베딩으로 검색한 상위 k개 청크의 토큰 수(프롬프트에 들어갈 컨텍스트 양)를 비교합니다.
+--gold 를 주면 정답 문장 기준 recall / MRR 도 계산합니다. (청크 ID 가 방식마다 달라 정답은 문장으로 판단)
+"""
+import os
+import time
+import argparse
+import tempfile
+
+from bench_utils import ROOT_DIR, load_questions, load_gold, percentile, recall_and_mrr, write_report
+
+
+def token_summary(values):
+    """토큰 수 리스트 → 평균/p50/p95/최대"""
+    return {
+        "mean": round(sum(values) / len(values), 1) if values else None,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "max": max(values) if values else None,
+    }
+
+
+def chunk_stats(data_dir, chunker):
+    """data 디렉토리 전체를 분할만 해서 청크 수 / 토큰 수 / 중복 글자 비율 계산 (임베딩 없음)"""
+    from VectorDB import create_text_splitter, split_document
+    from context_packer import count_tokens
+
+    text_splitter, _ = create_text_splitter(chunker)
+    tokens, source_chars, chunk_chars = [], 0, 0
+    for category in sorted(os.listdir(data_dir)):
+        category_path = os.path.join(data_dir, category)
+        if not os.path.isdir(category_path):
+            continue
+        for file in sorted(os.listdir(category_path)):
+            if not file.endswith(".txt"):
+                continue
+            with open(os.path.join(category_path, file), "r", encoding="utf-8") as f:
+                text = f.read()
+            source_chars += len(text)
+            for chunk, _ in split_document(text_splitter, text):
+                tokens.append(count_tokens(chunk))
+                chunk_chars += len(chunk)
+    return {
+        "chunks": len(tokens),
+        "tokens": token_summary(tokens),
+        # 1.0 이면 원문을 한 번씩만 저장, 겹침이 클수록 커짐 (structure 는 섹션 제목 반복분만 늘어남)
+        "stored_char_ratio": round(chunk_chars / source_chars, 3) if source_chars else None,
+    }
+
+
+def open_searchers(backend, persist_dir):
+    """인덱스 이름 → 질문 임베딩 목록을 받아 질문별 상위 k개 청크 내용을 돌려주는 함수"""
+    if backend == "numpy":
+        from numpy_index import NumpyVectorIndex, NUMPY_DIR
+
+        base_dir = os.path.join(persist_dir, NUMPY_DIR)
+        searchers = {}
+        for name in sorted(os.listdir(base_dir)):
+            index = NumpyVectorIndex.load(os.path.join(base_dir, name))
+            searchers[name] = lambda vectors, k, index=index: [
+                [doc.page_content for doc, _ in results] for results in index.search_batch(vectors, k)
+            ]
+        return searchers
+
+    from langchain_chroma import Chroma
+
+    searchers = {}
+    for name in sorted(os.listdir(persist_dir)):
+        if not os.path.isdir(os.path.join(persist_dir, name)) or name.startswith("_"):
+            continue
+        store = Chroma(persist_directory=os.path.join(persist_dir, name))
+        searchers[name] = lambda vectors, k, store=store: store._collection.query(
+            query_embeddings=vectors, n_results=k, include=["documents"]
+        )["documents"]
+    return searchers
+
+
+def evaluate_retrieval(backend, persist_dir, queries, vectors, gold, k):
+    """카테고리별 일괄 검색 → 컨텍스트 토큰 수 (+ gold 가 있으면 recall / MRR)"""
+    from category_router import CategoryRouter
+    from context_packer import count_tokens
+
+    searchers = open_searchers(backend, persist_dir)
+    router = CategoryRouter()
+    router.bind(list(searchers))
+
+    groups = {}
+    for position, query in enumerate(queries):
+        route = router.resolve(query["category"])
+        if route is not None and route.target in searchers:
+            groups.setdefault(route.target, []).append(position)
+
+    context_tokens, recalls, mrrs = [], [], []
+    for name, positions in groups.items():
+        results = searchers[name]([vectors[position] for position in positions], k)
+        for position, texts in zip(positions, results):
+            context_tokens.append(sum(count_tokens(text) for text in texts))
+            gold_passages = gold.get((queries[position]["category"], queries[position]["prompt"]))
+            if gold_passages:
+                recall, mrr = recall_and_mrr(texts, gold_passages)
+                recalls.append(recall)
+                mrrs.append(mrr)
+
+    report = {
+        "queries": sum(len(positions) for positions in groups.values()),
+        "context_tokens": token_summary(context_tokens),
+    }
+    if recalls:
+        report.update({
+            "gold_queries": len(recalls),
+            f"recall@{k}": round(sum(recalls) / len(recalls), 4),
+            f"mrr@{k}": round(sum(mrrs) / len(mrrs), 4),
+        })
+    return report
+
+
+def main():
+    from VectorDB import CHUNKERS, BACKENDS, prepare_chroma_db_by_category
+    from vector_registry import directory_size
+    from embedding_backends import embedding_config_from_env, create_base_embeddings
+
+    parser = argparse.ArgumentParser(description="청크 분할 방식 비교 벤치마크")
+    parser.add_argument("--data-dir", default=os.path.join(ROOT_DIR, "data"))
+    parser.add_argument("--chunkers", nargs="+", choices=CHUNKERS, default=list(CHUNKERS))
+    parser.add_argument("--backend", choices=BACKENDS, default=os.getenv("VECTOR_BACKEND", "chroma"))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--gold", help="정답 문장 라벨 JSON (bench_utils.load_gold 형식)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    queries = load_questions()
+    gold = load_gold(args.gold)
+    # 📌 질문 임베딩은 한 번만 계산해 모든 분할 방식에 같은 벡터로 검색
+    embedding_model = create_base_embeddings(embedding_config_from_env())
+    vectors = embedding_model.embed_documents([query["prompt"] for query in queries])
+
+    chunkers = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for chunker in args.chunkers:
+            print(f"⏱️ 인덱스 빌드 중: {chunker} ({args.backend})")
+            persist_dir = os.path.join(tmp_dir, chunker)
+            started = time.perf_counter()
+            prepare_chroma_db_by_category(
+                args.data_dir, persist_dir, workers=args.workers, full_rebuild=True,
+                backend=args.backend, chunker=chunker
+            )
+            build_seconds = time.perf_counter() - started
+
+            chunkers[chunker] = dict(
+                chunk_stats(args.data_dir, chunker),
+                build_seconds=round(build_seconds, 2),
+                index_size_mb=round(directory_size(persist_dir) / (1024 * 1024), 2),
+                retrieval=evaluate_retrieval(args.backend, persist_dir, queries, vectors, gold, args.k),
+            )
+
+    write_report({"backend": args.backend, "k": args.k, "chunkers": chunkers}, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+대화 세션 문맥 재사용 임계값(CONTEXT_REUSE_SIMILARITY) 보정
+
+VectorDB.py 로 인덱스를 만든 뒤 실행합니다.
+    python benchmarks/context_reuse_benchmark.py --output context_reuse.json
+
+ragas/generated_questions.json 질문마다 main.py 검색 경로로 청크를 가져온 뒤
+- 같은 질문: 질문과 자기 검색 청크의 최대 코사인 유사도 (재사용해도 되는 경우의 상한)
+- 다른 질문: 같은 카테고리의 다른 질문 검색 청크와의 최대 코사인 유사도 (재사용하면 안 되는 경우)
+분포를 비교하고, 다른 질문을 잘못 재사용하는 비율이 --max-false-reuse 이하가 되는 최소 임계값을 제안합니다.
+"""
+import os
+import argparse
+
+import numpy as np
+
+from bench_utils import load_questions, percentile, write_report
+
+
+def unit_rows(vectors):
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def max_similarity(query_embedding, chunk_matrix):
+    """질문과 청크들의 최대 코사인 유사도 (ConversationState.reuse_context 와 같은 계산)"""
+    return float((chunk_matrix @ unit_rows(query_embedding)[0]).max())
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="문맥 재사용 임계값 보정")
+    parser.add_argument("--max-false-reuse", type=float, default=0.05, help="허용할 다른 질문 재사용 비율")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    os.environ.update({"ANSWER_CACHE_ENABLED": "0", "STARTUP_WARMUP": "0"})
+    import main
+
+    main.bind_category_routes()
+    by_target = {}
+    for entry in load_questions():
+        route = main.category_router.resolve(entry["category"])
+        if route is not None and route.kind == "rag" and route.target:
+            by_target.setdefault(route.target, []).append(entry["prompt"])
+
+    same, other = [], []
+    for target, questions in by_target.items():
+        embeddings = main.embedding_model.embed_queries(questions)
+        chunks = []
+        for question, query_embedding in zip(questions, embeddings):
+            results = main.search_documents(target, question, query_embedding) or []
+            chunks.append(unit_rows(main.chunk_embeddings(target, results)) if results else None)
+        for i, query_embedding in enumerate(embeddings):
+            if chunks[i] is not None:
+                same.append(max_similarity(query_embedding, chunks[i]))
+            for j, matrix in enumerate(chunks):
+                if j != i and matrix is not None:
+                    other.append(max_similarity(query_embedding, matrix))
+
+    suggested = percentile(other, 100 * (1 - args.max_false_reuse))
+    write_report({
+        "embedding_model": main.embedding_config["model_name"],
+        "current_threshold": main.CONTEXT_REUSE_SIMILARITY,
+        "same_question": {"count": len(same), "p5": percentile(same, 5), "p50": percentile(same, 50)},
+        "other_question": {"count": len(other), "p50": percentile(other, 50), "p95": percentile(other, 95), "max": percentile(other, 100)},
+        "suggested_threshold": suggested,
+        "same_question_reuse_rate_at_suggested": round(sum(s >= suggested for s in same) / len(same), 4) if same and suggested else None,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,126 @@
+"""
+임베딩 백엔드 비교 벤치마크
+
+data/ 의 청크 전체와 ragas/generated_questions.json 질문을 백엔드마다 임베딩해
+로드 시간, 임베딩 처리량(chunks/s), 질문 임베딩 지연, 검색 품질을 측정합니다.
+백엔드는 "모델[:런타임[:양자화]]" 형식으로 지정합니다.
+
+    python benchmarks/embedding_benchmark.py \
+        --backends BAAI/bge-large-en BAAI/bge-large-en:onnx intfloat/multilingual-e5-small:onnx:int8 \
+        --gold gold.json --output embedding.json
+
+검색 품질은 gold 라벨이 있으면 recall@k / MRR, 없으면 첫 번째 백엔드 대비 top-k 겹침으로 보고합니다.
+"""
+import os
+import time
+import argparse
+
+import numpy as np
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from bench_utils import ROOT_DIR, load_questions, load_gold, latency_summary, recall_and_mrr, current_rss_mb, write_report
+
+from embedding_backends import parse_backend_spec, create_base_embeddings
+from embedding_service import EmbeddingService
+import VectorDB
+
+
+def load_corpus(data_dir):
+    """카테고리별 청크 목록 (VectorDB.py 와 같은 분할 방식)"""
+    splitter = RecursiveCharacterTextSplitter(chunk_size=VectorDB.CHUNK_SIZE, chunk_overlap=VectorDB.CHUNK_OVERLAP)
+    corpus = {}
+    for category in sorted(os.listdir(data_dir)):
+        if not os.path.isdir(os.path.join(data_dir, category)):
+            continue
+        _, chunks, _ = VectorDB.collect_category_chunks(data_dir, category, {"files": {}}, set(), splitter)
+        corpus[category] = [doc.page_content for doc in chunks.values()]
+    return corpus
+
+
+def unit_rows(vectors):
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def run_backend(spec, corpus, questions, gold, k, normalize):
+    config = parse_backend_spec(spec, normalize=normalize)
+
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+    service = EmbeddingService(create_base_embeddings(config))
+    load_seconds = time.perf_counter() - started
+
+    total_chunks = sum(len(texts) for texts in corpus.values())
+    started = time.perf_counter()
+    matrices = {category: unit_rows(service.embed_documents(texts)) for category, texts in corpus.items()}
+    embed_seconds = time.perf_counter() - started
+
+    query_ms = []
+    rankings = []
+    recalls, mrrs = [], []
+    for entry in questions:
+        started = time.perf_counter()
+        vector = service.base.embed_query(entry["prompt"])  # 캐시/배치 없이 순수 모델 지연 측정
+        query_ms.append((time.perf_counter() - started) * 1000)
+
+        matrix = matrices.get(entry["category"])
+        if matrix is None:
+            rankings.append([])
+            continue
+        scores = matrix @ unit_rows([vector])[0]
+        top = np.argsort(-scores)[:k]
+        rankings.append([corpus[entry["category"]][i] for i in top])
+
+        gold_passages = gold.get((entry["category"], entry["prompt"]))
+        if gold_passages:
+            recall, mrr = recall_and_mrr(rankings[-1], gold_passages)
+            recalls.append(recall)
+            mrrs.append(mrr)
+
+    return {
+        "backend": spec,
+        "config": config,
+        "dimension": int(next(iter(matrices.values())).shape[1]) if matrices else None,
+        "load_seconds": round(load_seconds, 2),
+        "rss_delta_mb": round(current_rss_mb() - rss_before, 1),
+        "chunks": total_chunks,
+        "embed_seconds": round(embed_seconds, 2),
+        "chunks_per_second": round(total_chunks / embed_seconds, 1) if embed_seconds else None,
+        "query_embed": latency_summary(query_ms),
+        f"recall@{k}": round(sum(recalls) / len(recalls), 4) if recalls else None,
+        "mrr": round(sum(mrrs) / len(mrrs), 4) if mrrs else None,
+    }, rankings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 백엔드 벤치마크")
+    parser.add_argument("--backends", nargs="+", default=["BAAI/bge-large-en", "BAAI/bge-large-en:onnx"])
+    parser.add_argument("--data-dir", default=os.path.join(ROOT_DIR, "data"))
+    parser.add_argument("--normalize", action="store_true")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--gold", help="gold 라벨 JSON (bench_utils.load_gold 형식)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.data_dir)
+    questions = load_questions()
+    gold = load_gold(args.gold)
+
+    results = []
+    reference = None
+    for spec in args.backends:
+        print(f"⏱️ 백엔드 측정 중: {spec}")
+        result, rankings = run_backend(spec, corpus, questions, gold, args.k, args.normalize)
+        if reference is None:
+            reference = rankings
+        else:
+            overlaps = [len(set(a) & set(b)) / args.k for a, b in zip(reference, rankings) if a]
+            result[f"top{args.k}_overlap_vs_{args.backends[0]}"] = round(sum(overlaps) / len(overlaps), 4) if overlaps else None
+        results.append(result)
+
+    write_report({"k": args.k, "backends": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
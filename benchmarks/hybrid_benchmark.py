@@ -0,0 +1,110 @@
+"""
+dense / BM25 / hybrid(RRF) 검색 비교 벤치마크
+
+VectorDB.py 로 벡터DB 와 키워드 인덱스(vectorDB/_lexical)를 만든 뒤 실행합니다.
+    python benchmarks/hybrid_benchmark.py --gold gold.json --output hybrid.json
+
+ragas/generated_questions.json 의 질문을 서버와 같은 카테고리 라우트로 인덱스에 연결한 뒤
+main.py 검색 경로를 그대로 호출해 방식별 지연 시간과 (gold 라벨이 있으면) recall@k / MRR 을 측정합니다.
+gold 라벨이 없으면 방식 간 결과 겹침 정도만 보고합니다.
+검색 없이 답하는 카테고리 질문은 건너뛰고, 등록되지 않았거나 인덱스가 없는 카테고리가 있으면 측정 전에 중단합니다.
+"""
+import time
+import argparse
+
+from bench_utils import load_questions, load_gold, latency_summary, recall_and_mrr, write_report
+
+import main
+
+MODES = ("dense", "lexical", "hybrid")
+
+
+def retrieval_target(category):
+    """질문 category → 검색할 인덱스 이름 (검색 없이 답하는 카테고리는 None)"""
+    route = main.category_router.resolve(category)
+    if route is None:
+        raise ValueError(f"등록되지 않은 카테고리: '{category}'")
+    if route.kind == "direct":
+        return None
+    if route.target is None:
+        raise ValueError(f"인덱스가 없는 카테고리: '{category}' (VectorDB.py 로 인덱스를 먼저 만드세요)")
+    return route.target
+
+
+def run_mode(mode, category, question, query_embedding, k):
+    if mode == "dense":
+        return main.search_dense(category, query_embedding, k) or []
+    if mode == "lexical":
+        return main.search_lexical(category, question, k)
+    return main.search_documents(category, question, query_embedding, mode="hybrid") or []
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="dense / BM25 / hybrid 검색 벤치마크")
+    parser.add_argument("--gold", help="gold 라벨 JSON (bench_utils.load_gold 형식)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    k = main.RETRIEVAL_K
+    main.bind_category_routes()
+    questions = []
+    skipped = 0
+    for entry in load_questions():
+        target = retrieval_target(entry["category"])
+        if target is None:
+            skipped += 1
+        else:
+            questions.append((entry, target))
+    gold = load_gold(args.gold)
+
+    latencies = {mode: [] for mode in MODES}
+    embed_ms = []
+    quality = {mode: {"recall": [], "mrr": []} for mode in MODES}
+    overlap = {"dense_vs_lexical": [], "dense_vs_hybrid": []}
+
+    for entry, target in questions:
+        started = time.perf_counter()
+        query_embedding = main.embed_query(entry["prompt"])
+        embed_ms.append((time.perf_counter() - started) * 1000)
+
+        texts = {}
+        for mode in MODES:
+            started = time.perf_counter()
+            results = run_mode(mode, target, entry["prompt"], query_embedding, k)
+            latencies[mode].append((time.perf_counter() - started) * 1000)
+            texts[mode] = [doc.page_content for doc in results]
+
+            gold_passages = gold.get((entry["category"], entry["prompt"]))
+            if gold_passages:
+                recall, mrr = recall_and_mrr(texts[mode], gold_passages)
+                quality[mode]["recall"].append(recall)
+                quality[mode]["mrr"].append(mrr)
+
+        dense = set(texts["dense"])
+        for name, other in (("dense_vs_lexical", "lexical"), ("dense_vs_hybrid", "hybrid")):
+            union = dense | set(texts[other])
+            overlap[name].append(len(dense & set(texts[other])) / len(union) if union else 1.0)
+
+    report = {
+        "k": k,
+        "questions": len(questions),
+        "skipped_direct_questions": skipped,
+        "labelled_questions": len(quality["dense"]["recall"]),
+        "embed": latency_summary(embed_ms),
+        "modes": {
+            mode: dict(
+                latency_summary(latencies[mode]),
+                **{
+                    f"recall@{k}": round(sum(q["recall"]) / len(q["recall"]), 4) if q["recall"] else None,
+                    "mrr": round(sum(q["mrr"]) / len(q["mrr"]), 4) if q["mrr"] else None,
+                }
+            )
+            for mode, q in quality.items()
+        },
+        "mean_jaccard_overlap": {name: round(sum(v) / len(v), 4) for name, v in overlap.items() if v},
+    }
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,124 @@
+"""
+벡터DB 저장 방식(per-category vs single) 비교 벤치마크
+
+두 레이아웃을 모두 VectorDB.py 로 만든 뒤 실행합니다.
+    python VectorDB.py --layout per-category
+    python VectorDB.py --layout single
+    python benchmarks/layout_benchmark.py --output layout.json
+
+레이아웃마다 별도 프로세스에서 벡터DB 를 열어
+열기 시간, RSS 증가량, 카테고리 검색 / 전체 카테고리 검색 지연 시간을 측정합니다.
+질문 임베딩은 부모 프로세스에서 한 번만 계산해 자식 프로세스에 넘깁니다.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+from bench_utils import ROOT_DIR, load_questions, latency_summary, current_rss_mb, peak_rss_mb, write_report
+
+
+def embed_questions(questions, output_path):
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    embedding_model = HuggingFaceEmbeddings(model_name="BAAI/bge-large-en")
+    vectors = embedding_model.embed_documents([entry["prompt"] for entry in questions])
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump([dict(entry, embedding=vector) for entry, vector in zip(questions, vectors)], f, ensure_ascii=False)
+
+
+def measure_layout(layout, persist_dir, embedded_path, k):
+    """자식 프로세스: 한 레이아웃의 열기 비용과 검색 지연 측정"""
+    from langchain_chroma import Chroma
+    from vector_registry import SINGLE_COLLECTION_DIR
+
+    with open(embedded_path, "r", encoding="utf-8") as f:
+        queries = json.load(f)
+
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+    if layout == "single":
+        stores = {SINGLE_COLLECTION_DIR: Chroma(persist_directory=os.path.join(persist_dir, SINGLE_COLLECTION_DIR))}
+    else:
+        stores = {
+            name: Chroma(persist_directory=os.path.join(persist_dir, name))
+            for name in sorted(os.listdir(persist_dir))
+            if os.path.isdir(os.path.join(persist_dir, name)) and not name.startswith("_")
+        }
+    # 첫 검색 시점에 HNSW 세그먼트가 로드되므로 워밍업 검색까지 열기 시간에 포함
+    for store in stores.values():
+        store.similarity_search_by_vector(queries[0]["embedding"], k=1)
+    open_seconds = time.perf_counter() - started
+    rss_after_open = current_rss_mb()
+
+    category_ms, all_ms, missing = [], [], 0
+    for query in queries:
+        vector = query["embedding"]
+
+        started = time.perf_counter()
+        if layout == "single":
+            stores[SINGLE_COLLECTION_DIR].similarity_search_by_vector(vector, k=k, filter={"category": query["category"]})
+        elif query["category"] in stores:
+            stores[query["category"]].similarity_search_by_vector(vector, k=k)
+        else:
+            missing += 1
+        category_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        if layout == "single":
+            stores[SINGLE_COLLECTION_DIR].similarity_search_by_vector(vector, k=k)
+        else:
+            scored = []
+            for store in stores.values():
+                scored.extend(store.similarity_search_by_vector_with_relevance_scores(vector, k=k))
+            _ = sorted(scored, key=lambda pair: pair[1])[:k]  # main.py 와 같은 병합 비용 포함
+        all_ms.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "layout": layout,
+        "collections": len(stores),
+        "open_seconds": round(open_seconds, 3),
+        "rss_before_mb": rss_before,
+        "rss_after_open_mb": rss_after_open,
+        "rss_open_delta_mb": round(rss_after_open - rss_before, 1),
+        "peak_rss_mb": peak_rss_mb(),
+        "missing_category_queries": missing,
+        "category_search": latency_summary(category_ms),
+        "all_categories_search": latency_summary(all_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="per-category vs single 컬렉션 벤치마크")
+    parser.add_argument("--persist-dir", default=os.path.join(ROOT_DIR, "vectorDB"))
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--worker-layout", help=argparse.SUPPRESS)
+    parser.add_argument("--embedded", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_layout:
+        print(json.dumps(measure_layout(args.worker_layout, args.persist_dir, args.embedded, args.k)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        embedded_path = os.path.join(tmp_dir, "queries.json")
+        embed_questions(load_questions(), embedded_path)
+
+        results = []
+        for layout in ("per-category", "single"):
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker-layout", layout,
+                 "--persist-dir", args.persist_dir, "--embedded", embedded_path, "--k", str(args.k)],
+                capture_output=True, text=True, check=True
+            )
+            results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    write_report({"k": args.k, "layouts": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
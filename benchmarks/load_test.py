@@ -0,0 +1,121 @@
+"""
+/ask/ 부하 테스트
+
+가짜 LLM 으로 서버를 띄운 뒤 여러 동시성 수준에서 질문을 보내
+처리량(req/s), 지연 시간 백분위수, 429 거절 수를 측정합니다.
+
+예시:
+    # 서버를 직접 띄우는 경우 (가짜 LLM, 토큰당 20ms)
+    python benchmarks/load_test.py --spawn --token-delay 0.02 --concurrency 1 8 32
+
+    # 이미 떠 있는 서버에 보내는 경우
+    python benchmarks/load_test.py --url http://127.0.0.1:8030/ask/
+
+변경 전/후 처리량 비교는 같은 옵션으로 각 커밋에서 실행한 JSON 결과를 비교하면 됩니다.
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from bench_utils import ROOT_DIR, load_questions, percentile, write_report
+
+
+def spawn_server(port, token_delay):
+    """가짜 LLM 으로 uvicorn 서버 실행 후 워밍업이 끝날 때까지(/readyz 200) 대기 (모델/인덱스 로드를 측정에 넣지 않도록)"""
+    # 답변 캐시는 꺼서 매 요청이 검색과 생성을 모두 거치도록 함
+    env = dict(os.environ, LLM_BACKEND="fake", FAKE_LLM_TOKEN_DELAY=str(token_delay), ANSWER_CACHE_ENABLED="0")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT_DIR, env=env
+    )
+    deadline = time.time() + 300
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"서버 프로세스 종료 (exit {process.returncode})")
+        try:
+            response = requests.get(f"http://127.0.0.1:{port}/readyz", timeout=1)
+            if response.status_code == 200:
+                return process
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(1)
+    process.terminate()
+    raise RuntimeError("서버 워밍업이 끝나지 않았습니다.")
+
+
+def run_level(url, questions, concurrency, total):
+    """한 동시성 수준에서 total 개 요청 전송"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+
+    def send(i):
+        entry = questions[i % len(questions)]
+        started = time.perf_counter()
+        try:
+            resp = session.post(url, json={"prompt": entry["prompt"], "category": entry["category"]}, timeout=300)
+            status = resp.status_code
+        except requests.exceptions.RequestException:
+            status = None
+        return status, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(send, range(total)))
+    wall_seconds = time.perf_counter() - started
+
+    ok_latencies = [ms for status, ms in outcomes if status == 200]
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "ok": len(ok_latencies),
+        "rejected_429": sum(1 for status, _ in outcomes if status == 429),
+        "failed": sum(1 for status, _ in outcomes if status not in (200, 429)),
+        "wall_seconds": round(wall_seconds, 2),
+        "throughput_rps": round(len(ok_latencies) / wall_seconds, 2) if wall_seconds else None,
+        "p50_ms": percentile(ok_latencies, 50),
+        "p95_ms": percentile(ok_latencies, 95),
+        "p99_ms": percentile(ok_latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/ask/ 부하 테스트")
+    parser.add_argument("--url", default="http://127.0.0.1:8030/ask/")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--requests-per-level", type=int, default=64)
+    parser.add_argument("--spawn", action="store_true", help="가짜 LLM 서버를 직접 실행")
+    parser.add_argument("--port", type=int, default=8031)
+    parser.add_argument("--token-delay", type=float, default=0.02, help="가짜 LLM 토큰당 지연 (초)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    questions = load_questions()
+
+    server = None
+    url = args.url
+    if args.spawn:
+        server = spawn_server(args.port, args.token_delay)
+        url = f"http://127.0.0.1:{args.port}/ask/"
+
+    try:
+        report = {
+            "url": url,
+            "token_delay": args.token_delay if args.spawn else None,
+            "levels": [run_level(url, questions, level, args.requests_per_level) for level in args.concurrency]
+        }
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+프롬프트 prefix 사전 컴파일 / prefix caching 시뮬레이션 벤치마크 (가짜 LLM 기준)
+
+    python benchmarks/prompt_prefix_benchmark.py --prefill-delay 0.0005 --output prompt_prefix.json
+
+ragas/generated_questions.json 질문마다 카테고리 data/*.txt 의 앞쪽 청크를 검색 결과로 사용해
+main.py 와 같은 프롬프트를 만들고 두 방식을 비교합니다.
+- baseline: 프롬프트 전체 토큰을 매번 계산, LLM 은 프롬프트 전체를 prefill
+- precompiled: prefix 토큰 수는 캐시된 값을 쓰고 나머지만 계산, LLM 은 등록된 prefix 이후만 prefill
+측정 항목: 프롬프트 생성+토큰 계산 시간, 요청당 입력 토큰 / 새로 처리한 토큰, 첫 토큰까지 시간(TTFT)
+
+⚠️ 실제로 측정되는 것은 프롬프트 생성+토큰 계산 시간뿐입니다.
+TTFT 와 새로 처리한 토큰 수는 FakeModelInference 의 입력 토큰당 prefill 지연(--prefill-delay)과
+cache_prefix() 로 흉내 낸 값이라 가짜 모델의 성질입니다. Watsonx 는 prefix 등록 API 가 없으므로
+실제 TTFT 개선은 서버의 자동 prefix caching 여부에 달려 있고 이 벤치마크로는 알 수 없습니다.
+"""
+import os
+import time
+import asyncio
+import argparse
+
+from bench_utils import ROOT_DIR, load_questions, latency_summary, write_report
+
+
+def category_documents(data_dir, k):
+    """data 디렉토리 이름 → 앞쪽 k개 청크 Document (검색 결과 대용, 인덱스 없이 실행하기 위함)"""
+    from langchain_core.documents import Document
+    from structure_chunker import StructureChunker
+
+    chunker = StructureChunker()
+    documents = {}
+    for name in sorted(os.listdir(data_dir)):
+        category_path = os.path.join(data_dir, name)
+        if not os.path.isdir(category_path):
+            continue
+        chunks = []
+        for file in sorted(os.listdir(category_path)):
+            if file.endswith(".txt"):
+                with open(os.path.join(category_path, file), "r", encoding="utf-8") as f:
+                    chunks.extend(chunker.split_text(f.read()))
+        documents[name] = [Document(page_content=chunk) for chunk in chunks[:k]]
+    return documents
+
+
+async def first_token_ms(model, prompt):
+    started = time.perf_counter()
+    async for _ in model.agenerate_stream(prompt=prompt):
+        return (time.perf_counter() - started) * 1000
+    return (time.perf_counter() - started) * 1000
+
+
+def run_variant(main, prompts, model, precompiled):
+    """질문별 (프롬프트 생성 + 토큰 계산 ms, 입력 토큰, 새로 처리한 토큰, TTFT ms)"""
+    from context_packer import count_tokens
+
+    template = main.PROMPT_TEMPLATES["rag"]
+    count_tokens.cache_clear()  # 이전 변형에서 계산한 프롬프트 토큰 수를 재사용하지 않도록
+    build_ms, input_tokens, processed_tokens, ttft_ms = [], [], [], []
+    for docs, question in prompts:
+        started = time.perf_counter()
+        prompt, _ = main.generate_prompt(docs, question)
+        tokens = template.count_tokens(prompt) if precompiled else count_tokens(prompt)
+        build_ms.append((time.perf_counter() - started) * 1000)
+
+        input_tokens.append(tokens)
+        processed_tokens.append(tokens - template.prefix_tokens if precompiled else tokens)
+        ttft_ms.append(asyncio.run(first_token_ms(model, prompt)))
+
+    return {
+        "build_and_count": latency_summary(build_ms),
+        "input_tokens_mean": round(sum(input_tokens) / len(input_tokens), 1),
+        "processed_tokens_mean": round(sum(processed_tokens) / len(processed_tokens), 1),
+        "simulated_ttft": latency_summary(ttft_ms),
+    }
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="프롬프트 prefix 사전 컴파일 / prefix caching 벤치마크")
+    parser.add_argument("--data-dir", default=os.path.join(ROOT_DIR, "data"))
+    parser.add_argument("--prefill-delay", type=float, default=0.0005, help="가짜 LLM 입력 토큰(공백 단위)당 prefill 시간 (초)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    os.environ.update({"LLM_BACKEND": "fake", "STARTUP_WARMUP": "0"})
+    import main
+    from fake_llm import FakeModelInference
+    from category_router import CategoryRouter
+    from prompt_templates import register_prefixes
+
+    documents = category_documents(args.data_dir, main.RETRIEVAL_K)
+    router = CategoryRouter()
+    router.bind(list(documents))
+    prompts = []
+    for entry in load_questions():
+        route = router.resolve(entry["category"])
+        if route is not None and route.target in documents:
+            prompts.append((documents[route.target], entry["prompt"]))
+
+    template = main.PROMPT_TEMPLATES["rag"]
+    template.prefix_tokens  # 서버 워밍업과 같이 prefix 토큰 수는 측정 전에 한 번 계산
+
+    baseline_model = FakeModelInference(prefill_delay=args.prefill_delay)
+    cached_model = FakeModelInference(prefill_delay=args.prefill_delay)
+    register_prefixes(cached_model, main.PROMPT_TEMPLATES.values())
+
+    print("⏱️ baseline 측정 중...")
+    baseline = run_variant(main, prompts, baseline_model, precompiled=False)
+    print("⏱️ precompiled 측정 중...")
+    precompiled = run_variant(main, prompts, cached_model, precompiled=True)
+
+    write_report({
+        "questions": len(prompts),
+        "prefill_delay": args.prefill_delay,
+        "templates": [template.describe() for template in main.PROMPT_TEMPLATES.values()],
+        "variants": {"baseline": baseline, "precompiled": precompiled},
+        "processed_tokens_saved_ratio": round(
+            1 - precompiled["processed_tokens_mean"] / baseline["processed_tokens_mean"], 4
+        ),
+        "simulated_ttft_p50_speedup": round(baseline["simulated_ttft"]["p50_ms"] / precompiled["simulated_ttft"]["p50_ms"], 2)
+        if precompiled["simulated_ttft"]["p50_ms"] else None,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main_benchmark()
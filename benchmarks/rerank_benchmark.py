@@ -0,0 +1,142 @@
+"""
+2단계 검색(cross-encoder 리랭커 + 적응형 절단) 벤치마크: 프롬프트 토큰 절감 vs 답변 품질
+
+VectorDB.py 로 인덱스를 만든 뒤 실행합니다.
+    python benchmarks/rerank_benchmark.py --min-scores 0.1 0.3 0.5 --gold gold.json --output rerank.json
+
+ragas/generated_questions.json 질문마다 main.py 검색 경로로
+- baseline: 기존 방식 (상위 RETRIEVAL_K 개를 모두 프롬프트에)
+- rerank@<min_score>: 후보 RERANK_CANDIDATES 개를 다시 채점해 min_score 이상만 (최소 RERANK_MIN_K 개)
+를 만들어 검색 문서 토큰 수, 프롬프트 토큰 수, 검색(+리랭크) 지연 시간, LLM 생성 시간과
+답변 품질(ragas/rag_evaluation.py 의 로컬 judge: answer_relevancy, faithfulness)을 비교합니다.
+--gold 를 주면 남은 청크 기준 recall / MRR 도 계산합니다.
+--fake-llm 은 지연 시간만 볼 때 사용합니다. (가짜 답변이라 답변 품질 점수는 의미 없음)
+"""
+import os
+import sys
+import time
+import argparse
+
+from bench_utils import ROOT_DIR, load_questions, load_gold, latency_summary, percentile, recall_and_mrr, write_report
+
+sys.path.insert(0, os.path.join(ROOT_DIR, "ragas"))
+
+
+def mean(values):
+    return round(sum(values) / len(values), 4) if values else None
+
+
+def run_variant(main, judge, separator, questions, embeddings, gold):
+    """현재 main.reranker 설정으로 모든 질문 처리 → 변형 하나의 지표"""
+    from context_packer import count_tokens
+
+    search_ms, generate_ms = [], []
+    chunks, context_tokens, prompt_tokens = [], [], []
+    scores = {"answer_relevancy": [], "faithfulness": []}
+    recalls, mrrs = [], []
+    for entry, query_embedding in zip(questions, embeddings):
+        route = main.category_router.resolve(entry["category"])
+        category = route.target if route is not None and route.target else entry["category"]
+        question = entry["prompt"]
+
+        started = time.perf_counter()
+        results = main.search_documents(category, question, query_embedding) or []
+        search_ms.append((time.perf_counter() - started) * 1000)
+
+        prompt, packed_tokens = main.generate_prompt(results, question)
+        chunks.append(len(results))
+        context_tokens.append(packed_tokens)
+        prompt_tokens.append(count_tokens(prompt))
+
+        started = time.perf_counter()
+        answer = main.load_watsonx_model().generate(prompt=prompt)["results"][0]["generated_text"]
+        generate_ms.append((time.perf_counter() - started) * 1000)
+
+        texts = [doc.page_content for doc in results]
+        for name, value in judge.score(question, answer, separator.join(texts)).items():
+            scores[name].append(value)
+        gold_passages = gold.get((entry["category"], question))
+        if gold_passages:
+            recall, mrr = recall_and_mrr(texts, gold_passages)
+            recalls.append(recall)
+            mrrs.append(mrr)
+
+    report = {
+        "chunks_mean": mean(chunks),
+        "context_tokens_mean": mean(context_tokens),
+        "context_tokens_p95": percentile(context_tokens, 95),
+        "prompt_tokens_mean": mean(prompt_tokens),
+        "search": latency_summary(search_ms),
+        "generate": latency_summary(generate_ms),
+        "answer_relevancy": mean(scores["answer_relevancy"]),
+        "faithfulness": mean(scores["faithfulness"]),
+    }
+    if recalls:
+        report.update({"gold_queries": len(recalls), "recall": mean(recalls), "mrr": mean(mrrs)})
+    return report
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="리랭커 프롬프트 토큰 절감 vs 답변 품질 벤치마크")
+    parser.add_argument("--min-scores", type=float, nargs="+", default=[0.3], help="비교할 리랭크 점수 기준")
+    parser.add_argument("--judge", default="lexical", help='답변 judge: "lexical" 또는 "cross-encoder:<모델>"')
+    parser.add_argument("--fake-llm", action="store_true", help="Watsonx 대신 가짜 LLM 사용 (지연 시간 측정용)")
+    parser.add_argument("--gold", help="gold 라벨 JSON (bench_utils.load_gold 형식)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    # 📌 main.py 는 import 시점에 환경 변수를 읽으므로 먼저 설정 (캐시는 꺼서 매 질문이 모든 단계를 거치도록)
+    os.environ.update({"ANSWER_CACHE_ENABLED": "0", "EMBEDDING_CACHE_SIZE": "0", "STARTUP_WARMUP": "0"})
+    if args.fake_llm:
+        os.environ["LLM_BACKEND"] = "fake"
+    import main
+    from reranker import CrossEncoderReranker
+    from rag_evaluation import create_judge, CONTEXT_SEPARATOR
+
+    main.bind_category_routes()
+    questions = load_questions()
+    gold = load_gold(args.gold)
+    judge = create_judge(args.judge)
+    embeddings = main.embedding_model.embed_queries([entry["prompt"] for entry in questions])
+
+    reranker = CrossEncoderReranker(
+        model_name=os.getenv("RERANK_MODEL", main.DEFAULT_RERANK_MODEL),
+        min_k=int(os.getenv("RERANK_MIN_K", "1")),
+        max_k=main.RETRIEVAL_K,
+        batch_size=int(os.getenv("RERANK_BATCH_SIZE", "32"))
+    )
+    started = time.perf_counter()
+    reranker.load()
+    load_seconds = time.perf_counter() - started
+
+    variants = {}
+    print("⏱️ baseline 측정 중...")
+    main.reranker = None
+    variants["baseline"] = run_variant(main, judge, CONTEXT_SEPARATOR, questions, embeddings, gold)
+    for min_score in args.min_scores:
+        print(f"⏱️ rerank@{min_score} 측정 중...")
+        reranker.min_score = min_score
+        main.reranker = reranker
+        variants[f"rerank@{min_score}"] = run_variant(main, judge, CONTEXT_SEPARATOR, questions, embeddings, gold)
+
+    baseline_tokens = variants["baseline"]["context_tokens_mean"]
+    for name, variant in variants.items():
+        if name != "baseline" and baseline_tokens:
+            variant["context_tokens_saved_ratio"] = round(1 - variant["context_tokens_mean"] / baseline_tokens, 4)
+
+    write_report({
+        "questions": len(questions),
+        "retrieval_mode": main.RETRIEVAL_MODE,
+        "candidates": main.RERANK_CANDIDATES,
+        "reranker": dict(
+            {key: value for key, value in reranker.config.items() if key != "min_score"},  # 점수 기준은 변형별
+            load_seconds=round(load_seconds, 2)
+        ),
+        "judge": judge.name,
+        "llm": "fake" if args.fake_llm else os.getenv("LLM_BACKEND", "watsonx"),
+        "variants": variants,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,185 @@
+"""
+검색 경로 벤치마크 (청크 방식, k, 임베딩 모델 변경 전/후 비교용)
+
+data/ 로 VectorDB.py 인덱스를 만든 뒤 ragas/generated_questions.json 질문을
+main.py 의 검색 경로(embed → search → pack → generate)에 그대로 흘려 보냅니다.
+LLM 은 가짜 모델(FakeModelInference)을 사용합니다.
+
+    python benchmarks/retrieval_benchmark.py --build --concurrency 1 4 16 --gold gold.json --output retrieval.json
+
+측정 항목
+- 단계별 지연 시간 p50/p95/p99 (embed, search, pack, generate, total)
+- 동시성 수준별 처리량 (질문/초)
+- 최대 RSS
+- gold 라벨이 있으면 recall@k / MRR
+같은 옵션으로 각 커밋에서 실행한 JSON 결과를 비교하면 됩니다.
+"""
+import os
+import time
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_utils import (
+    ROOT_DIR, load_questions, load_gold, latency_summary, recall_and_mrr, current_rss_mb, peak_rss_mb, write_report
+)
+
+STAGES = ("embed", "search", "pack", "generate", "total")
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_indexes(data_dir, persist_dir, layout, workers, full):
+    """VectorDB.py 로 벤치마크용 인덱스 생성 (증분 빌드이므로 두 번째부터는 빠름)"""
+    import VectorDB
+
+    started = time.perf_counter()
+    reports = VectorDB.prepare_chroma_db_by_category(data_dir, persist_dir, workers=workers, full_rebuild=full, layout=layout)
+    return {
+        "seconds": round(time.perf_counter() - started, 2),
+        "chunks": sum(report["chunks"] for report in reports),
+        "embedded": sum(report["added"] for report in reports),
+    }
+
+
+def run_question(main, entry):
+    """질문 하나를 main.py 검색 경로로 처리 → (단계별 ms, 검색된 문서 내용)"""
+    category, question = entry["category"], entry["prompt"]
+    route = main.category_router.resolve(category)
+    category = route.target if route is not None and route.target else category  # 별칭 → 인덱스 이름
+    timings = {}
+    started = time.perf_counter()
+
+    stage_started = time.perf_counter()
+    query_embedding = main.embed_query(question)
+    timings["embed"] = (time.perf_counter() - stage_started) * 1000
+
+    stage_started = time.perf_counter()
+    results = main.search_documents(category, question, query_embedding) or []
+    timings["search"] = (time.perf_counter() - stage_started) * 1000
+
+    stage_started = time.perf_counter()
+    prompt, _ = main.generate_prompt(results, question)
+    timings["pack"] = (time.perf_counter() - stage_started) * 1000
+
+    stage_started = time.perf_counter()
+    main.watsonx_model.generate(prompt=prompt)
+    timings["generate"] = (time.perf_counter() - stage_started) * 1000
+
+    timings["total"] = (time.perf_counter() - started) * 1000
+    return timings, [doc.page_content for doc in results]
+
+
+def run_level(main, questions, concurrency):
+    """한 동시성 수준에서 전체 질문 처리 → (단계별 지연 요약, 처리량, 질문별 검색 결과)"""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(lambda entry: run_question(main, entry), questions))
+    wall_seconds = time.perf_counter() - started
+
+    stages = {stage: latency_summary([timings[stage] for timings, _ in outcomes]) for stage in STAGES}
+    return {
+        "concurrency": concurrency,
+        "questions": len(questions),
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_qps": round(len(questions) / wall_seconds, 2) if wall_seconds else None,
+        "stages": stages,
+    }, [texts for _, texts in outcomes]
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="검색 경로 벤치마크 (embed / search / pack / generate)")
+    parser.add_argument("--data-dir", default=os.path.join(ROOT_DIR, "data"))
+    parser.add_argument("--persist-dir", default=os.path.join(tempfile.gettempdir(), "rag_retrieval_benchmark"))
+    parser.add_argument("--build", action="store_true", help="측정 전에 VectorDB.py 로 인덱스 생성/갱신")
+    parser.add_argument("--full", action="store_true", help="인덱스를 처음부터 다시 생성")
+    parser.add_argument("--build-workers", type=int, default=1)
+    parser.add_argument("--layout", choices=("per-category", "single"), default="per-category")
+    parser.add_argument("--retrieval-mode", choices=("dense", "hybrid"), default=os.getenv("RETRIEVAL_MODE", "hybrid"))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--token-delay", type=float, default=0.0, help="가짜 LLM 토큰당 지연 (초)")
+    parser.add_argument("--gold", help="gold 라벨 JSON (bench_utils.load_gold 형식)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    build = build_indexes(args.data_dir, args.persist_dir, args.layout, args.build_workers, args.full) if args.build else None
+
+    # 📌 main.py 는 import 시점에 환경 변수를 읽으므로 먼저 설정
+    # 답변 캐시와 질문 임베딩 캐시는 꺼서 매 질문이 모든 단계를 거치도록 함
+    os.environ.update({
+        "VECTOR_DB_DIR": args.persist_dir,
+        "VECTOR_DB_LAYOUT": args.layout,
+        "RETRIEVAL_MODE": args.retrieval_mode,
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_TOKEN_DELAY": str(args.token_delay),
+        "ANSWER_CACHE_ENABLED": "0",
+        "EMBEDDING_CACHE_SIZE": "0",
+    })
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+    import main
+    main.bind_category_routes()
+    main.warm_up()  # 모델/인덱스 로드 + 더미 질의 (서버의 백그라운드 워밍업과 같은 단계)
+    warmup_errors = main.startup_tracker.snapshot()["errors"]
+    if warmup_errors:  # 단계 실패는 워밍업이 삼키므로 측정 전에 직접 확인
+        raise RuntimeError(f"워밍업 실패: {warmup_errors}")
+    startup_seconds = time.perf_counter() - started
+    rss_after_load = current_rss_mb()
+
+    questions = load_questions()
+    gold = load_gold(args.gold)
+
+    levels = []
+    retrieved = None
+    for concurrency in args.concurrency:
+        print(f"⏱️ 동시성 {concurrency} 측정 중...")
+        level, texts = run_level(main, questions, concurrency)
+        levels.append(level)
+        retrieved = retrieved or texts
+
+    recalls, mrrs = [], []
+    for entry, texts in zip(questions, retrieved or []):
+        gold_passages = gold.get((entry["category"], entry["prompt"]))
+        if gold_passages:
+            recall, mrr = recall_and_mrr(texts, gold_passages)
+            recalls.append(recall)
+            mrrs.append(mrr)
+
+    k = main.RETRIEVAL_K
+    report = {
+        "revision": git_revision(),
+        "config": {
+            "layout": args.layout,
+            "retrieval_mode": args.retrieval_mode,
+            "k": k,
+            "hybrid_candidates": main.HYBRID_CANDIDATES,
+            "context_max_tokens": main.CONTEXT_MAX_TOKENS,
+            "embedding": main.embedding_config,
+            "token_delay": args.token_delay,
+        },
+        "build": build,
+        "startup_seconds": round(startup_seconds, 2),
+        "startup_phases": main.startup_tracker.snapshot()["phases"],
+        "rss_before_mb": rss_before,
+        "rss_after_load_mb": rss_after_load,
+        "peak_rss_mb": peak_rss_mb(),
+        "questions": len(questions),
+        "empty_results": sum(1 for texts in retrieved or [] if not texts),
+        "labelled_questions": len(recalls),
+        f"recall@{k}": round(sum(recalls) / len(recalls), 4) if recalls else None,
+        "mrr": round(sum(mrrs) / len(mrrs), 4) if mrrs else None,
+        "levels": levels,
+    }
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,99 @@
+"""
+서버 시작 시간 벤치마크 (포트 열림 / 워밍업 완료까지)
+
+    python benchmarks/startup_benchmark.py --runs 3 --output startup.json
+
+uvicorn 으로 main:app 을 새 프로세스에서 띄우고
+/healthz 가 처음 200 을 돌려준 시간(포트 열림)과 /readyz 가 200 이 된 시간(워밍업 완료)을 측정합니다.
+/readyz 응답의 단계별 시간(import, 임베딩 모델, 벡터DB, 더미 질의 등)도 함께 기록합니다.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import subprocess
+import urllib.error
+import urllib.request
+
+from bench_utils import ROOT_DIR, write_report
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get_status(url):
+    """(HTTP 상태, JSON 본문) (연결 실패 시 (None, None))"""
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None, None
+
+
+def measure_startup(port, timeout, env):
+    """서버 한 번 시작 → {"bind_seconds", "ready_seconds", "phases", ...}"""
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    bind_seconds = None
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"서버 프로세스 종료 (exit {server.returncode})")
+            if bind_seconds is None:
+                status, _ = get_status(f"{base_url}/healthz")
+                if status == 200:
+                    bind_seconds = time.perf_counter() - started
+            if bind_seconds is not None:
+                status, body = get_status(f"{base_url}/readyz")
+                if status == 200 or (body and body.get("error")):
+                    return {
+                        "bind_seconds": round(bind_seconds, 3),
+                        "ready_seconds": round(time.perf_counter() - started, 3),
+                        "ready": status == 200,
+                        "error": body.get("error"),
+                        "phases": body.get("phases"),
+                    }
+            time.sleep(0.05)
+        raise RuntimeError(f"{timeout}초 안에 준비되지 않음")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서버 시작 시간 벤치마크")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--fake-llm", action="store_true", help="Watsonx 대신 가짜 LLM 사용")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.fake_llm:
+        env["LLM_BACKEND"] = "fake"
+
+    runs = []
+    for run in range(args.runs):
+        print(f"⏱️ 서버 시작 측정 중 ({run + 1}/{args.runs})")
+        runs.append(measure_startup(free_port(), args.timeout, env))
+
+    write_report({
+        "runs": runs,
+        "bind_seconds_mean": round(sum(r["bind_seconds"] for r in runs) / len(runs), 3),
+        "ready_seconds_mean": round(sum(r["ready_seconds"] for r in runs) / len(runs), 3),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
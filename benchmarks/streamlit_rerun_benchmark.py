@@ -0,0 +1,69 @@
+"""
+Streamlit 프론트엔드(my_app.py) 스크립트 재실행(rerun) 시간 벤치마크
+
+Streamlit 은 입력마다 스크립트 전체를 다시 실행하므로, 페이지별로 rerun 을 반복해
+스크립트 실행 시간을 측정합니다. (streamlit.testing AppTest 사용, 브라우저 불필요)
+첫 실행은 캐시가 비어 있는 상태(cold), 이후 실행은 캐시가 채워진 상태(warm)입니다.
+
+    python benchmarks/streamlit_rerun_benchmark.py --reruns 20 --output rerun.json
+
+변경 전/후 비교는 같은 옵션으로 각 커밋에서 실행한 JSON 결과를 비교하면 됩니다.
+"""
+import os
+import time
+import argparse
+
+from streamlit.testing.v1 import AppTest
+
+from bench_utils import ROOT_DIR, latency_summary, write_report
+
+# 채팅 페이지는 백엔드 호출 없이 화면만 그리도록 대기 상태를 끈 채로 측정
+PAGES = {
+    "start": {},
+    "userinfo": {},
+    "home": {"user_name": "벤치마크"},
+    "counseling": {"user_name": "벤치마크"},
+    "chat_counseling": {"selected_category": "💰 금융", "waiting_for_response": False, "last_input": None},
+    "chat": {"waiting_for_chat_response": False, "last_chat_input": None},
+    "food": {"waiting_for_food_response": False, "last_food_input": None},
+}
+
+
+def measure_page(page, state, reruns, timeout):
+    app = AppTest.from_file(os.path.join(ROOT_DIR, "my_app.py"), default_timeout=timeout)
+    app.session_state["page"] = page
+    for key, value in state.items():
+        app.session_state[key] = value
+
+    timings_ms = []
+    for _ in range(reruns + 1):
+        started = time.perf_counter()
+        app.run()
+        timings_ms.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "page": page,
+        "cold_ms": round(timings_ms[0], 3),
+        "warm": latency_summary(timings_ms[1:]),
+        "exceptions": [str(e.value) for e in app.exception],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="my_app.py rerun 시간 벤치마크")
+    parser.add_argument("--pages", nargs="+", default=list(PAGES), choices=list(PAGES))
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    results = []
+    for page in args.pages:
+        print(f"⏱️ 페이지 측정 중: {page}")
+        results.append(measure_page(page, PAGES[page], args.reruns, args.timeout))
+
+    write_report({"reruns": args.reruns, "pages": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
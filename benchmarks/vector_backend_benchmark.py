@@ -0,0 +1,196 @@
+"""
+벡터 인덱스 백엔드(Chroma vs numpy memory-map) 비교 벤치마크
+
+두 백엔드 인덱스를 모두 VectorDB.py 로 만든 뒤 실행합니다.
+    python VectorDB.py --backend chroma
+    python VectorDB.py --backend numpy
+    python benchmarks/vector_backend_benchmark.py --processes 4 --output vector_backend.json
+
+백엔드마다 --processes 개의 자식 프로세스를 동시에 띄워 각각
+import/열기 시간, RSS(익명 메모리 / 파일 매핑), 질문 하나씩 검색과 카테고리별 일괄 검색 지연 시간을 측정합니다.
+numpy 백엔드는 임베딩 파일을 memory-map 하므로 프로세스가 늘어도 RssFile 은 page cache 한 벌을 공유합니다.
+질문 임베딩은 부모 프로세스에서 한 번만 계산해 자식 프로세스에 넘기고,
+두 백엔드의 상위 k개 청크 ID 가 얼마나 겹치는지도 보고합니다.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+from bench_utils import ROOT_DIR, load_questions, latency_summary, current_rss_mb, peak_rss_mb, rss_breakdown_mb, write_report
+
+BACKENDS = ("chroma", "numpy")
+
+
+def embed_questions(questions, output_path):
+    from embedding_backends import embedding_config_from_env, create_base_embeddings
+
+    embedding_model = create_base_embeddings(embedding_config_from_env())
+    vectors = embedding_model.embed_documents([entry["prompt"] for entry in questions])
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump([dict(entry, embedding=vector) for entry, vector in zip(questions, vectors)], f, ensure_ascii=False)
+
+
+def open_stores(backend, persist_dir):
+    """카테고리 이름 → (질문 하나 검색 함수, 일괄 검색 함수) (둘 다 청크 ID 목록 반환)"""
+    if backend == "numpy":
+        from numpy_index import NumpyVectorIndex, NUMPY_DIR
+
+        base_dir = os.path.join(persist_dir, NUMPY_DIR)
+        stores = {}
+        for name in sorted(os.listdir(base_dir)):
+            index = NumpyVectorIndex.load(os.path.join(base_dir, name))
+            stores[name] = (
+                lambda vector, k, index=index: [doc.id for doc, _ in index.search(vector, k)],
+                lambda vectors, k, index=index: [[doc.id for doc, _ in results] for results in index.search_batch(vectors, k)],
+            )
+        return stores
+
+    from langchain_chroma import Chroma
+
+    stores = {}
+    for name in sorted(os.listdir(persist_dir)):
+        if not os.path.isdir(os.path.join(persist_dir, name)) or name.startswith("_"):
+            continue
+        store = Chroma(persist_directory=os.path.join(persist_dir, name))
+        stores[name] = (
+            lambda vector, k, store=store: [doc.id for doc in store.similarity_search_by_vector(vector, k=k)],
+            lambda vectors, k, store=store: store._collection.query(query_embeddings=vectors, n_results=k, include=[])["ids"],
+        )
+    return stores
+
+
+def measure_backend(backend, persist_dir, embedded_path, k):
+    """자식 프로세스: 한 백엔드의 import/열기 비용과 검색 지연 측정"""
+    from category_router import CategoryRouter
+
+    with open(embedded_path, "r", encoding="utf-8") as f:
+        queries = json.load(f)
+
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+    stores = open_stores(backend, persist_dir)
+    # Chroma 는 첫 검색 시점에 HNSW 세그먼트를, numpy 는 임베딩 페이지를 읽으므로 워밍업 검색까지 열기 시간에 포함
+    for search, _ in stores.values():
+        search(queries[0]["embedding"], 1)
+    open_seconds = time.perf_counter() - started
+    rss_after_open = current_rss_mb()
+
+    # 📌 질문 카테고리 별칭(예: 건강의료 ↔ 건강 & 의료)을 실제 인덱스 이름으로 변환
+    router = CategoryRouter()
+    router.bind(list(stores))
+    groups = {}
+    for position, query in enumerate(queries):
+        route = router.resolve(query["category"])
+        if route is not None and route.target in stores:
+            groups.setdefault(route.target, []).append(position)
+
+    search_ms, top_ids = [], {}
+    for name, positions in groups.items():
+        search, _ = stores[name]
+        for position in positions:
+            started = time.perf_counter()
+            top_ids[position] = search(queries[position]["embedding"], k)
+            search_ms.append((time.perf_counter() - started) * 1000)
+
+    batch_ms = []
+    for name, positions in groups.items():
+        _, search_batch = stores[name]
+        started = time.perf_counter()
+        search_batch([queries[position]["embedding"] for position in positions], k)
+        batch_ms.append((time.perf_counter() - started) * 1000 / len(positions))
+
+    return {
+        "backend": backend,
+        "pid": os.getpid(),
+        "collections": len(stores),
+        "queries": sum(len(positions) for positions in groups.values()),
+        "missing_category_queries": len(queries) - sum(len(positions) for positions in groups.values()),
+        "open_seconds": round(open_seconds, 3),
+        "rss_before_mb": rss_before,
+        "rss_after_open_mb": rss_after_open,
+        "rss_open_delta_mb": round(rss_after_open - rss_before, 1),
+        "rss_breakdown_mb": rss_breakdown_mb(),
+        "peak_rss_mb": peak_rss_mb(),
+        "search": latency_summary(search_ms),
+        "batch_search_per_query": latency_summary(batch_ms),
+        "top_ids": {str(position): ids for position, ids in top_ids.items()},
+    }
+
+
+def run_backend(backend, processes, persist_dir, embedded_path, k):
+    """자식 프로세스 processes 개를 동시에 실행 → [측정 결과]"""
+    started = time.perf_counter()
+    children = [
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--worker-backend", backend,
+             "--persist-dir", persist_dir, "--embedded", embedded_path, "--k", str(k)],
+            stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(processes)
+    ]
+    results = []
+    for child in children:
+        stdout, _ = child.communicate()
+        if child.returncode != 0:
+            raise RuntimeError(f"{backend} 측정 프로세스 실패 (exit {child.returncode})")
+        results.append(json.loads(stdout.strip().splitlines()[-1]))
+    # 프로세스 시작(인터프리터 + import)부터 측정 종료까지의 시간
+    wall_seconds = time.perf_counter() - started
+    return results, wall_seconds
+
+
+def top_k_overlap(chroma_result, numpy_result, k):
+    """같은 질문에 대해 두 백엔드 상위 k개 청크 ID 가 겹치는 비율의 평균"""
+    overlaps = []
+    for position, chroma_ids in chroma_result["top_ids"].items():
+        numpy_ids = numpy_result["top_ids"].get(position)
+        if numpy_ids is not None and chroma_ids:
+            overlaps.append(len(set(chroma_ids) & set(numpy_ids)) / min(k, len(chroma_ids)))
+    return round(sum(overlaps) / len(overlaps), 4) if overlaps else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chroma vs numpy 벡터 인덱스 벤치마크")
+    parser.add_argument("--persist-dir", default=os.path.join(ROOT_DIR, "vectorDB"))
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--processes", type=int, default=1, help="백엔드마다 동시에 띄울 프로세스 수")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--worker-backend", help=argparse.SUPPRESS)
+    parser.add_argument("--embedded", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_backend:
+        print(json.dumps(measure_backend(args.worker_backend, args.persist_dir, args.embedded, args.k), ensure_ascii=False))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        embedded_path = os.path.join(tmp_dir, "queries.json")
+        embed_questions(load_questions(), embedded_path)
+
+        backends = {}
+        for backend in args.backends:
+            print(f"⏱️ 백엔드 측정 중: {backend} (프로세스 {args.processes}개)")
+            results, wall_seconds = run_backend(backend, args.processes, args.persist_dir, embedded_path, args.k)
+            backends[backend] = {
+                "wall_seconds": round(wall_seconds, 3),
+                "rss_anon_total_mb": round(sum(r["rss_breakdown_mb"].get("RssAnon", 0) for r in results), 1),
+                "rss_file_per_process_mb": [r["rss_breakdown_mb"].get("RssFile") for r in results],
+                "processes": results,
+            }
+
+    report = {"k": args.k, "processes": args.processes, "backends": backends}
+    if "chroma" in backends and "numpy" in backends:
+        report["top_k_overlap"] = top_k_overlap(backends["chroma"]["processes"][0], backends["numpy"]["processes"][0], args.k)
+    for backend in backends.values():
+        for result in backend["processes"]:
+            del result["top_ids"]  # 겹침 계산에만 사용
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
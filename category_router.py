@@ -0,0 +1,108 @@
+import re
+
+# 📌 검색(RAG) 카테고리: 정식 이름(프론트엔드 버튼 이름) → 별칭
+# 비교할 때 이모지, 공백, & 같은 기호는 무시하므로 "건강의료"(data/ 디렉토리), "💰 금융" 은 별칭 없이도 찾음
+RAG_CATEGORIES = {
+    "건강 & 의료": ("건강", "의료"),
+    "교육 & 학습": ("교육", "학습"),
+    "금융": (),
+    "보험": (),
+    "일자리": ("취업",),
+    "주거": (),
+    "지원 제도": (),
+    "휴대폰": ("휴대전화",),
+}
+
+# 📌 검색 없이 바로 답하는 카테고리 → 생성 프로필
+DIRECT_CATEGORIES = {
+    "general_chat": "chat",
+    "food_recommendation": "food",
+}
+
+
+def category_key(name):
+    """비교용 카테고리 키 (이모지, 공백, 기호 제거 + 소문자)"""
+    return re.sub(r"[\W_]+", "", name).lower()
+
+
+class Route:
+    """
+    카테고리 하나의 처리 경로
+
+    - kind: rag(검색 후 생성) 또는 direct(검색 없이 생성)
+    - target: 벡터DB/키워드 인덱스 카테고리 이름 (rag 인데 인덱스가 없으면 None)
+    - profile: 생성 프로필 이름
+    """
+    __slots__ = ("name", "kind", "target", "profile")
+
+    def __init__(self, name, kind, target=None, profile="rag"):
+        self.name = name
+        self.kind = kind
+        self.target = target
+        self.profile = profile
+
+    def to_dict(self):
+        return {"name": self.name, "kind": self.kind, "target": self.target, "profile": self.profile}
+
+
+class CategoryRouter:
+    """
+    요청 category 문자열 → Route
+
+    별칭은 생성 시 한 번만 정규화해 두고, 시작 시 bind() 로 실제 인덱스 이름과 연결합니다.
+    요청마다 파일시스템을 확인하지 않습니다.
+    """
+
+    def __init__(self, rag_categories=RAG_CATEGORIES, direct_categories=DIRECT_CATEGORIES, all_category="all"):
+        self._routes = {}
+        self.routes = []
+        for name, profile in direct_categories.items():
+            self._add(Route(name, "direct", profile=profile), [name])
+        for name, aliases in rag_categories.items():
+            self._add(Route(name, "rag"), [name, *aliases])
+        self._add(Route(all_category, "rag", target=all_category), [all_category])
+        self.all_category = all_category
+
+    def _add(self, route, names):
+        for name in names:
+            key = category_key(name)
+            if self._routes.get(key, route) is not route:
+                raise ValueError(f"카테고리 별칭 중복: '{name}' ({self._routes[key].name}, {route.name})")
+            self._routes[key] = route
+        self.routes.append(route)
+
+    def bind(self, indexed_categories):
+        """
+        실제 인덱스 카테고리 이름과 연결 → 경고 메시지 목록
+
+        - 등록된 카테고리는 정식 이름/별칭 중 인덱스가 있는 이름을 target 으로 사용
+        - 인덱스는 있지만 등록되지 않은 카테고리는 그 이름 그대로 rag 라우트로 추가
+        """
+        warnings = []
+        for route in self.routes:
+            if route.kind == "rag" and route.name != self.all_category:
+                route.target = None
+
+        for index_name in indexed_categories:
+            route = self._routes.get(category_key(index_name))
+            if route is None:
+                warnings.append(f"등록되지 않은 인덱스 카테고리 '{index_name}' (이름 그대로 사용)")
+                self._add(Route(index_name, "rag", target=index_name), [index_name])
+            elif route.kind == "direct":
+                warnings.append(f"검색 없이 답하는 카테고리 '{route.name}' 의 인덱스 '{index_name}' 는 사용하지 않음")
+            elif route.target is not None:
+                warnings.append(f"'{route.name}' 인덱스가 여러 개 ('{route.target}', '{index_name}') → '{route.target}' 사용")
+            else:
+                route.target = index_name
+
+        for route in self.routes:
+            if route.kind == "rag" and route.target is None:
+                warnings.append(f"인덱스가 없는 카테고리 '{route.name}'")
+        return warnings
+
+    def resolve(self, category):
+        """category 문자열 → Route (등록되지 않은 카테고리는 None)"""
+        return self._routes.get(category_key(category))
+
+    def describe(self):
+        return [route.to_dict() for route in self.routes]
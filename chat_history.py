@@ -0,0 +1,85 @@
+import os
+import uuid
+from collections import deque
+
+# 📌 대화 기록 한도 (세션당 메모리 상한)
+CHAT_HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "200"))  # 보관할 최대 메시지 수
+CHAT_HISTORY_WINDOW = int(os.getenv("CHAT_HISTORY_WINDOW", "30"))  # 한 번에 화면에 그릴 최근 메시지 수
+
+BUBBLE_PREFIX = {
+    "user": '<div class="user-bubble"><strong>Q:</strong> ',
+    "assistant": '<div class="assistant-bubble"><strong>A:</strong> '
+}
+
+
+class ChatMessage:
+    """대화 메시지 하나 (__slots__ 로 dict 보다 작게)"""
+    __slots__ = ("role", "content")
+
+    def __init__(self, role, content):
+        self.role = role
+        self.content = content
+
+    @property
+    def html(self):
+        return BUBBLE_PREFIX[self.role] + self.content + "</div>"
+
+
+class ChatHistory:
+    """
+    Streamlit 세션용 대화 기록
+
+    - 최대 max_messages 개만 보관하고, 넘치면 가장 오래된 메시지부터 버림 (버린 개수는 요약 줄로 표시)
+    - 화면에는 최근 window 개씩만 그리고, "이전 대화 더 보기" 로 한 화면씩 더 펼침
+    - 화면에 그릴 HTML 은 새 메시지가 오거나 창을 펼칠 때만 다시 만들고, 그 외 rerun 에서는 재사용
+    - session_id 는 백엔드 대화 세션 ID (대화를 새로 시작하면 새 ID)
+    """
+
+    def __init__(self, max_messages=CHAT_HISTORY_MAX_MESSAGES, window=CHAT_HISTORY_WINDOW):
+        self.session_id = uuid.uuid4().hex
+        self.window = window
+        self.pages = 1  # 화면에 펼친 페이지 수
+        self.dropped = 0  # 한도를 넘어 버린 메시지 수
+        self._messages = deque(maxlen=max_messages)
+        self._rendered = None  # (pages, html)
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __iter__(self):
+        return iter(self._messages)
+
+    def append(self, role, content):
+        if len(self._messages) == self._messages.maxlen:
+            self.dropped += 1
+        self._messages.append(ChatMessage(role, content))
+        self._rendered = None
+
+    def last(self):
+        return self._messages[-1] if self._messages else None
+
+    def clear(self):
+        self.session_id = uuid.uuid4().hex
+        self._messages.clear()
+        self.pages = 1
+        self.dropped = 0
+        self._rendered = None
+
+    def has_older(self):
+        """화면에 아직 펼치지 않은 이전 메시지가 있는지"""
+        return len(self._messages) > self.window * self.pages
+
+    def show_older(self):
+        self.pages += 1
+        self._rendered = None
+
+    def render_html(self):
+        """최근 메시지가 위로 오도록 창 안의 말풍선 HTML 을 이어 붙임 (새 메시지가 없으면 캐시 재사용)"""
+        if self._rendered is None or self._rendered[0] != self.pages:
+            visible = min(len(self._messages), self.window * self.pages)
+            parts = [self._messages[-i].html for i in range(1, visible + 1)]
+            hidden = len(self._messages) - visible + self.dropped
+            if hidden:
+                parts.append(f'<div class="loading-bubble">이전 대화 {hidden}개 생략</div>')
+            self._rendered = (self.pages, "".join(parts))
+        return self._rendered[1]
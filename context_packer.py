@@ -0,0 +1,116 @@
+import os
+import math
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# 📌 프롬프트 토큰 수를 셀 토크나이저 (로컬 경로 또는 로컬 캐시에 있는 모델 이름)
+PROMPT_TOKENIZER = os.getenv("PROMPT_TOKENIZER", "meta-llama/Llama-3.3-70B-Instruct")
+
+# 겹침으로 판단할 최소/최대 글자 수 (VectorDB.py 의 chunk_overlap=300 을 포함하도록 여유 있게)
+MIN_OVERLAP_CHARS = 20
+MAX_OVERLAP_CHARS = 400
+
+_tokenizer = None
+_tokenizer_loaded = False
+
+
+def get_tokenizer():
+    """
+    실제 모델 토크나이저를 로컬에서만 로드 (네트워크 다운로드 없음)
+
+    로드할 수 없으면 None 을 반환하고 UTF-8 바이트 기반 추정치를 사용합니다.
+    """
+    global _tokenizer, _tokenizer_loaded
+    if not _tokenizer_loaded:
+        _tokenizer_loaded = True
+        try:
+            from transformers import AutoTokenizer
+            _tokenizer = AutoTokenizer.from_pretrained(PROMPT_TOKENIZER, local_files_only=True)
+            logger.info(f"✅ 프롬프트 토크나이저 로드: {PROMPT_TOKENIZER}")
+        except Exception as e:
+            logger.warning(f"⚠️ 토크나이저 로드 실패 ({PROMPT_TOKENIZER}), 바이트 기반 추정 사용: {str(e)}")
+    return _tokenizer
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text):
+    """텍스트 토큰 수 (청크별로 캐시)"""
+    tokenizer = get_tokenizer()
+    if tokenizer is not None:
+        return len(tokenizer.encode(text, add_special_tokens=False))
+    # 한글은 UTF-8 3바이트 ≈ Llama-3 토큰 1개, 영문은 과대 추정되는 쪽이라 예산을 넘지 않음
+    return math.ceil(len(text.encode("utf-8")) / 3)
+
+
+def truncate_to_tokens(text, max_tokens):
+    """텍스트 앞부분을 max_tokens 이내로 자르기"""
+    tokenizer = get_tokenizer()
+    if tokenizer is not None:
+        ids = tokenizer.encode(text, add_special_tokens=False)[:max_tokens]
+        return tokenizer.decode(ids)
+    truncated = text
+    while truncated and count_tokens(truncated) > max_tokens:
+        truncated = truncated[:int(len(truncated) * max_tokens / count_tokens(truncated))]
+    return truncated
+
+
+def _overlap_length(left, right):
+    """left 의 끝부분과 right 의 앞부분이 겹치는 가장 긴 길이 (MIN_OVERLAP_CHARS 미만이면 0)"""
+    limit = min(len(left), len(right), MAX_OVERLAP_CHARS)
+    for size in range(limit, MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def remove_overlap(text, packed_texts):
+    """이미 담긴 청크와 겹치는 앞/뒤 부분을 text 에서 제거"""
+    for packed in packed_texts:
+        head = _overlap_length(packed, text)
+        if head:
+            text = text[head:]
+        tail = _overlap_length(text, packed)
+        if tail:
+            text = text[:-tail]
+    return text.strip()
+
+
+def pack_context(results, max_tokens=800):
+    """
+    검색 결과(관련도 순)를 토큰 예산 안에 채워 넣기
+
+    - 청크 간 chunk_overlap 으로 중복된 부분은 제거
+    - 관련도 순으로 넣되, 예산을 넘는 청크는 건너뛰고 더 작은 다음 청크를 시도
+    - 가장 관련 있는 청크 하나도 예산을 넘으면 앞부분만 잘라서 사용
+    반환: {"text", "tokens", "chunks", "skipped"}
+    """
+    packed = []
+    total_tokens = 0
+    skipped = 0
+
+    for doc in results:
+        text = remove_overlap(doc.page_content.strip(), packed)
+        if not text:
+            skipped += 1
+            continue
+        tokens = count_tokens(text)
+        if total_tokens + tokens > max_tokens:
+            skipped += 1
+            continue
+        packed.append(text)
+        total_tokens += tokens
+
+    if not packed and results:
+        text = truncate_to_tokens(results[0].page_content.strip(), max_tokens)
+        packed.append(text)
+        total_tokens = count_tokens(text)
+        skipped = len(results) - 1
+
+    return {
+        "text": "\n".join(packed),
+        "tokens": total_tokens,
+        "chunks": len(packed),
+        "skipped": skipped
+    }
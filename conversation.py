@@ -0,0 +1,114 @@
+import time
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# 📌 후속 질문으로 보는 시작 표현 ("그럼 신청은 어떻게 해요?" 처럼 앞 대화를 가리키는 질문)
+# ⚠️ "혹시", "또", "그리고" 로 시작하거나 짧은 질문("청년 월세 지원")은 대부분 그 자체로 완결된 질문이라 제외
+FOLLOW_UP_PREFIXES = (
+    "그럼", "그러면", "그렇다면", "그래서", "그런데", "근데", "그건", "그거", "그것", "그게", "그 ",
+    "이건", "이거", "이것", "이게", "저건", "거기", "여기", "아까", "방금"
+)
+
+
+def is_follow_up(question):
+    """앞 대화 없이는 뜻이 부족한 후속 질문인지 (형태소 분석 없이 시작 표현으로만 판단)"""
+    return question.strip().startswith(FOLLOW_UP_PREFIXES)
+
+
+def rewrite_follow_up(question, base_question):
+    """후속 질문 앞에 기준 질문(세션의 마지막 독립 질문)을 붙여 검색/답변에 쓸 질문으로 바꿈"""
+    return f"{base_question} {question.strip()}"
+
+
+class ConversationState:
+    """
+    세션 하나의 최근 대화 (기준 질문, 검색된 청크와 청크 임베딩)
+
+    question 은 재작성된 질문이 아니라 마지막 독립 질문입니다. (후속 질문이 이어져도 이전 질문이 계속 쌓이지 않도록)
+    """
+    __slots__ = ("category", "question", "results", "embeddings", "updated_at")
+
+    def __init__(self, category, question, results=None, embeddings=None):
+        self.category = category
+        self.question = question
+        self.results = results or []
+        self.embeddings = embeddings
+        self.updated_at = time.monotonic()
+
+    def reuse_context(self, query_embedding, threshold):
+        """
+        이전 검색 청크 중 새 질문과 코사인 유사도가 threshold 이상인 청크만 유사도 순으로 반환
+
+        가장 가까운 청크도 threshold 미만이면 None (새로 검색해야 함)
+        """
+        if not self.results or self.embeddings is None:
+            return None
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = self.embeddings @ query
+        if scores.max() < threshold:
+            return None
+        order = np.argsort(-scores)
+        return [self.results[i] for i in order if scores[i] >= threshold]
+
+
+class SessionStore:
+    """
+    대화 세션 상태 저장소 (LRU + TTL, 프로세스 메모리)
+
+    세션마다 기준 질문과 검색된 청크(ID, 내용, 정규화된 임베딩)만 보관합니다.
+    """
+
+    def __init__(self, max_sessions=1000, ttl_seconds=1800):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id, category):
+        """같은 카테고리의 살아 있는 세션 상태 (없거나 만료되었으면 None)"""
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                return None
+            if time.monotonic() - state.updated_at > self.ttl_seconds:
+                del self._sessions[session_id]
+                return None
+            if state.category != category:
+                return None
+            self._sessions.move_to_end(session_id)
+            return state
+
+    def remember_question(self, session_id, category, question):
+        """검색 없이 답한 경우(답변 캐시 적중, 이전 문맥 재사용)에도 기준 질문은 기록"""
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is not None and state.category == category:
+                state.question = question
+                state.updated_at = time.monotonic()
+                self._sessions.move_to_end(session_id)
+                return
+        self._store(session_id, ConversationState(category, question))
+
+    def put(self, session_id, category, question, results, embeddings):
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1, norms)
+        self._store(session_id, ConversationState(category, question, list(results), matrix))
+
+    def _store(self, session_id, state):
+        with self._lock:
+            self._sessions[session_id] = state
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds
+            }
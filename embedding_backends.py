@@ -0,0 +1,122 @@
+import os
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 📌 인덱스 디렉토리에 저장하는 임베딩 모델 정보 파일
+EMBEDDING_INFO_FILE = "embedding.json"
+
+DEFAULT_EMBEDDING_MODEL = "BAAI/bge-large-en"
+
+# embedding.json 이 없는 기존 인덱스는 bge-large-en (정규화 없음) 으로 만들어졌음
+LEGACY_EMBEDDING_INFO = {"model_name": DEFAULT_EMBEDDING_MODEL, "dimension": 1024, "normalize": False}
+
+# int8 양자화 ONNX 파일 기본 경로 (Hugging Face 모델 저장소에 함께 배포되는 파일명)
+DEFAULT_INT8_ONNX_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+
+class EmbeddingMismatchError(Exception):
+    """인덱스를 만든 임베딩 모델과 현재 질문 임베딩 모델이 다른 경우"""
+
+
+def embedding_config_from_env():
+    """
+    환경 변수로 임베딩 백엔드 설정
+
+    - EMBEDDING_MODEL: 모델 이름 (기본 BAAI/bge-large-en)
+    - EMBEDDING_DIM: 기대 차원 (지정하면 인덱스 정보와 비교)
+    - EMBEDDING_NORMALIZE: 1 이면 벡터 정규화
+    - EMBEDDING_RUNTIME: torch | onnx (CPU 추론용, `pip install optimum[onnxruntime]` 필요)
+    - EMBEDDING_QUANTIZE: none | int8 (onnx 런타임에서 양자화 모델 사용)
+    - EMBEDDING_ONNX_FILE: 사용할 ONNX 파일 경로 (모델 저장소 기준)
+    """
+    return parse_embedding_config(
+        os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL),
+        runtime=os.getenv("EMBEDDING_RUNTIME", "torch"),
+        quantize=os.getenv("EMBEDDING_QUANTIZE", "none"),
+        dimension=int(os.getenv("EMBEDDING_DIM", "0")) or None,
+        normalize=os.getenv("EMBEDDING_NORMALIZE", "0") == "1",
+        onnx_file=os.getenv("EMBEDDING_ONNX_FILE")
+    )
+
+
+def parse_embedding_config(model_name, runtime="torch", quantize="none", dimension=None, normalize=False, onnx_file=None):
+    if runtime not in ("torch", "onnx"):
+        raise ValueError(f"지원하지 않는 임베딩 런타임: {runtime}")
+    if quantize not in ("none", "int8"):
+        raise ValueError(f"지원하지 않는 양자화 방식: {quantize}")
+    if quantize == "int8" and runtime != "onnx":
+        raise ValueError("int8 양자화는 onnx 런타임에서만 사용할 수 있습니다.")
+    if quantize == "int8" and not onnx_file:
+        onnx_file = DEFAULT_INT8_ONNX_FILE
+    return {
+        "model_name": model_name,
+        "runtime": runtime,
+        "quantize": quantize,
+        "dimension": dimension,
+        "normalize": normalize,
+        "onnx_file": onnx_file
+    }
+
+
+def parse_backend_spec(spec, normalize=False):
+    """벤치마크용 "모델[:런타임[:양자화]]" 문자열 → 설정 (예: intfloat/multilingual-e5-small:onnx:int8)"""
+    model_name, _, rest = spec.partition(":")
+    runtime, _, quantize = rest.partition(":")
+    return parse_embedding_config(model_name, runtime=runtime or "torch", quantize=quantize or "none", normalize=normalize)
+
+
+def create_base_embeddings(config):
+    """설정에 맞는 HuggingFaceEmbeddings 생성 (onnx 런타임은 sentence-transformers ONNX 백엔드 사용)"""
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    model_kwargs = {}
+    if config["runtime"] == "onnx":
+        model_kwargs["backend"] = "onnx"
+        if config["onnx_file"]:
+            model_kwargs["model_kwargs"] = {"file_name": config["onnx_file"]}
+
+    logger.info(f"📦 임베딩 모델 로드: {config['model_name']} ({config['runtime']}, {config['quantize']})")
+    return HuggingFaceEmbeddings(
+        model_name=config["model_name"],
+        model_kwargs=model_kwargs,
+        encode_kwargs={"normalize_embeddings": config["normalize"]}
+    )
+
+
+def index_embedding_info(config, dimension):
+    """인덱스에 기록할 정보 (런타임/양자화는 같은 모델이면 호환되므로 참고용으로만 기록)"""
+    return {
+        "model_name": config["model_name"],
+        "dimension": dimension,
+        "normalize": config["normalize"],
+        "runtime": config["runtime"],
+        "quantize": config["quantize"]
+    }
+
+
+def read_index_embedding_info(index_dir):
+    info_path = os.path.join(index_dir, EMBEDDING_INFO_FILE)
+    if not os.path.exists(info_path):
+        return None
+    with open(info_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_index_embedding_info(index_dir, info):
+    with open(os.path.join(index_dir, EMBEDDING_INFO_FILE), "w", encoding="utf-8") as f:
+        json.dump(info, f, ensure_ascii=False, indent=2)
+
+
+def check_index_embedding(index_dir, config):
+    """인덱스를 만든 모델과 현재 설정이 다르면 EmbeddingMismatchError"""
+    info = read_index_embedding_info(index_dir) or LEGACY_EMBEDDING_INFO
+    mismatches = [
+        f"{key}: 인덱스={info.get(key)} / 현재={config[key]}"
+        for key in ("model_name", "normalize", "dimension")
+        if config.get(key) is not None and info.get(key) != config[key]
+    ]
+    if mismatches:
+        raise EmbeddingMismatchError(f"임베딩 모델 불일치 ({index_dir}): " + ", ".join(mismatches))
+    return info
@@ -0,0 +1,195 @@
+import time
+import queue
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from langchain_core.embeddings import Embeddings
+
+from metrics import Histogram, BATCH_SIZE_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingService(Embeddings):
+    """
+    임베딩 모델 앞단의 서비스 계층
+
+    - embed_query: 최근 질문 임베딩을 LRU 로 기억하고, 동시에 들어온 질문들을
+      batch_window_ms 동안 모아 한 번의 forward pass 로 임베딩 (micro-batching)
+    - embed_documents: 대량 적재 시 ingest_batch_size 단위로 나눠서 임베딩
+    - 배치 크기와 지연 시간 히스토그램을 stats() 로 제공
+    - base_factory 를 주면 모델은 첫 사용(또는 load()) 시점에 로드 (서버 시작 시 포트를 먼저 열기 위함)
+    """
+
+    def __init__(self, base_embeddings=None, cache_size=2048, batch_window_ms=5, max_batch_size=32, ingest_batch_size=64,
+                 base_factory=None):
+        if base_embeddings is None and base_factory is None:
+            raise ValueError("base_embeddings 또는 base_factory 가 필요합니다.")
+        self._base = base_embeddings
+        self._base_factory = base_factory
+        self._base_lock = threading.Lock()
+        self.cache_size = cache_size
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.ingest_batch_size = ingest_batch_size
+
+        self._cache = OrderedDict()  # 질문 → 임베딩
+        self._cache_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.histograms = {
+            "query_batch_size": Histogram(BATCH_SIZE_BUCKETS),
+            "query_batch_seconds": Histogram(),
+            "query_seconds": Histogram(),
+            "ingest_batch_size": Histogram(BATCH_SIZE_BUCKETS),
+            "ingest_batch_seconds": Histogram()
+        }
+
+    @property
+    def base(self):
+        if self._base is None:
+            self.load()
+        return self._base
+
+    @property
+    def loaded(self):
+        return self._base is not None
+
+    def load(self):
+        """임베딩 모델 로드 (이미 로드됐으면 바로 반환, 동시에 호출돼도 한 번만 로드)"""
+        if self._base is not None:
+            return self._base
+        with self._base_lock:
+            if self._base is None:
+                self._base = self._base_factory()
+        return self._base
+
+    # ------------------------------------------------------------------
+    # 질문 임베딩 (LRU + micro-batching)
+    # ------------------------------------------------------------------
+    def embed_query(self, text):
+        started = time.perf_counter()
+        with self._cache_lock:
+            vector = self._cache.get(text)
+            if vector is not None:
+                self._cache.move_to_end(text)
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+        if vector is None:
+            vector = self._submit(text).result()
+            with self._cache_lock:
+                self._cache[text] = vector
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        self.histograms["query_seconds"].observe(time.perf_counter() - started)
+        return list(vector)
+
+    def embed_queries(self, texts):
+        """
+        여러 질문을 한 번에 임베딩 (/ask/batch 용)
+
+        캐시에 없는 질문만 모아 한 번의 forward pass 로 임베딩합니다.
+        """
+        started = time.perf_counter()
+        vectors = {}
+        with self._cache_lock:
+            for text in texts:
+                vector = self._cache.get(text)
+                if vector is not None:
+                    self._cache.move_to_end(text)
+                    vectors[text] = vector
+                    self.cache_hits += 1
+                else:
+                    self.cache_misses += 1
+
+        missing = list(dict.fromkeys(text for text in texts if text not in vectors))
+        if missing:
+            batch_started = time.perf_counter()
+            computed = self.base.embed_documents(missing)
+            self.histograms["query_batch_seconds"].observe(time.perf_counter() - batch_started)
+            self.histograms["query_batch_size"].observe(len(missing))
+            with self._cache_lock:
+                for text, vector in zip(missing, computed):
+                    vectors[text] = vector
+                    self._cache[text] = vector
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        self.histograms["query_seconds"].observe(time.perf_counter() - started)
+        return [list(vectors[text]) for text in texts]
+
+    def _submit(self, text):
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._batch_loop, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _batch_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.batch_window
+            # 첫 질문이 들어온 뒤 batch_window 동안 들어온 질문을 함께 처리
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            texts = list(dict.fromkeys(text for text, _ in batch))  # 같은 질문은 한 번만 임베딩
+            started = time.perf_counter()
+            try:
+                vectors = dict(zip(texts, self.base.embed_documents(texts)))
+            except Exception as e:
+                logger.error(f"❌ 질문 임베딩 오류: {str(e)}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.histograms["query_batch_seconds"].observe(time.perf_counter() - started)
+            self.histograms["query_batch_size"].observe(len(texts))
+            for text, future in batch:
+                future.set_result(vectors[text])
+
+    # ------------------------------------------------------------------
+    # 문서 임베딩 (대량 적재)
+    # ------------------------------------------------------------------
+    def embed_documents(self, texts):
+        vectors = []
+        for start in range(0, len(texts), self.ingest_batch_size):
+            batch = texts[start:start + self.ingest_batch_size]
+            started = time.perf_counter()
+            vectors.extend(self.base.embed_documents(batch))
+            self.histograms["ingest_batch_seconds"].observe(time.perf_counter() - started)
+            self.histograms["ingest_batch_size"].observe(len(batch))
+        return vectors
+
+    def stats(self):
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "loaded": self.loaded,
+            "cache": {
+                "size": len(self._cache),
+                "max_size": self.cache_size,
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_rate": round(self.cache_hits / lookups, 4) if lookups else None
+            },
+            "histograms": {name: histogram.snapshot() for name, histogram in self.histograms.items()}
+        }
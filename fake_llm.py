@@ -0,0 +1,82 @@
+import time
+import asyncio
+
+
+class FakeModelInference:
+    """
+    오프라인 테스트용 ModelInference 대체 모델
+
+    Watsonx.ai 를 호출하지 않고 고정된 답변을 토큰 단위로 돌려줍니다.
+    LLM_BACKEND=fake 로 서버를 띄우면 main.py 가 이 모델을 사용합니다.
+
+    prefill_delay 를 주면 입력 토큰(공백 단위)마다 첫 토큰 전 지연을 흉내 내고,
+    cache_prefix() 로 등록한 앞부분으로 시작하는 프롬프트는 그 부분의 prefill 을 건너뜁니다. (서버 prefix caching 흉내)
+    """
+
+    DEFAULT_ANSWER = "- **핵심 정보**: 테스트용 답변이에요.\n- **추가 설명**: 실제 모델을 호출하지 않았어요.\n- **관련 정보**: 없음"
+
+    def __init__(self, model_id="fake/model", params=None, answer=None, token_delay=0.0, prefill_delay=0.0, **kwargs):
+        self.model_id = model_id
+        self.params = params or {}
+        self.answer = answer or self.DEFAULT_ANSWER
+        self.token_delay = token_delay  # 토큰 하나당 지연 시간 (초)
+        self.prefill_delay = prefill_delay  # 입력 토큰 하나당 prefill 시간 (초)
+        self._prefixes = []  # 캐시된 prompt 앞부분 (긴 것부터)
+
+    def cache_prefix(self, prefix):
+        if prefix not in self._prefixes:
+            self._prefixes.append(prefix)
+            self._prefixes.sort(key=len, reverse=True)
+
+    def _input_tokens(self, prompt):
+        """(입력 토큰 수, 캐시된 앞부분 토큰 수)"""
+        total = len(prompt.split())
+        prefix = next((prefix for prefix in self._prefixes if prompt.startswith(prefix)), None)
+        if prefix is None:
+            return total, 0
+        return total, total - len(prompt[len(prefix):].split())
+
+    def _prefill_seconds(self, prompt):
+        total, cached = self._input_tokens(prompt)
+        return self.prefill_delay * (total - cached)
+
+    def _tokens(self, params=None):
+        # 공백을 유지한 채로 단어 단위로 쪼개서 스트리밍 토큰처럼 사용 (max_new_tokens 까지만)
+        words = self.answer.split(" ")
+        tokens = [word if i == 0 else " " + word for i, word in enumerate(words)]
+        max_new_tokens = (params or self.params).get("max_new_tokens")
+        return tokens[:max_new_tokens] if max_new_tokens else tokens
+
+    def _response(self, prompt, params=None):
+        tokens = self._tokens(params)
+        input_tokens, cached_tokens = self._input_tokens(prompt)
+        return {
+            "model_id": self.model_id,
+            "results": [{
+                "generated_text": "".join(tokens),
+                "generated_token_count": len(tokens),
+                "input_token_count": input_tokens,
+                "cached_input_token_count": cached_tokens,
+                "stop_reason": "eos_token"
+            }]
+        }
+
+    def generate(self, prompt, params=None, **kwargs):
+        time.sleep(self._prefill_seconds(prompt) + self.token_delay * len(self._tokens(params)))
+        return self._response(prompt, params)
+
+    def generate_text_stream(self, prompt, params=None, **kwargs):
+        time.sleep(self._prefill_seconds(prompt))
+        for token in self._tokens(params):
+            time.sleep(self.token_delay)
+            yield token
+
+    async def agenerate(self, prompt, params=None, **kwargs):
+        await asyncio.sleep(self._prefill_seconds(prompt) + self.token_delay * len(self._tokens(params)))
+        return self._response(prompt, params)
+
+    async def agenerate_stream(self, prompt, params=None, **kwargs):
+        await asyncio.sleep(self._prefill_seconds(prompt))
+        for token in self._tokens(params):
+            await asyncio.sleep(self.token_delay)
+            yield token
@@ -0,0 +1,145 @@
+import os
+import re
+import json
+import unicodedata
+from collections import Counter
+
+import numpy as np
+from langchain_core.documents import Document
+
+# 📌 키워드 인덱스 저장 위치 (vectorDB/_lexical/<카테고리>/)
+LEXICAL_DIR = "_lexical"
+
+WORD_PATTERN = re.compile(r"[0-9a-z가-힣]+")
+HANGUL_PATTERN = re.compile(r"[가-힣]")
+
+
+def tokenize(text):
+    """
+    한국어용 토큰화: 한글 단어는 글자 2-gram, 영문/숫자 단어는 단어 그대로
+
+    형태소 분석기 없이도 "청년도약계좌" 와 "청년 도약 계좌" 처럼
+    띄어쓰기가 다른 표현이 같은 토큰을 공유하도록 합니다.
+    """
+    tokens = []
+    for word in WORD_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()):
+        if len(word) > 1 and HANGUL_PATTERN.search(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+class LexicalIndex:
+    """
+    BM25 역색인 (CSR 형태의 numpy 배열로 저장, 읽을 때는 memory-map)
+
+    저장 파일
+    - indptr.npy / postings_doc.npy / postings_tf.npy: 토큰별 (문서 번호, 빈도) 목록
+    - doc_len.npy: 문서별 토큰 수
+    - vocab.json: 토큰 → 번호, docs.jsonl: 문서 ID / 내용 / metadata
+    """
+
+    def __init__(self, vocab, indptr, postings_doc, postings_tf, doc_len, docs, k1=1.5, b=0.75):
+        self.vocab = vocab
+        self.indptr = indptr
+        self.postings_doc = postings_doc
+        self.postings_tf = postings_tf
+        self.doc_len = doc_len
+        self.docs = docs
+        self.k1 = k1
+        self.b = b
+        self.avgdl = float(doc_len.mean()) if len(doc_len) else 0.0
+        doc_freq = np.diff(indptr).astype(np.float32)
+        n_docs = len(doc_len)
+        self.idf = np.log(1 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+        # 문서 길이 정규화 항은 질의와 무관하므로 미리 계산
+        self.length_norm = (k1 * (1 - b + b * np.asarray(doc_len) / self.avgdl)).astype(np.float32) if n_docs else doc_len
+
+    @classmethod
+    def build(cls, ids, texts, metadatas):
+        """청크 목록으로 인덱스 생성"""
+        vocab = {}
+        term_docs = []  # 토큰 번호 → [(문서 번호, 빈도)]
+        doc_len = np.zeros(len(texts), dtype=np.float32)
+        for doc_index, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_len[doc_index] = sum(counts.values())
+            for token, tf in counts.items():
+                term_id = vocab.setdefault(token, len(vocab))
+                if term_id == len(term_docs):
+                    term_docs.append([])
+                term_docs[term_id].append((doc_index, tf))
+
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(postings) for postings in term_docs])
+        postings_doc = np.array([d for postings in term_docs for d, _ in postings], dtype=np.int32)
+        postings_tf = np.array([tf for postings in term_docs for _, tf in postings], dtype=np.float32)
+        docs = [{"id": i, "page_content": t, "metadata": m or {}} for i, t, m in zip(ids, texts, metadatas)]
+        return cls(vocab, indptr, postings_doc, postings_tf, doc_len, docs)
+
+    def save(self, index_dir):
+        os.makedirs(index_dir, exist_ok=True)
+        np.save(os.path.join(index_dir, "indptr.npy"), self.indptr)
+        np.save(os.path.join(index_dir, "postings_doc.npy"), self.postings_doc)
+        np.save(os.path.join(index_dir, "postings_tf.npy"), self.postings_tf)
+        np.save(os.path.join(index_dir, "doc_len.npy"), self.doc_len)
+        with open(os.path.join(index_dir, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(self.vocab, f, ensure_ascii=False)
+        with open(os.path.join(index_dir, "docs.jsonl"), "w", encoding="utf-8") as f:
+            for doc in self.docs:
+                f.write(json.dumps(doc, ensure_ascii=False) + "\n")
+
+    @classmethod
+    def load(cls, index_dir):
+        """저장된 인덱스 로드 (numpy 배열은 memory-map 으로 열어 여러 프로세스가 page cache 공유)"""
+        arrays = {
+            name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+            for name in ("indptr", "postings_doc", "postings_tf", "doc_len")
+        }
+        with open(os.path.join(index_dir, "vocab.json"), "r", encoding="utf-8") as f:
+            vocab = json.load(f)
+        with open(os.path.join(index_dir, "docs.jsonl"), "r", encoding="utf-8") as f:
+            docs = [json.loads(line) for line in f if line.strip()]
+        return cls(vocab, docs=docs, **arrays)
+
+    def search(self, query, k=5):
+        """BM25 상위 k개 → [(Document, 점수)]"""
+        term_ids = [self.vocab[token] for token in set(tokenize(query)) if token in self.vocab]
+        if not term_ids or not self.docs:
+            return []
+
+        scores = np.zeros(len(self.docs), dtype=np.float32)
+        for term_id in term_ids:
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            doc_index = self.postings_doc[start:end]
+            tf = self.postings_tf[start:end]
+            scores[doc_index] += self.idf[term_id] * tf * (self.k1 + 1) / (tf + self.length_norm[doc_index])
+
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._document(int(i)), float(scores[i])) for i in top]
+
+    def _document(self, doc_index):
+        doc = self.docs[doc_index]
+        return Document(id=doc["id"], page_content=doc["page_content"], metadata=doc["metadata"])
+
+
+def reciprocal_rank_fusion(result_lists, k, rrf_k=60):
+    """
+    여러 검색 결과 목록을 RRF 로 합쳐 상위 k개 Document 반환
+
+    같은 청크는 내용이 같으므로 page_content 로 동일 여부를 판단합니다.
+    """
+    scores = {}
+    docs = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results):
+            key = doc.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank + 1)
+            docs.setdefault(key, doc)
+    ranked = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [docs[key] for key in ranked]
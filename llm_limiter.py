@@ -0,0 +1,53 @@
+import asyncio
+
+
+class LLMOverloadedError(Exception):
+    """동시 LLM 호출 한도와 대기열이 모두 가득 찬 경우"""
+
+
+class LLMConcurrencyLimiter:
+    """
+    LLM 동시 호출 수를 제한하는 비동기 리미터
+
+    - max_concurrency 만큼만 동시에 LLM 을 호출
+    - 대기 중인 요청이 max_waiting 을 넘으면 LLMOverloadedError (→ 429 응답)
+    """
+
+    def __init__(self, max_concurrency, max_waiting):
+        self.max_concurrency = max_concurrency
+        self.max_waiting = max_waiting
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        self._active = 0
+        self.rejected = 0
+
+    async def acquire(self):
+        if self._semaphore.locked() and self._waiting >= self.max_waiting:
+            self.rejected += 1
+            raise LLMOverloadedError(f"LLM 대기열이 가득 찼습니다 (동시 {self.max_concurrency}, 대기 {self._waiting})")
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._active += 1
+
+    def release(self):
+        self._active -= 1
+        self._semaphore.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+    def stats(self):
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_waiting": self.max_waiting,
+            "active": self._active,
+            "waiting": self._waiting,
+            "rejected": self.rejected
+        }
@@ -1,12 +1,43 @@
 import os
+import json
+import time
+import uuid
+import random
+import asyncio
 import logging
-from fastapi import FastAPI
+import functools
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+# ⏱️ 시작 단계 시간 측정 기준 (아래 패키지 import 시간부터 포함)
+PROCESS_STARTED = time.perf_counter()
+
+from typing import Optional, List
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_chroma import Chroma
-from ibm_watsonx_ai.foundation_models import ModelInference
-from ibm_watsonx_ai.foundation_models.utils.enums import DecodingMethods
+from langchain_core.documents import Document
+from vector_registry import VectorDBRegistry, SINGLE_COLLECTION_DIR, open_chroma_store, close_chroma_store
+from fake_llm import FakeModelInference
+from llm_limiter import LLMConcurrencyLimiter, LLMOverloadedError
+from answer_cache import AnswerCache
+from embedding_service import EmbeddingService
+from embedding_backends import embedding_config_from_env, create_base_embeddings, check_index_embedding, EmbeddingMismatchError
+from lexical_index import LexicalIndex, LEXICAL_DIR, reciprocal_rank_fusion
+from numpy_index import NumpyVectorIndex, NUMPY_DIR
+from context_packer import pack_context
+from prompt_templates import PromptTemplate, register_prefixes
+from reranker import CrossEncoderReranker, DEFAULT_RERANK_MODEL
+from category_router import CategoryRouter
+from conversation import SessionStore, is_follow_up, rewrite_follow_up
+from metrics import REGISTRY, ExistingHistogram, RequestIdFilter, request_id_var, request_spans_var, span
+from warmup import StartupTracker
+
+# 📌 무거운 패키지(langchain_chroma, ibm_watsonx_ai, sentence-transformers)는 처음 쓰는 시점에 import
+# 포트는 바로 열고, 모델/인덱스 로드는 백그라운드 워밍업에서 진행 (/readyz 로 완료 확인)
+startup_tracker = StartupTracker(started=PROCESS_STARTED)
 
 # 📌 환경 변수 로드
 load_dotenv()
@@ -14,10 +45,22 @@ load_dotenv()
 # 📌 FastAPI 앱 초기화
 app = FastAPI()
 
-# 📌 로깅 설정 (로그를 보기 쉽게 설정)
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+# 📌 로깅 설정 (로그를 보기 쉽게 설정, 요청 ID 포함)
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - [%(request_id)s] %(message)s")
+for handler in logging.getLogger().handlers:
+    handler.addFilter(RequestIdFilter())
 logger = logging.getLogger(__name__)
 
+# 📌 질문/검색 문서/답변 전문은 DEBUG 로 기록 (LOG_PAYLOAD_SAMPLE_RATE 비율만큼은 INFO 로 샘플링)
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0"))
+
+
+def log_payload(message):
+    if LOG_PAYLOAD_SAMPLE_RATE and random.random() < LOG_PAYLOAD_SAMPLE_RATE:
+        logger.info(message)
+    else:
+        logger.debug(message)
+
 # 📌 Watsonx.ai 설정
 project_id = os.getenv("PROJECT_ID", None)
 wml_credentials = {
@@ -26,74 +69,356 @@ wml_credentials = {
 }
 
 parameters = {
-    "decoding_method": DecodingMethods.GREEDY.value,
+    "decoding_method": "greedy",  # DecodingMethods.GREEDY.value
     "max_new_tokens": 700,
     "min_new_tokens": 300,
     "repetition_penalty": 1,
     "stop_sequences": ["<|endoftext|>"]
 }
 
-# 📌 Watsonx.ai 모델 초기화 (FastAPI 시작 시 로드)
-@app.on_event("startup")
+# 📌 생성 프로필 (검색 없이 답하는 카테고리는 짧게, 최소 길이 없이)
+light_parameters = {key: value for key, value in parameters.items() if key != "min_new_tokens"}
+light_parameters["max_new_tokens"] = int(os.getenv("LIGHT_MAX_NEW_TOKENS", "300"))
+GENERATION_PROFILES = {
+    "rag": parameters,
+    "chat": light_parameters,
+    "food": light_parameters
+}
+
+# 📌 동시성 설정
+# - 임베딩/벡터 검색은 제한된 스레드풀에서 실행
+# - LLM 호출은 동시 호출 수와 대기열 길이를 제한 (초과 시 429)
+retrieval_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("RETRIEVAL_WORKERS", "4")),
+    thread_name_prefix="retrieval"
+)
+llm_limiter = LLMConcurrencyLimiter(
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+    max_waiting=int(os.getenv("LLM_MAX_WAITING", "32"))
+)
+
+# 📌 Watsonx.ai 모델 (워밍업에서 초기화, 워밍업 전에 요청이 오면 그 시점에 초기화)
+watsonx_model = None
+watsonx_model_lock = threading.Lock()
+
+
 def load_watsonx_model():
     global watsonx_model
-    watsonx_model = ModelInference(
-        model_id="meta-llama/llama-3-3-70b-instruct",
-        credentials=wml_credentials,
-        project_id=project_id,
-        params=parameters
-    )
-    logger.info("✅ Watsonx.ai 모델이 성공적으로 로드되었습니다.")
+    if watsonx_model is not None:
+        return watsonx_model
+    with watsonx_model_lock:
+        if watsonx_model is not None:
+            return watsonx_model
+        if os.getenv("LLM_BACKEND", "watsonx") == "fake":
+            # 오프라인 테스트용 가짜 모델 (Watsonx 호출 없음)
+            model = FakeModelInference(
+                params=parameters,
+                token_delay=float(os.getenv("FAKE_LLM_TOKEN_DELAY", "0")),
+                prefill_delay=float(os.getenv("FAKE_LLM_PREFILL_DELAY", "0"))
+            )
+            logger.info("🧪 가짜 LLM(FakeModelInference)을 사용합니다.")
+        else:
+            from ibm_watsonx_ai.foundation_models import ModelInference
+
+            model = ModelInference(
+                model_id="meta-llama/llama-3-3-70b-instruct",
+                credentials=wml_credentials,
+                project_id=project_id,
+                params=parameters
+            )
+            logger.info("✅ Watsonx.ai 모델이 성공적으로 로드되었습니다.")
+        # ♻️ prefix caching 을 지원하는 클라이언트면 공통 시스템 prefix 등록 (PROMPT_PREFIX_CACHE=0 이면 끔)
+        if os.getenv("PROMPT_PREFIX_CACHE", "1") == "1":
+            registered = register_prefixes(model, PROMPT_TEMPLATES.values())
+            if registered:
+                logger.info(f"♻️ 프롬프트 prefix {registered}개 캐시 등록")
+        watsonx_model = model
+        return watsonx_model
 
 # 📌 ChromaDB 설정
-base_persist_directory = os.path.join(os.path.dirname(__file__), "vectorDB")
-embedding_model = HuggingFaceEmbeddings(model_name="BAAI/bge-large-en")
+base_persist_directory = os.getenv("VECTOR_DB_DIR", os.path.join(os.path.dirname(__file__), "vectorDB"))
+embedding_config = embedding_config_from_env()
+embedding_model = EmbeddingService(
+    base_factory=lambda: create_base_embeddings(embedding_config),
+    cache_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "2048")),
+    batch_window_ms=float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5")),
+    max_batch_size=int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "32"))
+)
+
+
+# 📌 벡터DB 저장 방식 (VectorDB.py --layout 과 같게 설정)
+# - per-category: 카테고리별 persist 디렉토리
+# - single: vectorDB/_all 하나의 컬렉션, category metadata 로 필터링
+VECTOR_DB_LAYOUT = os.getenv("VECTOR_DB_LAYOUT", "per-category")
+ALL_CATEGORIES = "all"  # 전체 카테고리 검색용 category 값
+
+# 📌 벡터 인덱스 백엔드 (VectorDB.py --backend 와 같게 설정)
+# - chroma: Chroma (SQLite + HNSW)
+# - numpy: vectorDB/_numpy/<카테고리>/ memory-map 인덱스 (정확한 top-k, per-category 레이아웃 전용)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+if VECTOR_BACKEND == "numpy" and VECTOR_DB_LAYOUT == "single":
+    raise ValueError("numpy 벡터 백엔드는 per-category 레이아웃만 지원합니다.")
+
+def load_chroma_db(category, path):
+    """Chroma 벡터DB 열기 (인덱스를 만든 임베딩 모델이 현재 설정과 다르면 거부)"""
+    with span("vectordb_load"):
+        check_index_embedding(path, embedding_config)
+        return open_chroma_store(path, embedding_model)
+
+
+def close_chroma_db(category, store):
+    close_chroma_store(store)
+
+
+def load_numpy_index(category, path):
+    """numpy 벡터 인덱스 열기 (임베딩 파일은 memory-map 으로 열어 워커 프로세스끼리 page cache 공유)"""
+    with span("vectordb_load"):
+        check_index_embedding(path, embedding_config)
+        return NumpyVectorIndex.load(path)
+
+
+def load_lexical_index(category, path):
+    with span("lexical_load"):
+        return LexicalIndex.load(path)
+
+
+vector_db_registry = VectorDBRegistry(
+    os.path.join(base_persist_directory, NUMPY_DIR) if VECTOR_BACKEND == "numpy" else base_persist_directory,
+    loader=load_numpy_index if VECTOR_BACKEND == "numpy" else load_chroma_db,
+    max_resident_mb=float(os.getenv("VECTOR_DB_MAX_MB", "0")) or None,
+    closer=None if VECTOR_BACKEND == "numpy" else close_chroma_db
+)
+
+# 📌 키워드(BM25) 인덱스 (VectorDB.py 가 vectorDB/_lexical/<카테고리> 에 생성)
+lexical_base_directory = os.path.join(base_persist_directory, LEXICAL_DIR)
+lexical_registry = VectorDBRegistry(lexical_base_directory, loader=load_lexical_index)
+
+# 📌 검색 방식: dense(벡터 검색만) 또는 hybrid(벡터 + BM25 를 RRF 로 결합)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))  # 결합 전 각 검색기에서 가져올 후보 수
+
+
+# 📌 카테고리 라우터 (요청 category 별칭 → 인덱스 이름, 검색 없이 답하는 카테고리 구분)
+category_router = CategoryRouter(all_category=ALL_CATEGORIES)
+
+
+def indexed_categories():
+    """인덱스가 만들어진 카테고리 이름 (single 레이아웃은 카테고리별 manifest 기준)"""
+    if VECTOR_DB_LAYOUT == "single":
+        manifest_dir = os.path.join(base_persist_directory, SINGLE_COLLECTION_DIR, "manifests")
+        if not os.path.isdir(manifest_dir):
+            return []
+        return sorted(os.path.splitext(name)[0] for name in os.listdir(manifest_dir) if name.endswith(".json"))
+    return vector_db_registry.categories()
+
+
+def bind_category_routes():
+    """시작 시 카테고리 별칭을 실제 인덱스와 연결하고 검증 (요청마다 디렉토리를 확인하지 않도록)"""
+    for warning in category_router.bind(indexed_categories()):
+        logger.warning(f"⚠️ 카테고리 라우터: {warning}")
+    routes = ", ".join(f"{route.name}→{route.target or route.kind}" for route in category_router.routes)
+    logger.info(f"🧭 카테고리 라우트: {routes}")
+
+
+def preload_vector_dbs():
+    """모든 카테고리 벡터DB를 미리 로드 (VECTOR_DB_PRELOAD=0 이면 첫 사용 시 로드)"""
+    if os.getenv("VECTOR_DB_PRELOAD", "1") != "1":
+        return
+    if VECTOR_DB_LAYOUT == "single":
+        vector_db_registry.get(SINGLE_COLLECTION_DIR)
+    else:
+        vector_db_registry.preload()
+
+
+def preload_lexical_indexes():
+    if os.getenv("VECTOR_DB_PRELOAD", "1") == "1" and RETRIEVAL_MODE == "hybrid":
+        lexical_registry.preload()
+
+
+RETRIEVAL_K = 5  # 상위 5개 검색
+
+# 📌 2단계 검색: 후보를 넓게(RERANK_CANDIDATES) 가져와 cross-encoder 로 다시 채점하고
+# 점수가 RERANK_MIN_SCORE 이상인 청크만 (최소 RERANK_MIN_K, 최대 RETRIEVAL_K 개) 프롬프트에 넣음
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))
+reranker = CrossEncoderReranker(
+    model_name=os.getenv("RERANK_MODEL", DEFAULT_RERANK_MODEL),
+    min_score=float(os.getenv("RERANK_MIN_SCORE", "0.3")),
+    min_k=int(os.getenv("RERANK_MIN_K", "1")),
+    max_k=RETRIEVAL_K,
+    batch_size=int(os.getenv("RERANK_BATCH_SIZE", "32"))
+) if os.getenv("RERANK_ENABLED", "0") == "1" else None
 
 
 def get_category_vector_db(category):
-    """카테고리에 맞는 벡터DB 로드"""
-    category_db_path = os.path.join(base_persist_directory, category.strip())
-    logger.info(f"📌 벡터DB 경로 확인: {category_db_path}")
+    """
+    카테고리에 맞는 벡터DB 로드 (레지스트리에 상주한 DB 재사용)
 
-    if not os.path.exists(category_db_path):
-        logger.warning(f"❌ 벡터DB 없음: {category}")
-        return None
+    with 문으로 사용: 블록 동안 고정되므로 다른 요청의 LRU 해제나 재로드로 검색 도중 닫히지 않습니다.
+    """
+    return vector_db_registry.use(category)
+
+
+@app.get("/embeddings/stats")
+def embedding_stats():
+    """임베딩 백엔드 설정, 질문 임베딩 캐시 적중률, 배치 크기/지연 시간 히스토그램"""
+    return dict(embedding_model.stats(), config=embedding_config)
+
+
+@app.get("/rerank/config")
+def rerank_config():
+    """2단계 검색(리랭커) 설정"""
+    if reranker is None:
+        return {"enabled": False}
+    return dict(reranker.config, enabled=True, candidates=RERANK_CANDIDATES)
+
+
+@app.get("/vectordb/stats")
+def vector_db_stats():
+    """카테고리별 로드 시간 및 상주 크기 조회"""
+    return dict(vector_db_registry.stats(), backend=VECTOR_BACKEND, lexical=lexical_registry.stats())
+
+
+@app.post("/vectordb/reload")
+def reload_vector_db(category: Optional[str] = None):
+    """
+    벡터DB 재로드 (category 미지정 시 전체, 키워드 인덱스 포함, 카테고리 라우트도 다시 연결)
+
+    이전 청크로 만든 답변이 남지 않도록 재로드한 카테고리(단일 컬렉션 레이아웃이면 전체)의 답변 캐시도 비웁니다.
+    """
+    bind_category_routes()
+    if category is not None:
+        route = category_router.resolve(category)
+        category = route.target if route is not None and route.target else category
+    reloaded = {"reloaded": vector_db_registry.reload(category), "lexical_reloaded": lexical_registry.reload(category)}
+    if answer_cache is not None:
+        cache_category = None if VECTOR_DB_LAYOUT == "single" else category
+        reloaded["answer_cache_cleared"] = answer_cache.clear(cache_category)
+    return reloaded
+
+
+@app.get("/prompts")
+def list_prompt_templates():
+    """
+    생성 프로필별 프롬프트 prefix 크기 (prefix caching 지원 여부 포함)
+
+    prefix_cache 는 클라이언트에 cache_prefix() 가 있는 경우(현재는 FakeModelInference 뿐)만 true 입니다.
+    Watsonx 는 prefix 등록 API 가 없어 전체 프롬프트를 보내며, 재사용 여부는 서버의 자동 prefix caching 에 달려 있습니다.
+    """
+    return {
+        "templates": [template.describe() for template in PROMPT_TEMPLATES.values()],
+        "prefix_cache": watsonx_model is not None and hasattr(watsonx_model, "cache_prefix"),
+    }
+
+
+@app.get("/categories")
+def list_categories():
+    """카테고리 라우트 (이름, 처리 방식, 인덱스 이름, 생성 프로필)"""
+    return {"routes": category_router.describe()}
+
+
+# 📌 답변 캐시 설정 (정확 일치 → 임베딩 유사도 순으로 조회)
+answer_cache = AnswerCache(
+    max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000")),
+    ttl_seconds=int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600")),
+    similarity_threshold=float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95")),
+    persist_path=os.getenv("ANSWER_CACHE_PATH"),
+    embedding_model=embedding_config["model_name"]
+) if os.getenv("ANSWER_CACHE_ENABLED", "1") == "1" else None
+
+
+def load_answer_cache():
+    if answer_cache is not None:
+        answer_cache.load()
+
+
+@app.on_event("shutdown")
+def save_answer_cache():
+    if answer_cache is not None:
+        answer_cache.save()
+
+
+# 📌 /metrics 지표 (Prometheus 텍스트 형식)
+CACHE_LOOKUPS = REGISTRY.counter("rag_answer_cache_lookups_total", "답변 캐시 조회 결과 (exact, semantic, miss)", ("result",))
+LLM_TOKENS = REGISTRY.counter("rag_llm_tokens_total", "LLM 토큰 수 (input, cached_input, generated)", ("kind",))
+PROMPT_TOKENS = REGISTRY.counter("rag_prompt_tokens_total", "보낸 프롬프트 토큰 수 (total, shared_prefix)", ("kind",))
+ERRORS = REGISTRY.counter("rag_errors_total", "카테고리별 오류 수 (unknown_category, no_db, embedding_mismatch, search, rerank, generation, overloaded)", ("category", "kind"))
+RERANK_KEPT = REGISTRY.histogram("rag_rerank_kept_chunks", "리랭크 후 프롬프트에 남은 청크 수", buckets=(0, 1, 2, 3, 4, 5, 10))
+ROUTE_SECONDS = REGISTRY.histogram("rag_route_seconds", "카테고리 라우트별 요청 처리 시간 (스트리밍은 done 프레임까지)", ("route", "kind"))
+HTTP_REQUESTS = REGISTRY.counter("rag_http_requests_total", "HTTP 요청 수", ("method", "path", "status"))
+HTTP_SECONDS = REGISTRY.histogram("rag_http_request_seconds", "HTTP 요청 처리 시간 (스트리밍은 응답 시작까지)", ("path",))
+for histogram_name, histogram in embedding_model.histograms.items():
+    REGISTRY.register(ExistingHistogram(f"rag_embedding_{histogram_name}", f"임베딩 서비스 {histogram_name}", histogram))
+REGISTRY.gauge("rag_llm_active", "실행 중인 LLM 호출 수", lambda: llm_limiter.stats()["active"])
+REGISTRY.gauge("rag_llm_waiting", "LLM 슬롯을 기다리는 요청 수", lambda: llm_limiter.stats()["waiting"])
+REGISTRY.gauge("rag_llm_rejected", "LLM 과부하로 거절된 누적 요청 수", lambda: llm_limiter.stats()["rejected"])
+
+
+# 📌 요청 로그를 남기지 않는 경로 (수집기/프로브가 자주 호출)
+QUIET_PATHS = {"/metrics", "/healthz", "/readyz"}
+
+
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    """요청 ID 설정 (X-Request-ID 헤더가 있으면 그대로 사용), 요청 시간과 단계별 span 기록"""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:12]
+    request_id_var.set(request_id)
+    spans = {}
+    request_spans_var.set(spans)
+
+    started = time.perf_counter()
+    response = await call_next(request)
+    seconds = time.perf_counter() - started
+
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"  # 라벨 수가 늘지 않도록 라우트 경로 사용
+    HTTP_REQUESTS.inc(method=request.method, path=path, status=response.status_code)
+    HTTP_SECONDS.observe(seconds, path=path)
+    response.headers["X-Request-ID"] = request_id
+    if path not in QUIET_PATHS:
+        logger.info(f"⏱️ {request.method} {path} {response.status_code} {round(seconds * 1000, 1)}ms spans={spans}")
+    return response
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Prometheus 형식 지표 (단계별 시간, 캐시 적중, LLM 토큰, 카테고리별 오류 등)"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
-    logger.info(f"✅ 벡터DB 로드 성공: {category}")
-    return Chroma(
-        persist_directory=category_db_path,
-        embedding_function=embedding_model
-    ).as_retriever(search_kwargs={"k": 5})  # 상위 5개 검색
+
+@app.get("/cache/stats")
+def cache_stats():
+    """답변 캐시 적중/미스 통계"""
+    if answer_cache is None:
+        return {"enabled": False}
+    return dict(answer_cache.stats(), enabled=True)
+
+
+@app.post("/cache/clear")
+def clear_cache():
+    if answer_cache is not None:
+        answer_cache.clear()
+    return {"cleared": answer_cache is not None}
 
 
 class QueryRequest(BaseModel):
     prompt: str  # 사용자 질문
     category: str  # 선택된 카테고리
+    session_id: Optional[str] = None  # 대화 세션 ID (있으면 후속 질문 재작성, 이전 검색 문맥 재사용)
 
-def trim_knowledge_base(results, max_tokens=800):
-    """검색된 문서를 길이 제한에 맞게 다듬는 함수"""
-    knowledge_base = ""
-    total_tokens = 0
-
-    for doc in results:
-        doc_tokens = len(doc.page_content.split())
-        if total_tokens + doc_tokens > max_tokens:
-            break
-        knowledge_base += doc.page_content + "\n"
-        total_tokens += doc_tokens
+# 📌 검색 문서에 쓸 프롬프트 토큰 예산 (실제 LLM 토크나이저 기준)
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "800"))
 
-    return knowledge_base.strip()
 
+def trim_knowledge_base(results, max_tokens=CONTEXT_MAX_TOKENS):
+    """검색된 문서를 토큰 예산에 맞게 담기 (중복 겹침 제거) → {"text", "tokens", "chunks", "skipped"}"""
+    with span("prompt"):
+        packed = pack_context(results, max_tokens=max_tokens)
+    logger.debug(f"📦 컨텍스트 {packed['chunks']}개 청크, {packed['tokens']} 토큰 (건너뜀 {packed['skipped']}개)")
+    return packed
 
-def generate_prompt(results, user_question):
-    """검색된 문서를 기반으로 AI 프롬프트 생성"""
-    if not results:
-        knowledge_base = "관련된 참고 자료를 찾을 수 없습니다. 아래 질문에 대해 최대한 명확히 답변해 주세요."
-    else:
-        knowledge_base = trim_knowledge_base(results, max_tokens=800)
 
-    return f"""<|begin_of_text|><|start_header_id|>system<|end_header_id|>
-당신은 보호종료아동을 대상으로 답변하는 친절하고 정확한 AI 비서입니다.
+# 📌 검색 기반 답변의 시스템 지시문 (모든 요청에 똑같은 부분)
+RAG_SYSTEM_PROMPT = """당신은 보호종료아동을 대상으로 답변하는 친절하고 정확한 AI 비서입니다.
 답변할 때 다음의 규칙을 반드시 모두 지켜주세요.
 
 - 최대한 쉬운 단어로 풀어서 설명하세요. 너에게 질문하는 사람들은 기초 지식이 매우 낮습니다. 단어들을 중학생도 이해하기 쉬운 말로 대체해서 의미를 풀어서 설명해주세요.
@@ -107,13 +432,35 @@ def generate_prompt(results, user_question):
 - 질문자들은 이력, 경력, 인맥이 전혀 없는 사람들입니다. 이력서와 인맥을 잘 쌓으라고 추천하지 마세요.
 - 조언 시, 그냥 제도만 알려주기보다 방법을 더욱 자세히 설명해주세요. 예를 들어 아르바이트를 추천하기보다 아르바이트를 얻는 법을 자세하게 알려주세요.
 - 질문자가 물어본 것에만 대답하세요. 관련없는 대답은 금지입니다.
-- 일자리와 보험은 관련 없는것입니다. 보험과 주거는 관련 없는것입니다. 휴대폰과 일자리는 관련 없는것입니다.
+- 일자리와 보험은 관련 없는것입니다. 보험과 주거는 관련 없는것입니다. 휴대폰과 일자리는 관련 없는것입니다."""
+
+# 📌 검색 없이 답하는 카테고리의 시스템 프롬프트 (생성 프로필별)
+DIRECT_SYSTEM_PROMPTS = {
+    "chat": """당신은 보호종료아동의 이야기를 들어주는 다정한 친구 같은 AI 입니다.
+- 상냥하고 친절한 말투로, "해요체"를 사용해주세요.
+- 길게 설명하기보다 대화하듯 짧고 따뜻하게 답해주세요.
+- 한글 이외의 문자 표기는 절대금지입니다.""",
+    "food": """당신은 보호종료아동에게 음식과 맛집을 추천하는 친절한 AI 입니다.
+- 상냥하고 친절한 말투로, "해요체"를 사용해주세요.
+- 부담 없는 가격의 메뉴를 우선 추천하고, 추천 이유를 한두 문장으로 덧붙여주세요.
+- 한글 이외의 문자 표기는 절대금지입니다."""
+}
+
+
+# 📌 생성 프로필별 프롬프트 템플릿 (시작 시 한 번만 만들고, prefix 토큰 수도 한 번만 계산)
+# 요청마다 바뀌는 검색 문서와 질문은 뒤쪽 body 에만 들어가므로 prefix 는 모든 요청에서 같은 바이트
+PROMPT_TEMPLATES = {
+    "rag": PromptTemplate(
+        "rag",
+        prefix=f"""<|begin_of_text|><|start_header_id|>system<|end_header_id|>
+{RAG_SYSTEM_PROMPT}
 
 ### 검색된 정보:  
-{knowledge_base}
+""",
+        body="""{knowledge_base}
 
 **사용자 질문:**  
-"{user_question}"
+"{question}"
 
 ### 답변:
 - **핵심 정보**: 
@@ -121,60 +468,992 @@ def generate_prompt(results, user_question):
 - **관련 정보**: 
 <|eot_id|><|start_header_id|>assistant<|end_header_id|>
 """
+    ),
+    **{
+        profile: PromptTemplate(
+            profile,
+            prefix=f"""<|begin_of_text|><|start_header_id|>system<|end_header_id|>
+{system_prompt}
+<|eot_id|><|start_header_id|>user<|end_header_id|>
+""",
+            body="""{question}
+<|eot_id|><|start_header_id|>assistant<|end_header_id|>
+"""
+        )
+        for profile, system_prompt in DIRECT_SYSTEM_PROMPTS.items()
+    }
+}
+
+
+def generate_prompt(results, user_question):
+    """검색된 문서를 기반으로 AI 프롬프트 생성 → (프롬프트, 검색 문서 토큰 수)"""
+    if not results:
+        knowledge_base = "관련된 참고 자료를 찾을 수 없습니다. 아래 질문에 대해 최대한 명확히 답변해 주세요."
+        context_tokens = 0
+    else:
+        packed = trim_knowledge_base(results)
+        knowledge_base = packed["text"]
+        context_tokens = packed["tokens"]
+
+    prompt = PROMPT_TEMPLATES["rag"].render(knowledge_base=knowledge_base, question=user_question)
+    return prompt, context_tokens
+
+
+def generate_direct_prompt(user_question, profile):
+    """검색 없이 답하는 카테고리용 프롬프트"""
+    return PROMPT_TEMPLATES[profile].render(question=user_question)
+
+
+def route_prompt(route, results, user_question):
+    """라우트에 맞는 (프롬프트, 검색 문서 토큰 수)"""
+    if route.kind == "direct":
+        return generate_direct_prompt(user_question, route.profile), 0
+    return generate_prompt(results, user_question)
+
+
+def prompt_token_usage(profile, prompt):
+    """
+    프롬프트 토큰 수 → {"prompt_tokens", "prefix_tokens"} (prefix 는 캐시된 토큰 수, 나머지만 새로 계산)
+
+    prefix_tokens 는 모든 요청에 같은 바이트로 앞에 오는 부분이라 LLM 서버의 자동 prefix caching 이 재사용할 수 있는 토큰 수입니다.
+    """
+    template = PROMPT_TEMPLATES[profile]
+    prompt_tokens = template.count_tokens(prompt)
+    PROMPT_TOKENS.inc(prompt_tokens, kind="total")
+    PROMPT_TOKENS.inc(template.prefix_tokens, kind="shared_prefix")
+    return {"prompt_tokens": prompt_tokens, "prefix_tokens": template.prefix_tokens}
+
+
+def resolve_route(category):
+    """
+    요청 category → Route (시작 시 검증한 라우트 테이블 조회)
+
+    등록되지 않은 카테고리는 None, 인덱스가 없는 rag 카테고리는 target 이 None 입니다.
+    """
+    route = category_router.resolve(category)
+    if route is None:
+        logger.warning(f"❌ 등록되지 않은 카테고리: '{category}'")
+        ERRORS.inc(category="unknown", kind="unknown_category")
+    elif route.kind == "rag" and route.target is None:
+        logger.warning(f"❌ 인덱스가 없는 카테고리: '{route.name}'")
+        ERRORS.inc(category=route.name, kind="no_db")
+    return route
+
+
+def route_has_data(route):
+    return route is not None and (route.kind == "direct" or route.target is not None)
+
+
+def embed_query(question):
+    with span("embed"):
+        return embedding_model.embed_query(question)
+
+
+def embed_queries(questions):
+    with span("embed"):
+        return embedding_model.embed_queries(questions)
+
+
+def search_dense(category, query_embedding, k):
+    """
+    벡터 검색 (벡터DB가 없으면 None)
+
+    category 가 "all" 이면 전체 카테고리에서 검색합니다.
+    single 레이아웃은 한 번의 검색, per-category 레이아웃은 카테고리마다 검색 후 병합합니다.
+    """
+    if VECTOR_DB_LAYOUT == "single":
+        name = SINGLE_COLLECTION_DIR
+        search_filter = None if category == ALL_CATEGORIES else {"category": category}
+    elif category == ALL_CATEGORIES:
+        return search_all_category_dbs(query_embedding, k)
+    else:
+        name = category
+        search_filter = None
+
+    with get_category_vector_db(name) as vector_db:
+        if vector_db is None:
+            return None
+        return vector_db.similarity_search_by_vector(query_embedding, k=k, filter=search_filter)
+
+
+def search_dense_batch(category, query_embeddings, k):
+    """
+    같은 카테고리의 여러 질문을 한 번의 Chroma 질의로 벡터 검색 (벡터DB가 없으면 None)
+
+    per-category 레이아웃의 전체 카테고리 검색("all")은 질문마다 search_dense 로 처리합니다.
+    """
+    if VECTOR_DB_LAYOUT != "single" and category == ALL_CATEGORIES:
+        return [search_all_category_dbs(query_embedding, k) for query_embedding in query_embeddings]
+
+    if VECTOR_DB_LAYOUT == "single":
+        name = SINGLE_COLLECTION_DIR
+        search_filter = None if category == ALL_CATEGORIES else {"category": category}
+    else:
+        name = category
+        search_filter = None
+
+    with get_category_vector_db(name) as vector_db:
+        if vector_db is None:
+            return None
+
+        if VECTOR_BACKEND == "numpy":
+            return [[doc for doc, _ in results] for results in vector_db.search_batch(query_embeddings, k)]
+
+        # 📌 langchain 래퍼는 질문 하나씩만 받으므로 Chroma 컬렉션에 직접 여러 질문을 전달
+        response = vector_db._collection.query(
+            query_embeddings=query_embeddings,
+            n_results=k,
+            where=search_filter,
+            include=["documents", "metadatas"]
+        )
+    return [
+        [
+            Document(id=doc_id, page_content=text, metadata=metadata or {})
+            for doc_id, text, metadata in zip(ids, texts, metadatas)
+        ]
+        for ids, texts, metadatas in zip(response["ids"], response["documents"], response["metadatas"])
+    ]
+
+
+def search_all_category_dbs(query_embedding, k):
+    """per-category 레이아웃에서 모든 카테고리를 각각 검색하고 거리순으로 병합"""
+    scored = []
+    for category in vector_db_registry.categories():
+        with get_category_vector_db(category) as vector_db:
+            if vector_db is not None:
+                scored.extend(vector_db.similarity_search_by_vector_with_relevance_scores(query_embedding, k=k))
+    scored.sort(key=lambda pair: pair[1])  # Chroma 점수는 거리 (작을수록 가까움)
+    return [doc for doc, _ in scored[:k]]
+
+
+def search_lexical(category, question, k):
+    """BM25 키워드 검색 (키워드 인덱스가 없는 카테고리는 빈 결과)"""
+    categories = lexical_registry.categories() if category == ALL_CATEGORIES else [category]
+    scored = []
+    for name in categories:
+        if not os.path.isdir(os.path.join(lexical_base_directory, name)):
+            continue
+        lexical_index = lexical_registry.get(name)
+        if lexical_index is not None:
+            scored.extend(lexical_index.search(question, k))
+    scored.sort(key=lambda pair: pair[1], reverse=True)
+    return [doc for doc, _ in scored[:k]]
+
+
+def search_documents(category, question, query_embedding, mode=None):
+    """
+    카테고리에서 질문과 관련된 문서 검색 (벡터DB가 없으면 None)
+
+    hybrid 모드는 벡터 검색과 BM25 검색 후보를 RRF 로 합쳐 상위 RETRIEVAL_K 개를 반환합니다.
+    키워드 인덱스가 없으면 벡터 검색 결과만 사용합니다.
+    리랭커를 쓰면 후보를 넓게 가져와 다시 채점한 뒤 관련 있는 청크만 남깁니다.
+    """
+    mode = mode or RETRIEVAL_MODE
+    candidates = first_stage_candidates(mode)
+
+    try:
+        with span("search"):
+            results = search_dense(category, query_embedding, candidates)
+    except EmbeddingMismatchError as e:
+        logger.error(f"❌ {str(e)}")
+        ERRORS.inc(category=category, kind="embedding_mismatch")
+        return None
+    if results is None:
+        logger.error(f"❌ 벡터DB를 찾을 수 없음: {category}")
+        ERRORS.inc(category=category, kind="no_db")
+        return None
+    return rerank_results(category, [question], [combine_search_results(category, question, results, mode)])[0]
+
+
+def search_documents_batch(category, questions, query_embeddings, mode=None):
+    """같은 카테고리의 여러 질문을 한 번에 검색 → 질문별 결과 리스트 (벡터DB가 없으면 None)"""
+    mode = mode or RETRIEVAL_MODE
+    candidates = first_stage_candidates(mode)
+
+    try:
+        with span("search"):
+            batch_results = search_dense_batch(category, query_embeddings, candidates)
+    except EmbeddingMismatchError as e:
+        logger.error(f"❌ {str(e)}")
+        ERRORS.inc(len(questions), category=category, kind="embedding_mismatch")
+        return None
+    if batch_results is None:
+        logger.error(f"❌ 벡터DB를 찾을 수 없음: {category}")
+        ERRORS.inc(len(questions), category=category, kind="no_db")
+        return None
+    combined = [
+        combine_search_results(category, question, results, mode)
+        for question, results in zip(questions, batch_results)
+    ]
+    return rerank_results(category, questions, combined)  # 여러 질문의 (질문, 청크) 쌍을 한 번에 채점
+
+
+def first_stage_candidates(mode):
+    """1단계(벡터) 검색에서 가져올 후보 수"""
+    if reranker is not None:
+        return max(RERANK_CANDIDATES, HYBRID_CANDIDATES) if mode == "hybrid" else RERANK_CANDIDATES
+    return HYBRID_CANDIDATES if mode == "hybrid" else RETRIEVAL_K
+
+
+def combine_search_results(category, question, results, mode):
+    """hybrid 모드면 BM25 후보와 RRF 로 결합하고 상위 RETRIEVAL_K 개(리랭커를 쓰면 RERANK_CANDIDATES 개)만 남김"""
+    keep = RERANK_CANDIDATES if reranker is not None else RETRIEVAL_K
+    if mode == "hybrid":
+        with span("lexical_search"):
+            lexical_results = search_lexical(category, question, max(HYBRID_CANDIDATES, keep))
+        if lexical_results:
+            results = reciprocal_rank_fusion([results, lexical_results], k=keep)
+        else:
+            results = results[:keep]
+    else:
+        results = results[:keep]
+
+    logger.debug(f"🔎 검색된 문서 개수: {len(results)}")
+    return results
+
+
+def rerank_results(category, questions, candidate_lists):
+    """
+    후보를 cross-encoder 로 다시 채점해 점수 기준으로 절단 (리랭커를 쓰지 않으면 그대로)
+
+    리랭커 오류 시 1단계 순위의 상위 RETRIEVAL_K 개를 사용합니다.
+    """
+    if reranker is None:
+        return candidate_lists
+    try:
+        with span("rerank"):
+            reranked = reranker.rerank_batch(questions, candidate_lists)
+    except Exception as e:
+        logger.error(f"❌ 리랭크 오류, 1단계 검색 순위 사용: {str(e)}")
+        ERRORS.inc(len(questions), category=category, kind="rerank")
+        return [results[:RETRIEVAL_K] for results in candidate_lists]
+
+    kept_lists = []
+    for results, kept in zip(candidate_lists, reranked):
+        RERANK_KEPT.observe(len(kept))
+        logger.debug(f"🔎 리랭크: 후보 {len(results)}개 → {len(kept)}개 (점수 {[round(score, 3) for _, score in kept]})")
+        kept_lists.append([doc for doc, _ in kept])
+    return kept_lists
+
+
+def format_retrieved_context(results):
+    """응답에 포함할 검색 문서 요약 (문서당 500자, 전체 2000자)"""
+    return "\n\n---\n\n".join([doc.page_content[:500] for doc in results])[:2000]
+
+
+def retrieved_chunks(results):
+    """검색 청크 전문 (평가용, retrieved_context 는 잘린 요약이라 청크 단위 검색 지표를 계산할 수 없음)"""
+    return [doc.page_content for doc in results]
+
+
+def elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+async def run_in_retrieval_executor(func, *args):
+    """블로킹 작업(임베딩, 벡터 검색)을 제한된 스레드풀에서 실행 (요청 ID/span 기록 전달)"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(retrieval_executor, functools.partial(context.run, func, *args))
+
+
+async def get_llm():
+    """LLM 모델 (워밍업이 끝나기 전이면 스레드풀에서 초기화)"""
+    if watsonx_model is not None:
+        return watsonx_model
+    return await asyncio.get_running_loop().run_in_executor(None, load_watsonx_model)
+
+
+async def agenerate_answer(prompt, params=None):
+    """Watsonx.ai 비동기 생성 (agenerate 미지원 모델은 기본 스레드풀에서 실행, params 미지정 시 모델 기본값)"""
+    model = await get_llm()
+    with span("generate"):
+        if hasattr(model, "agenerate"):
+            response_data = await model.agenerate(prompt=prompt, params=params)
+        else:
+            loop = asyncio.get_running_loop()
+            response_data = await loop.run_in_executor(None, lambda: model.generate(prompt=prompt, params=params))
+    result = response_data["results"][0]
+    LLM_TOKENS.inc(result.get("input_token_count") or 0, kind="input")
+    LLM_TOKENS.inc(result.get("cached_input_token_count") or 0, kind="cached_input")
+    LLM_TOKENS.inc(result.get("generated_token_count") or 0, kind="generated")
+    return response_data
+
+
+async def agenerate_answer_stream(prompt, params=None):
+    """Watsonx.ai 비동기 스트리밍 생성 (agenerate_stream 미지원 시 동기 스트림을 스레드에서 소비)"""
+    model = await get_llm()
+    if hasattr(model, "agenerate_stream"):
+        async for token in model.agenerate_stream(prompt=prompt, params=params):
+            yield token
+        return
+
+    loop = asyncio.get_running_loop()
+    stream = iter(model.generate_text_stream(prompt=prompt, params=params))
+    done = object()
+    while True:
+        token = await loop.run_in_executor(None, next, stream, done)
+        if token is done:
+            break
+        yield token
+
+
+async def lookup_answer_cache(category, question, semantic=True):
+    """
+    답변 캐시 조회 → (캐시된 응답 또는 None, 질문 임베딩)
+
+    정확 일치로 찾으면 임베딩도 계산하지 않습니다.
+    semantic=False 면 유사 질문 조회는 건너뜀 (재작성된 후속 질문은 앞 질문 임베딩에 끌려가 이전 답변에 적중하기 쉬움)
+    """
+    if answer_cache is not None:
+        cached = answer_cache.get_exact(category, question)
+        if cached is not None:
+            CACHE_LOOKUPS.inc(result="exact")
+            return dict(cached, cache="exact"), None
+
+    query_embedding = await run_in_retrieval_executor(embed_query, question)
+    if answer_cache is not None and semantic:
+        cached = answer_cache.get_similar(category, query_embedding)
+        CACHE_LOOKUPS.inc(result="semantic" if cached is not None else "miss")
+        if cached is not None:
+            return dict(cached, cache="semantic"), query_embedding
+    return None, query_embedding
+
+
+def store_answer_cache(category, question, query_embedding, response):
+    if answer_cache is not None:
+        answer_cache.put(category, question, query_embedding, response)
+
+
+# 📌 대화 세션 (후속 질문 재작성, 이전 검색 문맥 재사용)
+session_store = SessionStore(
+    max_sessions=int(os.getenv("SESSION_MAX", "1000")),
+    ttl_seconds=int(os.getenv("SESSION_TTL_SECONDS", "1800"))
+)
+# 이전 검색 청크를 재사용할 최소 코사인 유사도 (후속 질문에만 적용)
+# bge 계열은 관련 없는 문장끼리도 0.6~0.8 이 나오므로 높게 잡음, benchmarks/context_reuse_benchmark.py 로 말뭉치에 맞춰 조정
+CONTEXT_REUSE_SIMILARITY = float(os.getenv("CONTEXT_REUSE_SIMILARITY", "0.9"))
+SESSION_EVENTS = REGISTRY.counter("rag_session_events_total", "대화 세션 처리 (follow_up, context_reused, searched)", ("event",))
+
+
+@app.get("/sessions/stats")
+def session_stats():
+    """대화 세션 수와 설정"""
+    return dict(session_store.stats(), context_reuse_similarity=CONTEXT_REUSE_SIMILARITY)
+
+
+def resolve_question(session_id, category, question):
+    """
+    세션 확인 → (검색/답변에 쓸 질문, 세션에 남길 기준 질문, 문맥을 재사용할 세션 상태 또는 None)
+
+    "그럼 신청은요?" 같은 후속 질문은 기준 질문을 앞에 붙여 재작성합니다. (LLM 호출 없는 규칙 기반)
+    기준 질문은 재작성된 질문이 아니라 원래 질문이므로 후속 질문이 이어져도 질문이 계속 길어지지 않습니다.
+    이전 검색 문맥은 후속 질문에만 재사용하므로 독립 질문이면 세션 상태 대신 None 을 돌려줍니다. (항상 새로 검색)
+    """
+    if not session_id:
+        return question, question, None
+    session = session_store.get(session_id, category)
+    if session is not None and is_follow_up(question):
+        SESSION_EVENTS.inc(event="follow_up")
+        rewritten = rewrite_follow_up(question, session.question)
+        log_payload(f"🔁 후속 질문 재작성: {rewritten}")
+        return rewritten, session.question, session
+    return question, question, None
+
+
+def chunk_embeddings(category, results):
+    """검색된 청크 임베딩 (벡터DB 에 저장된 벡터를 ID 로 조회, 조회되지 않은 청크만 새로 임베딩)"""
+    stored = {}
+    ids = [doc.id for doc in results if doc.id]
+    name = SINGLE_COLLECTION_DIR if VECTOR_DB_LAYOUT == "single" else category
+    if ids and name != ALL_CATEGORIES:
+        with get_category_vector_db(name) as vector_db:
+            if vector_db is not None and VECTOR_BACKEND == "numpy":
+                stored = vector_db.embeddings_by_id(ids)
+            elif vector_db is not None:
+                response = vector_db._collection.get(ids=ids, include=["embeddings"])
+                stored = dict(zip(response["ids"], response["embeddings"]))
+
+    embeddings = [stored.get(doc.id) for doc in results]
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        with span("embed"):
+            computed = embedding_model.embed_documents([results[i].page_content for i in missing])
+        for i, embedding in zip(missing, computed):
+            embeddings[i] = embedding
+    return embeddings
+
+
+def retrieve_for_session(category, question, query_embedding, session_id=None, session=None, base_question=None):
+    """
+    문서 검색 → (검색 결과, 이전 문맥 재사용 여부)
+
+    세션에는 base_question(재작성 전 기준 질문, 없으면 question)을 남깁니다.
+    session(후속 질문일 때만 주어짐)의 이전 검색 청크 중 새 질문과 CONTEXT_REUSE_SIMILARITY 이상 가까운 청크가 있으면
+    벡터/키워드 검색 없이 그 청크들만 유사도 순으로 다시 정렬해 사용합니다. (프롬프트도 짧아짐)
+    """
+    if session is not None:
+        with span("context_reuse"):
+            results = session.reuse_context(query_embedding, CONTEXT_REUSE_SIMILARITY)
+        if results:
+            SESSION_EVENTS.inc(event="context_reused")
+            session_store.remember_question(session_id, category, base_question or question)
+            return results, True
+
+    results = search_documents(category, question, query_embedding)
+    if session_id:
+        SESSION_EVENTS.inc(event="searched")
+        if results:
+            session_store.put(session_id, category, base_question or question, results, chunk_embeddings(category, results))
+        else:
+            session_store.remember_question(session_id, category, base_question or question)
+    return results, False
+
+
+def json_response(payload):
+    with span("serialize"):
+        return JSONResponse(content=payload)
+
+
+def overloaded_error(e, category):
+    logger.warning(f"⏳ LLM 과부하로 요청 거절: {str(e)}")
+    ERRORS.inc(category=category, kind="overloaded")
+    return HTTPException(status_code=429, detail="요청이 많아 잠시 후 다시 시도해 주세요.", headers={"Retry-After": "1"})
 
 
 @app.post("/ask/")
-def process_question(request: QueryRequest):
-    """질문에 대한 RAG 시스템 응답 생성 및 Watsonx.ai 호출"""
+async def process_question(request: QueryRequest):
+    """질문에 대한 RAG 시스템 응답 생성 및 Watsonx.ai 호출 (검색이 필요 없는 카테고리는 바로 생성)"""
+    started = time.perf_counter()
 
     # ✅ FastAPI에서 받은 데이터 확인
     cleaned_category = request.category.strip()
     logger.info(f"📌 FastAPI에서 받은 category: '{cleaned_category}' (길이: {len(cleaned_category)})")
-    logger.info(f"📌 사용자 질문: {request.prompt}")
+    log_payload(f"📌 사용자 질문: {request.prompt}")
 
-    # ✅ 벡터DB 로드
-    retriever = get_category_vector_db(cleaned_category)
-    if retriever is None:
-        logger.error(f"❌ 벡터DB를 찾을 수 없음: {cleaned_category}")
-        return {
+    # ✅ 카테고리 라우팅 (별칭 → 인덱스 이름, 검색 없이 답하는 카테고리 구분)
+    route = resolve_route(cleaned_category)
+    if not route_has_data(route):
+        return json_response({
             "category": cleaned_category,
             "retrieved_context": "해당 카테고리에 대한 데이터가 없습니다.",
             "answer": "현재 해당 카테고리에 대한 문서가 없습니다."
-        }
+        })
+
+    try:
+        if route.kind == "direct":
+            return await answer_direct(route, cleaned_category, request.prompt, started)
+        return await answer_with_retrieval(route, cleaned_category, request, started)
+    finally:
+        ROUTE_SECONDS.observe(time.perf_counter() - started, route=route.name, kind=route.kind)
+
+
+async def answer_direct(route, category, question, started):
+    """검색 없이 가벼운 생성 프로필로 바로 답변"""
+    prompt, context_tokens = route_prompt(route, None, question)
+    prompt_usage = prompt_token_usage(route.profile, prompt)
+    try:
+        async with llm_limiter:
+            generation_started = time.perf_counter()
+            response_data = await agenerate_answer(prompt, GENERATION_PROFILES[route.profile])
+        generation_ms = elapsed_ms(generation_started)
+        answer = response_data["results"][0]["generated_text"].strip()
+        log_payload(f"🟡 AI 최종 응답 ({route.name}): {answer}")
+    except LLMOverloadedError as e:
+        raise overloaded_error(e, route.name)
+    except Exception as e:
+        logger.error(f"❌ AI 생성 오류: {str(e)}")
+        ERRORS.inc(category=route.name, kind="generation")
+        return json_response({
+            "category": category,
+            "retrieved_context": "",
+            "answer": "AI 응답을 생성하는 중 오류가 발생했습니다."
+        })
+
+    return json_response({
+        "category": category,
+        "retrieved_context": "",
+        "answer": answer,
+        "context_tokens": context_tokens,
+        **prompt_usage,
+        "timings": {"generation_ms": generation_ms, "total_ms": elapsed_ms(started)}
+    })
+
+
+async def answer_with_retrieval(route, category, request, started):
+    """문서 검색 후 답변 (답변 캐시, 대화 세션 포함)"""
+    target = route.target
 
-    # ✅ 벡터DB에서 문서 검색
-    results = retriever.invoke(request.prompt)
-    logger.info(f"🔎 검색된 문서 개수: {len(results)}")
+    # ✅ 대화 세션의 후속 질문이면 기준 질문을 붙여 재작성
+    question, base_question, session = resolve_question(request.session_id, target, request.prompt)
+
+    # ✅ 답변 캐시 확인 (적중 시 검색과 생성을 모두 건너뜀, 재작성된 후속 질문은 정확 일치만)
+    cached, query_embedding = await lookup_answer_cache(target, question, semantic=question == request.prompt)
+    if cached is not None:
+        logger.info(f"♻️ 답변 캐시 적중 ({cached['cache']})")
+        if request.session_id:
+            session_store.remember_question(request.session_id, target, base_question)
+        # 캐시는 인덱스(target) 단위라 다른 별칭으로 저장된 응답일 수 있으므로 요청 값으로 덮어씀
+        return json_response(dict(cached, category=category, timings={"total_ms": elapsed_ms(started)}))
+
+    # ✅ 벡터DB에서 문서 검색 (세션의 이전 검색 문맥이 충분히 가까우면 재사용)
+    results, context_reused = await run_in_retrieval_executor(
+        retrieve_for_session, target, question, query_embedding, request.session_id, session, base_question
+    )
+    timings = {"retrieval_ms": elapsed_ms(started)}
+    if results is None:
+        return json_response({
+            "category": category,
+            "retrieved_context": "해당 카테고리에 대한 데이터가 없습니다.",
+            "answer": "현재 해당 카테고리에 대한 문서가 없습니다."
+        })
 
     if not results:
-        logger.warning(f"❌ 검색된 문서 없음 (카테고리: {cleaned_category}, 질문: {request.prompt})")
-        return {
-            "category": cleaned_category,
+        logger.warning(f"❌ 검색된 문서 없음 (카테고리: {route.name})")
+        return json_response({
+            "category": category,
             "retrieved_context": "검색된 문서 없음",
             "answer": "관련 정보를 찾을 수 없습니다."
-        }
+        })
 
     # ✅ 검색된 문서 내용 로그 출력
-    retrieved_context = "\n\n---\n\n".join([doc.page_content[:500] for doc in results])[:2000]
-    logger.info(f"✅ 검색된 문서 내용 (첫 500자): {retrieved_context[:500]}")
+    retrieved_context = format_retrieved_context(results)
+    log_payload(f"✅ 검색된 문서 내용 (첫 500자): {retrieved_context[:500]}")
 
     # ✅ AI 응답 생성
-    prompt = generate_prompt(results, request.prompt)
+    prompt, context_tokens = generate_prompt(results, question)
+    prompt_usage = prompt_token_usage(route.profile, prompt)
 
     try:
-        response_data = watsonx_model.generate(prompt=prompt)
+        async with llm_limiter:
+            generation_started = time.perf_counter()
+            response_data = await agenerate_answer(prompt)
+        timings["generation_ms"] = elapsed_ms(generation_started)
         answer = response_data["results"][0]["generated_text"].strip()
-        logger.info(f"🟡 AI 최종 응답: {answer}")
+        log_payload(f"🟡 AI 최종 응답: {answer}")
+    except LLMOverloadedError as e:
+        raise overloaded_error(e, route.name)
     except Exception as e:
         logger.error(f"❌ AI 생성 오류: {str(e)}")
-        return {
-            "category": cleaned_category,
+        ERRORS.inc(category=route.name, kind="generation")
+        return json_response({
+            "category": category,
             "retrieved_context": retrieved_context,
             "answer": "AI 응답을 생성하는 중 오류가 발생했습니다."
-        }
+        })
 
-    return {
-        "category": cleaned_category,
+    response = {
+        "category": category,
         "retrieved_context": retrieved_context,
-        "answer": answer
+        "retrieved_chunks": retrieved_chunks(results),
+        "answer": answer,
+        "context_tokens": context_tokens,
+        **prompt_usage
     }
+    if not context_reused:  # 세션의 이전 청크로 만든 답변은 다른 사용자에게 공유하지 않음
+        store_answer_cache(target, question, query_embedding, response)
+    timings["total_ms"] = elapsed_ms(started)
+    if request.session_id:
+        response = dict(response, context_reused=context_reused)
+    return json_response(dict(response, timings=timings))
+
+
+# 📌 배치 질문 설정
+ASK_BATCH_MAX_ITEMS = int(os.getenv("ASK_BATCH_MAX_ITEMS", "256"))  # 한 요청에 담을 수 있는 최대 질문 수
+ASK_BATCH_CONCURRENCY = int(os.getenv("ASK_BATCH_CONCURRENCY", "4"))  # 배치 하나가 동시에 쓰는 LLM 호출 수
+
+
+class BatchQueryRequest(BaseModel):
+    items: List[QueryRequest]
+
+
+def batch_item_response(category, question, status, retrieved_context, answer, **extra):
+    return dict({
+        "category": category,
+        "prompt": question,
+        "status": status,
+        "retrieved_context": retrieved_context,
+        "answer": answer
+    }, **extra)
+
+
+@app.post("/ask/batch")
+async def process_question_batch(request: BatchQueryRequest):
+    """
+    여러 질문을 한 번에 처리 (평가 데이터 수집용)
+
+    - 질문 임베딩은 한 번의 forward pass 로 계산
+    - 카테고리별로 묶어 컬렉션마다 한 번의 다중 질의로 검색
+    - LLM 생성은 ASK_BATCH_CONCURRENCY 개씩 동시에 실행 (llm_limiter 도 함께 적용)
+    - 검색 없이 답하는 카테고리는 임베딩/검색 없이 바로 생성
+    항목마다 status(ok | no_db | no_results | overloaded | error)와 timings 를 담아 입력 순서대로 반환합니다.
+    (retrieval_ms 는 배치 전체 기준, generation_ms 는 항목별 LLM 호출 시간)
+    """
+    if len(request.items) > ASK_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {ASK_BATCH_MAX_ITEMS}개 질문까지 보낼 수 있습니다.")
+
+    started = time.perf_counter()
+    timings = {}
+    items = [(item.category.strip(), item.prompt) for item in request.items]
+    routes = [resolve_route(category) for category, _ in items]
+    responses = [None] * len(items)
+    logger.info(f"📌 [batch] 질문 {len(items)}개 수신")
+
+    # ✅ 카테고리 라우팅 후 답변 캐시 정확 일치 확인
+    pending = []
+    to_generate = []
+    for index, (category, question) in enumerate(items):
+        route = routes[index]
+        if not route_has_data(route):
+            responses[index] = batch_item_response(
+                category, question, "no_db", "해당 카테고리에 대한 데이터가 없습니다.", "현재 해당 카테고리에 대한 문서가 없습니다."
+            )
+            continue
+        if route.kind == "direct":
+            to_generate.append((index, None))
+            continue
+        cached = answer_cache.get_exact(route.target, question) if answer_cache is not None else None
+        if cached is not None:
+            CACHE_LOOKUPS.inc(result="exact")
+            responses[index] = dict(cached, category=category, prompt=question, status="ok", cache="exact")
+        else:
+            pending.append(index)
+
+    # ✅ 남은 질문을 한 번에 임베딩
+    embeddings = {}
+    if pending:
+        try:
+            vectors = await run_in_retrieval_executor(embed_queries, [items[i][1] for i in pending])
+            embeddings = dict(zip(pending, vectors))
+        except Exception as e:
+            logger.error(f"❌ [batch] 질문 임베딩 오류: {str(e)}")
+            for index in pending:
+                category, question = items[index]
+                responses[index] = batch_item_response(category, question, "error", "", "질문을 처리하는 중 오류가 발생했습니다.")
+            pending = []
+    timings["embed_ms"] = elapsed_ms(started)
+
+    # ✅ 유사 질문 캐시 확인 후 인덱스(라우트 target)별로 묶기
+    groups = {}
+    for index in pending:
+        category, question = items[index]
+        target = routes[index].target
+        if answer_cache is None:
+            groups.setdefault(target, []).append(index)
+            continue
+        cached = answer_cache.get_similar(target, embeddings[index])
+        CACHE_LOOKUPS.inc(result="semantic" if cached is not None else "miss")
+        if cached is not None:
+            responses[index] = dict(cached, category=category, prompt=question, status="ok", cache="semantic")
+        else:
+            groups.setdefault(target, []).append(index)
+
+    # ✅ 카테고리마다 한 번의 다중 질의로 검색 (카테고리끼리는 검색 스레드풀에서 병렬)
+    async def search_group(category, indexes):
+        return await run_in_retrieval_executor(
+            search_documents_batch, category, [items[i][1] for i in indexes], [embeddings[i] for i in indexes]
+        )
+
+    group_results = await asyncio.gather(
+        *(search_group(category, indexes) for category, indexes in groups.items()),
+        return_exceptions=True
+    )
+    timings["retrieval_ms"] = elapsed_ms(started)
+
+    for (target, indexes), results_list in zip(groups.items(), group_results):
+        for position, index in enumerate(indexes):
+            category, question = items[index]
+            if isinstance(results_list, Exception):
+                logger.error(f"❌ [batch] 검색 오류 ({target}): {str(results_list)}")
+                ERRORS.inc(category=routes[index].name, kind="search")
+                responses[index] = batch_item_response(category, question, "error", "", "질문을 처리하는 중 오류가 발생했습니다.")
+            elif results_list is None:
+                responses[index] = batch_item_response(
+                    category, question, "no_db", "해당 카테고리에 대한 데이터가 없습니다.", "현재 해당 카테고리에 대한 문서가 없습니다."
+                )
+            elif not results_list[position]:
+                responses[index] = batch_item_response(category, question, "no_results", "검색된 문서 없음", "관련 정보를 찾을 수 없습니다.")
+            else:
+                to_generate.append((index, results_list[position]))
+
+    # ✅ LLM 생성은 제한된 개수만 동시에 실행
+    semaphore = asyncio.Semaphore(ASK_BATCH_CONCURRENCY)
+
+    async def generate_item(index, results):
+        category, question = items[index]
+        route = routes[index]
+        retrieved_context = format_retrieved_context(results) if results else ""
+        prompt, context_tokens = route_prompt(route, results, question)
+        prompt_usage = prompt_token_usage(route.profile, prompt)
+        try:
+            async with semaphore:
+                async with llm_limiter:
+                    generation_started = time.perf_counter()
+                    response_data = await agenerate_answer(prompt, GENERATION_PROFILES[route.profile])
+            generation_ms = elapsed_ms(generation_started)
+            answer = response_data["results"][0]["generated_text"].strip()
+        except LLMOverloadedError as e:
+            logger.warning(f"⏳ [batch] LLM 과부하로 항목 거절: {str(e)}")
+            ERRORS.inc(category=route.name, kind="overloaded")
+            responses[index] = batch_item_response(category, question, "overloaded", retrieved_context, "요청이 많아 잠시 후 다시 시도해 주세요.")
+            return
+        except Exception as e:
+            logger.error(f"❌ [batch] AI 생성 오류: {str(e)}")
+            ERRORS.inc(category=route.name, kind="generation")
+            responses[index] = batch_item_response(category, question, "error", retrieved_context, "AI 응답을 생성하는 중 오류가 발생했습니다.")
+            return
+
+        response = {
+            "category": category,
+            "retrieved_context": retrieved_context,
+            "retrieved_chunks": retrieved_chunks(results) if results else [],
+            "answer": answer,
+            "context_tokens": context_tokens,
+            **prompt_usage
+        }
+        if route.kind == "rag":
+            store_answer_cache(route.target, question, embeddings[index], response)
+        responses[index] = dict(response, prompt=question, status="ok", timings={
+            "retrieval_ms": timings["retrieval_ms"],
+            "generation_ms": generation_ms,
+            "total_ms": elapsed_ms(started)
+        })
+
+    await asyncio.gather(*(generate_item(index, results) for index, results in to_generate))
+    timings["total_ms"] = elapsed_ms(started)
+
+    statuses = {}
+    for response in responses:
+        statuses[response["status"]] = statuses.get(response["status"], 0) + 1
+    logger.info(f"✅ [batch] 질문 {len(items)}개 처리 완료 {statuses} ({timings['total_ms']}ms)")
+    return json_response({"items": responses, "statuses": statuses, "timings": timings})
+
+
+def ndjson_frame(frame):
+    with span("serialize"):
+        return json.dumps(frame, ensure_ascii=False) + "\n"
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    응답 전송이 어떻게 끝나든(정상 종료, 클라이언트 연결 끊김, 취소) on_close 를 정확히 한 번 호출하는 StreamingResponse
+
+    제너레이터의 finally 는 첫 프레임 전에 연결이 끊기면 실행되지 않으므로 LLM 슬롯 반납은 여기서 합니다.
+    """
+
+    def __init__(self, content, on_close, **kwargs):
+        super().__init__(content, **kwargs)
+        self._on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            on_close, self._on_close = self._on_close, None
+            if on_close is not None:
+                on_close()
+
+
+@app.post("/ask/stream")
+async def process_question_stream(request: QueryRequest):
+    """
+    /ask/ 의 스트리밍 버전 (NDJSON)
+
+    프레임 순서: context(검색 문서) → token(생성 토큰, 여러 개) → done(최종 답변 + 시간 정보)
+    오류 시 error 프레임 후 done 프레임을 보냅니다.
+    """
+    started = time.perf_counter()
+    cleaned_category = request.category.strip()
+    logger.info(f"📌 [stream] category: '{cleaned_category}'")
+    log_payload(f"📌 사용자 질문 (stream): {request.prompt}")
+
+    route = resolve_route(cleaned_category)
+    if not route_has_data(route):
+        async def no_data_frames():
+            yield ndjson_frame({"type": "context", "category": cleaned_category, "retrieved_context": "해당 카테고리에 대한 데이터가 없습니다."})
+            yield ndjson_frame({"type": "done", "answer": "현재 해당 카테고리에 대한 문서가 없습니다.", "token_count": 0, "timings": {}})
+
+        return StreamingResponse(no_data_frames(), media_type="application/x-ndjson")
+
+    # ✅ 검색 없이 답하는 카테고리는 세션/캐시/임베딩 없이 바로 생성
+    question, base_question, session, query_embedding = request.prompt, request.prompt, None, None
+    if route.kind == "rag":
+        question, base_question, session = resolve_question(request.session_id, route.target, request.prompt)
+
+        # ✅ 답변 캐시 적중 시 LLM 슬롯 없이 바로 응답 (재작성된 후속 질문은 정확 일치만)
+        cached, query_embedding = await lookup_answer_cache(route.target, question, semantic=question == request.prompt)
+        if cached is not None:
+            logger.info(f"♻️ 답변 캐시 적중 ({cached['cache']}, stream)")
+            if request.session_id:
+                session_store.remember_question(request.session_id, route.target, base_question)
+            ROUTE_SECONDS.observe(time.perf_counter() - started, route=route.name, kind=route.kind)
+
+            async def cached_frames():
+                yield ndjson_frame({"type": "context", "category": cleaned_category, "retrieved_context": cached["retrieved_context"]})
+                yield ndjson_frame({"type": "token", "text": cached["answer"]})
+                yield ndjson_frame({"type": "done", "answer": cached["answer"], "token_count": 1, "cache": cached["cache"], "timings": {}})
+
+            return StreamingResponse(cached_frames(), media_type="application/x-ndjson")
+
+    # ✅ 검색은 LLM 슬롯 없이 먼저 실행 (/ask/ 와 같이 슬롯은 생성 직전에만 잡음)
+    timings = {}
+    results, context_reused = None, False
+    if route.kind == "rag":
+        results, context_reused = await run_in_retrieval_executor(
+            retrieve_for_session, route.target, question, query_embedding, request.session_id, session, base_question
+        )
+        timings["retrieval_ms"] = elapsed_ms(started)
+
+    if route.kind == "rag" and not results:
+        retrieved_context = "해당 카테고리에 대한 데이터가 없습니다." if results is None else "검색된 문서 없음"
+        answer = "현재 해당 카테고리에 대한 문서가 없습니다." if results is None else "관련 정보를 찾을 수 없습니다."
+        timings["total_ms"] = elapsed_ms(started)
+        ROUTE_SECONDS.observe(time.perf_counter() - started, route=route.name, kind=route.kind)
+
+        async def empty_frames():
+            yield ndjson_frame({"type": "context", "category": cleaned_category, "retrieved_context": retrieved_context})
+            yield ndjson_frame({"type": "done", "answer": answer, "token_count": 0, "timings": timings})
+
+        return StreamingResponse(empty_frames(), media_type="application/x-ndjson")
+
+    # ✅ 스트림 시작 전에 LLM 슬롯을 확보해야 429 상태 코드로 응답할 수 있음 (반납은 ClosingStreamingResponse 가 보장)
+    try:
+        await llm_limiter.acquire()
+    except LLMOverloadedError as e:
+        raise overloaded_error(e, route.name)
+
+    def close_stream():
+        llm_limiter.release()
+        ROUTE_SECONDS.observe(time.perf_counter() - started, route=route.name, kind=route.kind)
+
+    async def frames():
+        yield ndjson_frame({
+            "type": "context",
+            "category": cleaned_category,
+            "retrieved_context": format_retrieved_context(results) if results else ""
+        })
+
+        prompt, context_tokens = route_prompt(route, results, question)
+        prompt_usage = prompt_token_usage(route.profile, prompt)
+        generation_started = time.perf_counter()
+        pieces = []
+        failed = False
+        try:
+            with span("generate"):
+                async for token in agenerate_answer_stream(prompt, GENERATION_PROFILES[route.profile]):
+                    if not pieces:
+                        timings["first_token_ms"] = elapsed_ms(generation_started)
+                    pieces.append(token)
+                    yield ndjson_frame({"type": "token", "text": token})
+        except Exception as e:
+            logger.error(f"❌ AI 스트리밍 생성 오류: {str(e)}")
+            ERRORS.inc(category=route.name, kind="generation")
+            failed = True
+            yield ndjson_frame({"type": "error", "message": "AI 응답을 생성하는 중 오류가 발생했습니다."})
+        LLM_TOKENS.inc(len(pieces), kind="generated")  # 스트림 조각 수 ≈ 생성 토큰 수
+
+        answer = "".join(pieces).strip()
+        log_payload(f"🟡 AI 최종 응답 (stream): {answer}")
+        if answer and not failed and route.kind == "rag" and not context_reused:
+            store_answer_cache(route.target, question, query_embedding, {
+                "category": cleaned_category,
+                "retrieved_context": format_retrieved_context(results),
+                "retrieved_chunks": retrieved_chunks(results),
+                "answer": answer
+            })
+        timings["generation_ms"] = elapsed_ms(generation_started)
+        timings["total_ms"] = elapsed_ms(started)
+        done_frame = {
+            "type": "done",
+            "answer": answer,
+            "token_count": len(pieces),
+            "context_tokens": context_tokens,
+            **prompt_usage,
+            "timings": timings
+        }
+        if request.session_id and route.kind == "rag":
+            done_frame["context_reused"] = context_reused
+        yield ndjson_frame(done_frame)
+
+    return ClosingStreamingResponse(frames(), close_stream, media_type="application/x-ndjson")
+
+
+@app.get("/llm/stats")
+def llm_stats():
+    """LLM 동시 호출/대기/거절 현황"""
+    return llm_limiter.stats()
+
+
+# ----------------------------------------------------------------------
+# 📌 서버 시작: 포트는 바로 열고, 모델/인덱스 로드와 더미 질의는 백그라운드 워밍업에서 실행
+# ----------------------------------------------------------------------
+WARMUP_QUERY = os.getenv("WARMUP_QUERY", "청년 지원 제도")
+REGISTRY.gauge("rag_ready", "워밍업 완료 여부 (1 = 준비됨)", lambda: int(startup_tracker.ready))
+
+
+def warm_up_tokenizer():
+    from context_packer import get_tokenizer
+
+    get_tokenizer()
+    for template in PROMPT_TEMPLATES.values():
+        template.prefix_tokens  # 프롬프트 prefix 토큰 수를 미리 계산해 캐시
+
+
+def warm_up_dummy_query():
+    """임베딩 배치 스레드 시작 + 첫 forward pass, 카테고리 하나의 검색(+ 리랭크) 경로까지 한 번 실행"""
+    query_embedding = embedding_model.embed_query(WARMUP_QUERY)
+    target = next((route.target for route in category_router.routes
+                   if route.target and route.target != ALL_CATEGORIES), None)
+    if target is not None:
+        search_documents(target, WARMUP_QUERY, query_embedding)
+
+
+def warm_up():
+    """
+    LLM 클라이언트, 임베딩 모델, 토크나이저, 인덱스를 로드하고 더미 질의로 첫 요청 지연을 미리 소진
+
+    단계마다 따로 실행하므로 한 단계가 실패해도 나머지는 계속 진행합니다.
+    LLM 과 임베딩 모델은 필수 단계 (실패하면 not ready), 나머지는 실패해도 첫 요청 때 다시 로드하므로 ready(degraded)
+    """
+    startup_tracker.run_phase("llm", load_watsonx_model, required=True)
+    startup_tracker.run_phase("embedding_model", embedding_model.load, required=True)
+    startup_tracker.run_phase("tokenizer", warm_up_tokenizer)
+    startup_tracker.run_phase("vector_dbs", preload_vector_dbs)
+    startup_tracker.run_phase("lexical_indexes", preload_lexical_indexes)
+    if reranker is not None:
+        startup_tracker.run_phase("reranker", reranker.load)
+    startup_tracker.run_phase("dummy_query", warm_up_dummy_query)
+
+
+@app.on_event("startup")
+def start_server():
+    """
+    포트를 열기 전에 필요한 가벼운 단계만 실행하고 워밍업은 백그라운드로 넘김
+
+    STARTUP_WARMUP=0 이면 워밍업 없이 바로 ready (모델/인덱스는 첫 요청 시 로드)
+    """
+    with startup_tracker.phase("category_routes"):
+        bind_category_routes()
+    with startup_tracker.phase("answer_cache"):
+        load_answer_cache()
+    if os.getenv("STARTUP_WARMUP", "1") != "1":
+        startup_tracker.mark_ready()
+        return
+    startup_tracker.run_in_background(warm_up, retry_seconds=float(os.getenv("WARMUP_RETRY_SECONDS", "30")))
+
+
+@app.get("/healthz")
+def healthz():
+    """liveness: 프로세스가 요청을 받을 수 있으면 200 (워밍업 여부와 무관)"""
+    return {"status": "ok", "uptime_seconds": startup_tracker.snapshot()["uptime_seconds"]}
+
+
+@app.get("/readyz")
+def readyz():
+    """readiness: 워밍업이 끝나고 필수 단계가 성공하면 200, 그 전(또는 필수 단계 실패 시)에는 503 + 단계별 시작 시간과 오류"""
+    snapshot = startup_tracker.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+
+# ⏱️ 모듈 import (패키지 import + 전역 객체 생성) 시간
+startup_tracker.record("import", time.perf_counter() - PROCESS_STARTED)
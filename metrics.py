@@ -0,0 +1,200 @@
+import time
+import bisect
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# 📌 기본 버킷 (초 단위 지연 시간, 배치 크기)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (Prometheus histogram 과 같은 방식)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        with self._lock:
+            cumulative = []
+            running = 0
+            for count in self._counts:
+                running += count
+                cumulative.append(running)
+            return {
+                "count": self._count,
+                "sum": round(self._sum, 6),
+                "mean": round(self._sum / self._count, 6) if self._count else None,
+                "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], cumulative))
+            }
+
+    def render(self, name, labels=""):
+        """Prometheus 텍스트 형식 줄 목록 (labels 는 'a="1",b="2"' 형태)"""
+        snapshot = self.snapshot()
+        prefix = labels + "," if labels else ""
+        lines = [f'{name}_bucket{{{prefix}le="{le}"}} {count}' for le, count in snapshot["buckets"].items()]
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {snapshot['sum']}")
+        lines.append(f"{name}_count{suffix} {snapshot['count']}")
+        return lines
+
+
+def format_labels(label_names, values):
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for value in values)
+    return ",".join(f'{name}="{value}"' for name, value in zip(label_names, escaped))
+
+
+class Counter:
+    """라벨별 누적 카운터"""
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{{{format_labels(self.label_names, key)}}} {value}")
+        return lines
+
+
+class HistogramFamily:
+    """라벨 값마다 Histogram 을 하나씩 두는 히스토그램 묶음"""
+
+    def __init__(self, name, documentation, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+        return histogram
+
+    def observe(self, value, **labels):
+        self.labels(**labels).observe(value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._histograms.items())
+        for key, histogram in items:
+            lines.extend(histogram.render(self.name, format_labels(self.label_names, key)))
+        return lines
+
+
+class Gauge:
+    """조회 시점에 함수를 호출해 값을 읽는 게이지"""
+
+    def __init__(self, name, documentation, read):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+
+    def render(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge", f"{self.name} {self.read()}"]
+
+
+class ExistingHistogram:
+    """다른 모듈이 이미 갖고 있는 Histogram 을 그대로 노출 (예: EmbeddingService.histograms)"""
+
+    def __init__(self, name, documentation, histogram):
+        self.name = name
+        self.documentation = documentation
+        self.histogram = histogram
+
+    def render(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"] + self.histogram.render(self.name)
+
+
+class MetricsRegistry:
+    """/metrics 로 내보낼 지표 모음 (Prometheus 텍스트 형식)"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, label_names=()):
+        return self.register(Counter(name, documentation, label_names))
+
+    def histogram(self, name, documentation, label_names=(), buckets=LATENCY_BUCKETS):
+        return self.register(HistogramFamily(name, documentation, label_names, buckets))
+
+    def gauge(self, name, documentation, read):
+        return self.register(Gauge(name, documentation, read))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ----------------------------------------------------------------------
+# 요청 ID 와 단계별 구간(span) 측정
+# ----------------------------------------------------------------------
+# 요청마다 미들웨어가 설정하고, 검색 스레드풀로도 전달됨 (copy_context)
+request_id_var = contextvars.ContextVar("request_id", default="-")
+request_spans_var = contextvars.ContextVar("request_spans", default=None)
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "rag_stage_seconds",
+    "요청 처리 단계별 소요 시간 (vectordb_load, embed, search, lexical_search, prompt, generate, serialize)",
+    ("stage",)
+)
+
+
+@contextmanager
+def span(stage):
+    """단계 소요 시간을 히스토그램과 현재 요청의 span 기록에 남김"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        STAGE_SECONDS.observe(seconds, stage=stage)
+        spans = request_spans_var.get()
+        if spans is not None:
+            spans[stage] = round(spans.get(stage, 0) + seconds * 1000, 1)
+
+
+class RequestIdFilter(logging.Filter):
+    """로그 레코드에 현재 요청 ID 추가 (format 의 %(request_id)s)"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
@@ -1,7 +1,16 @@
+import os
+import json
+import time
+import logging
 import streamlit as st
 import requests
 from streamlit_lottie import st_lottie
-import time
+from rag_client import RAGClient, RAGClientError
+from chat_history import ChatHistory
+
+# 📌 스크립트 재실행(rerun) 시간 측정 시작
+RERUN_STARTED = time.perf_counter()
+logger = logging.getLogger(__name__)
 
 
 
@@ -11,7 +20,28 @@ import time
 ############################################
 st.set_page_config(page_title="IBM 챗봇", page_icon="☁️", layout="centered")
 
-RAG_API_URL = "http://localhost:8030/ask/"
+@st.cache_resource
+def get_rag_client():
+    """모든 세션이 함께 쓰는 RAG 클라이언트 (keep-alive 연결 풀, timeout, 재시도, 회로 차단기)"""
+    return RAGClient()  # 서버 주소는 RAG_API_BASE_URL 환경 변수 (기본 http://localhost:8030)
+
+
+def stream_answer(placeholder, prompt, category, empty_answer, session_id=None):
+    """백엔드 스트리밍 응답을 받는 대로 말풍선에 표시하고 최종 답변 반환 (session_id 로 후속 질문 문맥 유지)"""
+    answer = ""
+    try:
+        for frame in get_rag_client().ask_stream(prompt, category, session_id=session_id):
+            if frame["type"] == "token":
+                answer += frame["text"]
+                placeholder.markdown(f'<div class="assistant-bubble"><strong>A:</strong> {answer}▌</div>', unsafe_allow_html=True)
+            elif frame["type"] == "error":
+                answer = frame["message"]
+            elif frame["type"] == "done":
+                answer = frame.get("answer") or answer
+    except RAGClientError as e:
+        answer = f"오류 발생: {str(e)}"
+    placeholder.empty()
+    return answer or empty_answer
 
 # --------------------------- 세션 기본값 ---------------------------
 if "page" not in st.session_state:
@@ -21,15 +51,15 @@ if "page" not in st.session_state:
 if "selected_category" not in st.session_state:
     st.session_state.selected_category = None
 if "counseling_messages" not in st.session_state:
-    st.session_state.counseling_messages = []  # 고민 상담 대화
+    st.session_state.counseling_messages = ChatHistory()  # 고민 상담 대화
 
 # 수다 떨기용
 if "chat_messages" not in st.session_state:
-    st.session_state.chat_messages = []  # 수다 떨기 대화
+    st.session_state.chat_messages = ChatHistory()  # 수다 떨기 대화
 
 # 맛집 탐방용
 if "food_messages" not in st.session_state:
-    st.session_state.food_messages = []  # 맛집 탐방 대화
+    st.session_state.food_messages = ChatHistory()  # 맛집 탐방 대화
 
 # ✅ 여기서 trigger_rerun을 반드시 초기화
 if "trigger_rerun" not in st.session_state:
@@ -37,49 +67,31 @@ if "trigger_rerun" not in st.session_state:
 ############################################
 
 
-# 2) CSS 스타일
+# 2) CSS 스타일 / 정적 자원 (프로세스당 한 번만 읽고 재사용)
+############################################
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+LOGO_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo_ibm.png")
+
+
+@st.cache_data
+def load_css(name):
+    """assets/css/<name>.css → <style> 블록"""
+    with open(os.path.join(ASSETS_DIR, "css", f"{name}.css"), "r", encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
+
+
+def inject_css(name):
+    # Streamlit 은 rerun 마다 화면을 다시 그리므로 주입은 매번 필요하지만, 파일은 캐시에서 읽음
+    st.markdown(load_css(name), unsafe_allow_html=True)
+
+
+@st.cache_data
+def load_logo():
+    with open(LOGO_FILE, "rb") as f:
+        return f.read()
 ############################################
 ############################################
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css?family=Poppins:300,400,600&display=swap');
-
-* {
-  font-family: 'Poppins', sans-serif;
-}
-body {
-  background: linear-gradient(135deg, #dbeeff 25%, #ffffff 100%) no-repeat center center fixed;
-  background-size: cover;
-}
-.block-container {
-  background-color: rgba(255, 255, 255, 0.85);
-  backdrop-filter: blur(10px);
-  padding: 2rem;
-  border-radius: 12px;
-  box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-}
-.user-bubble {
-  text-align: left;
-  background-color: #cceeff;
-  padding: 10px;
-  border-radius: 10px;
-  margin-bottom: 10px;
-  max-width: 70%;
-  margin-left: auto;
-  box-shadow: 0 2px 4px rgba(0,0,0,0.15);
-}
-.assistant-bubble {
-  text-align: left;
-  background-color: #ffffff;
-  padding: 10px;
-  border-radius: 10px;
-  margin-bottom: 10px;
-  max-width: 70%;
-  margin-right: auto;
-  box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-}
-</style>
-""", unsafe_allow_html=True)
+inject_css("global")
 ############################################
 ############################################
 
@@ -101,45 +113,14 @@ def page_start():
     # ✅ 중앙 정렬된 로고 (Lottie 제거 후 로고 사용)
     col1, col2, col3 = st.columns([1,2,1])  
     with col2:
-        st.image("logo_ibm.png", use_container_width=False, width=6000)  # 크기 변경 가능
+        st.image(load_logo(), use_container_width=False, width=6000)  # 크기 변경 가능
 
     st.write("")  # 추가 간격
 
     # ✅ 버튼 중앙 정렬 및 스타일 추가
     col1, col2, col3 = st.columns([1,2,1])  
     with col2:
-        st.markdown(
-            """
-            <style>
-                .block-container {
-                min-height: 100vh;  /* 전체 화면 높이 */
-                display: flex;
-                flex-direction: column;
-                justify-content: center;
-                align-items: center;
-            }
-                .start-button {
-                    display: flex;
-                    justify-content: center;
-                    align-items: center;
-                    background-color: f5f5f5;;
-                    color: white;
-                    padding: 15px 32px;
-                    font-size: 18px;
-                    font-weight: bold;
-                    border: none;
-                    border-radius: 8px;
-                    cursor: pointer;
-                    width: 100%;
-                    transition: background-color 0.3s;
-                }
-                .start-button:hover {
-                    background-color: #ffffff;
-                }
-            </style>
-            """,
-            unsafe_allow_html=True
-        )
+        inject_css("start")
 
         # ✅ 버튼 중복 방지 (고유 키 적용)
         if st.button("클릭하여 시작하기", use_container_width=True, key="start_btn"):  
@@ -155,17 +136,45 @@ def page_start():
 
 # 3) Lottie 애니메이션 로딩(옵션)
 ############################################
-def load_lottie_url(url: str):
+class LottieUnavailable(Exception):
+    """Lottie JSON 을 로컬에서도 네트워크에서도 가져오지 못한 경우"""
+
+
+@st.cache_data(show_spinner=False)
+def fetch_lottie(url: str, local_path: str):
+    """
+    Lottie 애니메이션 JSON (성공한 결과만 프로세스당 한 번 캐시)
+
+    로컬 파일이 있으면 그대로 사용하고, 없으면 한 번 내려받아 로컬에 저장합니다.
+    가져오지 못하면 LottieUnavailable (st.cache_data 는 예외를 캐시하지 않으므로 다음에 다시 시도)
+    """
+    if os.path.exists(local_path):
+        with open(local_path, "r", encoding="utf-8") as f:
+            return json.load(f)
     try:
-        r = requests.get(url)
+        r = requests.get(url, timeout=3)
         if r.status_code == 200:
-            return r.json()
-    except:
+            data = r.json()
+            try:
+                with open(local_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+            except OSError:
+                pass
+            return data
+    except (requests.exceptions.RequestException, ValueError):
         pass
-    return None
+    raise LottieUnavailable(url)
+
+
+def load_lottie(url: str, local_path: str):
+    """Lottie 애니메이션 JSON (오프라인이면 None → 로고 이미지로 대체)"""
+    try:
+        return fetch_lottie(url, local_path)
+    except LottieUnavailable:
+        return None
 
 lottie_welcome_url = "https://assets10.lottiefiles.com/packages/lf20_5e7wgehs.json"
-lottie_welcome = load_lottie_url(lottie_welcome_url)
+lottie_welcome_file = os.path.join(ASSETS_DIR, "lottie_welcome.json")
 if "trigger_rerun" not in st.session_state:
     st.session_state.trigger_rerun = False
 ############################################
@@ -193,41 +202,7 @@ def page_userinfo():
     st.balloons()
 
     # 🎨 페이지 스타일 설정
-    st.markdown("""
-        <style>
-            /* 전체 컨테이너 높이 조정 */
-            .block-container {
-                min-height: 100vh;  /* 전체 화면 높이 */
-                display: flex;
-                flex-direction: column;
-                justify-content: center;
-                align-items: center;
-            }
-
-            /* 제목과 부제목 스타일 */
-            .title-container {
-                text-align: center;
-                font-weight: bold;
-                font-size: 40px;
-                margin-bottom: 10px;
-                color: #7993c1;
-            }
-            .subtitle {
-                text-align: center;
-                font-size: 11px;
-                color: #7993c1;
-            }
-
-            /* 안내 문구 (아래에 입력 후 Enter를 눌러주세요) 중앙 정렬 */
-            .input-guide {
-                text-align: center;
-                font-size: 12px;
-                font-weight: basic;
-                color: #7993c1;
-                margin-bottom: 5px;
-            }
-        </style>
-    """, unsafe_allow_html=True)
+    inject_css("userinfo")
 
     # 🏡 화면 중앙 정렬 텍스트 (타이핑 효과)
     typewriter_effect(" 만나서 반가워요!", key="title", delay=0.07)
@@ -235,10 +210,11 @@ def page_userinfo():
     typewriter_effect("이름을 알려주세요!", key="subtitle", delay=0.07)
 
     # 🌥️ 로딩 애니메이션 or 이미지
+    lottie_welcome = load_lottie(lottie_welcome_url, lottie_welcome_file)
     if lottie_welcome:
         st_lottie(lottie_welcome, height=250, key="welcome_lottie")
     else:
-        st.image("https://via.placeholder.com/200x100?text=Loading+Clouds", use_container_width=True)
+        st.image(load_logo(), width=200)  # 오프라인이면 로컬 로고로 대체
 
     # 📝 안내 문구 중앙 정렬
     st.markdown("<p class='input-guide'>아래에 입력 후 <b>Enter</b>를 눌러주세요</p>", unsafe_allow_html=True)
@@ -271,50 +247,7 @@ def page_home():
     """, unsafe_allow_html=True)
 
     # ✅ CSS 스타일 (버튼 디자인 적용)
-    st.markdown("""
-        <style>
-        .block-container {
-                min-height: 100vh;  /* 전체 화면 높이 */
-                display: flex;
-                flex-direction: column;
-                justify-content: center;
-                align-items: center;
-            }
-        /* 전체 st.button에 대한 스타일 오버라이드 */
-        .stButton > button {
-            display: flex;
-            flex-direction: column; /* 수직 정렬 */
-            justify-content: center;
-            align-items: center;
-            width: 100%;
-            height: 120px; /* 버튼 크기 증가 */
-            padding: 10px;
-            font-size: 40px;
-            font-weight: bold;
-            text-align: center;
-            background: white;
-            border: 3px solid #7993c1;
-            border-radius: 25px;
-            color: #2c3e50;
-            cursor: pointer;
-            transition: all 0.3s ease-in-out;
-            box-shadow: 2px 2px 8px rgba(0, 0, 0, 0.1);
-            white-space: pre-line; /* 줄바꿈 지원 */
-        }
-        
-        .stButton > button:hover {
-            background: #7993c1;
-            color: white;
-            box-shadow: 2px 2px 10px rgba(74, 111, 165, 0.5);
-        }
-        /* 버튼 클릭시(Active) 스타일 */
-        .stButton > button:active {
-            background: #7993c1;
-            color: white;
-            box-shadow: 2px 2px 10px rgba(74, 111, 165, 0.8);
-        }
-        </style>
-    """, unsafe_allow_html=True)
+    inject_css("home")
 
     # ✅ 버튼 3개 배치
     col1, col2, col3 = st.columns(3)
@@ -346,46 +279,14 @@ def page_counseling():
     """, unsafe_allow_html=True)
 
     # ✅ CSS 스타일 (전체 화면 중앙 정렬)
-    st.markdown("""
-        <style>
-        .block-container {
-            min-height: 100vh;
-            display: flex;
-            flex-direction: column;
-            justify-content: center;
-            align-items: center;
-        }
-
-        .stButton > button {
-            width: 140px;
-            height: 140px;
-            font-size: 18px;
-            font-weight: bold;
-            text-align: center;
-            background: white;
-            border: 2px solid #7993c1;
-            border-radius: 7px;
-            color: #7993c1;
-            cursor: pointer;
-            transition: all 0.3s ease-in-out;
-            box-shadow: 2px 2px 6px rgba(0, 0, 0, 0.1);
-            white-space: pre-line;
-        }
-
-        .stButton > button:hover {
-            background: #7993c1;
-            color: white;
-            box-shadow: 2px 2px 10px rgba(44, 62, 80, 0.5);
-        }
-        </style>
-    """, unsafe_allow_html=True)
+    inject_css("counseling")
 
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
         if st.button("🏠\n주거"):
             st.session_state.selected_category = "주거"
-            st.session_state.counseling_messages = []  # ✅ 기존 대화 초기화
+            st.session_state.counseling_messages = ChatHistory()  # ✅ 기존 대화 초기화
             st.session_state.last_input = None  # ✅ 이전 입력도 초기화
             st.session_state.page = "chat_counseling"
             st.rerun()
@@ -393,7 +294,7 @@ def page_counseling():
     with col2:
         if st.button("💼\n일자리"):
             st.session_state.selected_category = "일자리"
-            st.session_state.counseling_messages = []
+            st.session_state.counseling_messages = ChatHistory()
             st.session_state.last_input = None
             st.session_state.page = "chat_counseling"
             st.rerun()
@@ -401,7 +302,7 @@ def page_counseling():
     with col3:
         if st.button("💰\n금융"):
             st.session_state.selected_category = "금융"
-            st.session_state.counseling_messages = []
+            st.session_state.counseling_messages = ChatHistory()
             st.session_state.last_input = None
             st.session_state.page = "chat_counseling"
             st.rerun()
@@ -409,7 +310,7 @@ def page_counseling():
     with col4:
         if st.button("🧑‍⚕\n건강 & 의료"):
             st.session_state.selected_category = "건강 & 의료"
-            st.session_state.counseling_messages = []
+            st.session_state.counseling_messages = ChatHistory()
             st.session_state.last_input = None
             st.session_state.page = "chat_counseling"
             st.rerun()
@@ -423,7 +324,7 @@ def page_counseling():
     with col5:
         if st.button("🛡️\n보험"):
             st.session_state.selected_category = "보험"
-            st.session_state.counseling_messages = []
+            st.session_state.counseling_messages = ChatHistory()
             st.session_state.last_input = None
             st.session_state.page = "chat_counseling"
             st.rerun()
@@ -431,7 +332,7 @@ def page_counseling():
     with col6:
         if st.button("📱\n휴대폰"):
             st.session_state.selected_category = "휴대폰"
-            st.session_state.counseling_messages = []
+            st.session_state.counseling_messages = ChatHistory()
             st.session_state.last_input = None
             st.session_state.page = "chat_counseling"
             st.rerun()
@@ -439,7 +340,7 @@ def page_counseling():
     with col7:
         if st.button("🆘\n지원 제도"):
             st.session_state.selected_category = "지원 제도"
-            st.session_state.counseling_messages = []
+            st.session_state.counseling_messages = ChatHistory()
             st.session_state.last_input = None
             st.session_state.page = "chat_counseling"
             st.rerun()
@@ -447,7 +348,7 @@ def page_counseling():
     with col8:
         if st.button("📚\n교육 & 학습"):
             st.session_state.selected_category = "교육 & 학습"
-            st.session_state.counseling_messages = []
+            st.session_state.counseling_messages = ChatHistory()
             st.session_state.last_input = None
             st.session_state.page = "chat_counseling"
             st.rerun()
@@ -458,7 +359,7 @@ def page_counseling():
     with col_back[1]:  # ✅ 중앙 컬럼에 배치
         if st.button("🏠︎ 처음으로"):  # ✅ 기본 Streamlit 버튼 그대로 사용 (네모 버튼 유지)
             st.session_state.page = "home"
-            st.session_state.counseling_messages = []  # ✅ "처음으로" 눌러도 초기화
+            st.session_state.counseling_messages = ChatHistory()  # ✅ "처음으로" 눌러도 초기화
             st.session_state.last_input = None
             st.rerun()
 
@@ -490,104 +391,7 @@ def page_chat_counseling():
         st.session_state.waiting_for_response = False
 
     # ✅ **CSS 스타일 수정 (입력창을 채팅창 내부에 완전히 포함)**
-    st.markdown("""
-    <style>
-    .chat-container {
-      width: 90%;
-      max-width: 600px;
-      height: 75vh;
-      display: flex;
-      flex-direction: column-reverse;
-      overflow-y: auto;
-      padding: 15px;
-      background: white;
-      margin: auto;
-      border-radius: 15px;
-      box-shadow: 0px 4px 10px rgba(0, 0, 0, 0.1);
-      position: relative;
-    }
-
-    .chat-header {
-      display: flex;
-      justify-content: space-between;
-      align-items: center;
-      width: 100%;
-      background: #5a72c1;
-      color: white;
-      padding: 12px 16px;
-      font-size: 18px;
-      font-weight: bold;
-      border-bottom: 2px solid #475b9b;
-      border-radius: 8px 8px 0 0;
-    }
-
-    .chat-header h3 {
-      flex-grow: 1;
-      text-align: center;
-      margin: 0;
-    }
-
-    .user-bubble {
-      background: #d0f0ff;
-      padding: 12px;
-      border-radius: 20px;
-      margin: 5px 0;
-      max-width: 70%;
-      margin-left: auto;
-      text-align: left;
-      box-shadow: 2px 2px 6px rgba(0, 0, 0, 0.1);
-    }
-
-    .assistant-bubble {
-      background: #ffeaa7;
-      padding: 12px;
-      border-radius: 20px;
-      margin: 5px 0;
-      max-width: 70%;
-      margin-right: auto;
-      text-align: left;
-      box-shadow: 2px 2px 6px rgba(0, 0, 0, 0.1);
-    }
-
-    .loading-bubble {
-      background: #fff2c7;
-      padding: 12px;
-      border-radius: 20px;
-      margin: 5px 0;
-      max-width: 70%;
-      margin-right: auto;
-      text-align: left;
-      box-shadow: 2px 2px 6px rgba(0, 0, 0, 0.1);
-      font-weight: bold;
-    }
-
-    /* ✅ 입력창을 채팅창 내부 최하단에 고정 */
-    .input-container {
-      width: calc(100% - 30px);
-      padding: 10px;
-      background: white;
-      border-top: 2px solid #ccc;
-      display: flex;
-      align-items: center;
-      position: absolute;
-      bottom: 0;
-      left: 15px;
-      border-radius: 0 0 15px 15px;
-      box-shadow: 0px -2px 8px rgba(0, 0, 0, 0.1);
-    }
-
-    .input-container input {
-      width: 100%;
-      padding: 10px;
-      border: none;
-      outline: none;
-      font-size: 16px;
-      border-radius: 10px;
-      background: #f1f3f4;
-    }
-    
-    </style>
-    """, unsafe_allow_html=True)
+    inject_css("chat_counseling")
 
     # ✅ **상단 타이틀 바**
     col1, col2, col3 = st.columns([1, 5, 1])
@@ -611,16 +415,20 @@ def page_chat_counseling():
     if st.session_state.waiting_for_response:
         messages_html += '<div class="loading-bubble">🐝 답변 생성 중...</div>'
 
-    # ✅ 기존 메시지 렌더링
-    for msg in reversed(st.session_state.counseling_messages):
-        if msg["role"] == "user":
-            messages_html += f'<div class="user-bubble"><strong>Q:</strong> {msg["content"]}</div>'
-        else:
-            messages_html += f'<div class="assistant-bubble"><strong>A:</strong> {msg["content"]}</div>'
+    # ✅ 기존 메시지 렌더링 (최근 메시지 창만, 새 메시지가 없으면 캐시 재사용)
+    messages_html += st.session_state.counseling_messages.render_html()
 
     messages_html += '</div>'
+
+    # ✅ 스트리밍 중인 답변을 표시할 자리 (채팅창 바로 위)
+    stream_placeholder = st.empty()
     st.markdown(messages_html, unsafe_allow_html=True)
 
+    # ✅ 화면에 없는 이전 대화는 버튼으로 한 화면씩 펼침
+    if st.session_state.counseling_messages.has_older() and st.button("⬆️ 이전 대화 더 보기", key="counseling_older_btn"):
+        st.session_state.counseling_messages.show_older()
+        st.rerun()
+
     # ✅ **입력창을 채팅창 내부 최하단에 고정 (단일 입력창 유지)**
     user_q = st.text_input(
         "질문을 입력하세요!", 
@@ -630,29 +438,21 @@ def page_chat_counseling():
 
     # ✅ **질문 입력 처리**
     if user_q and user_q != st.session_state.last_input:
-        st.session_state.counseling_messages.append({"role": "user", "content": user_q})
+        st.session_state.counseling_messages.append("user", user_q)
         st.session_state.waiting_for_response = True
         st.session_state.last_input = user_q
         st.rerun()
 
     # ✅ **AI 응답 생성 (자동 호출)**
     if st.session_state.waiting_for_response:
-        with st.spinner("🐝 답변 생성 중..."):
-            try:
-                cat_clean = cat.replace("🏠 ","").replace("💼 ","").replace("💰 ","").replace("🛡️ ","").replace("📱 ","").replace("🆘 ","")
-                
-                resp = requests.post(
-                    RAG_API_URL,
-                    json={"prompt": st.session_state.counseling_messages[-1]["content"], "category": cat_clean}
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                answer = data.get("answer", "🚨 응답 없음.")
-            except requests.exceptions.RequestException as e:
-                answer = f"오류 발생: {str(e)}"
+        # 카테고리 이름의 이모지/공백 차이는 서버 카테고리 라우터가 정리함
+        answer = stream_answer(
+            stream_placeholder, st.session_state.counseling_messages.last().content, cat, "🚨 응답 없음.",
+            session_id=st.session_state.counseling_messages.session_id
+        )
 
         # ✅ "답변 생성 중..." 제거 후 실제 응답 추가
-        st.session_state.counseling_messages.append({"role": "assistant", "content": answer})
+        st.session_state.counseling_messages.append("assistant", answer)
         st.session_state.waiting_for_response = False
         st.rerun()
 
@@ -669,111 +469,14 @@ def page_chat_counseling():
 def page_chat_talk():
     # ✅ 상태 변수 설정
     if "chat_messages" not in st.session_state:
-        st.session_state.chat_messages = []  # 수다 대화 상태 변수 추가
+        st.session_state.chat_messages = ChatHistory()  # 수다 대화 상태 변수 추가
     if "last_chat_input" not in st.session_state:
         st.session_state.last_chat_input = None  
     if "waiting_for_chat_response" not in st.session_state:
         st.session_state.waiting_for_chat_response = False
 
     # ✅ **CSS 스타일 수정 (입력창을 채팅창 내부에 완전히 포함)**
-    st.markdown("""
-    <style>
-    .chat-container {
-      width: 90%;
-      max-width: 600px;
-      height: 75vh;
-      display: flex;
-      flex-direction: column-reverse;
-      overflow-y: auto;
-      padding: 15px;
-      background: white;
-      margin: auto;
-      border-radius: 15px;
-      box-shadow: 0px 4px 10px rgba(0, 0, 0, 0.1);
-      position: relative;
-    }
-
-    .chat-header {
-      display: flex;
-      justify-content: space-between;
-      align-items: center;
-      width: 100%;
-      background: #ffcc66;
-      color: white;
-      padding: 12px 16px;
-      font-size: 18px;
-      font-weight: bold;
-      border-bottom: 2px solid #ffb347;
-      border-radius: 8px 8px 0 0;
-    }
-
-    .chat-header h3 {
-      flex-grow: 1;
-      text-align: center;
-      margin: 0;
-    }
-
-    .user-bubble {
-      background: #d0f0ff;
-      padding: 12px;
-      border-radius: 20px;
-      margin: 5px 0;
-      max-width: 70%;
-      margin-left: auto;
-      text-align: left;
-      box-shadow: 2px 2px 6px rgba(0, 0, 0, 0.1);
-    }
-
-    .assistant-bubble {
-      background: #ffeb99;
-      padding: 12px;
-      border-radius: 20px;
-      margin: 5px 0;
-      max-width: 70%;
-      margin-right: auto;
-      text-align: left;
-      box-shadow: 2px 2px 6px rgba(0, 0, 0, 0.1);
-    }
-
-    .loading-bubble {
-      background: #fff2c7;
-      padding: 12px;
-      border-radius: 20px;
-      margin: 5px 0;
-      max-width: 70%;
-      margin-right: auto;
-      text-align: left;
-      box-shadow: 2px 2px 6px rgba(0, 0, 0, 0.1);
-      font-weight: bold;
-    }
-
-    /* ✅ 입력창을 채팅창 내부 최하단에 고정 */
-    .input-container {
-      width: calc(100% - 30px);
-      padding: 10px;
-      background: white;
-      border-top: 2px solid #ccc;
-      display: flex;
-      align-items: center;
-      position: absolute;
-      bottom: 0;
-      left: 15px;
-      border-radius: 0 0 15px 15px;
-      box-shadow: 0px -2px 8px rgba(0, 0, 0, 0.1);
-    }
-
-    .input-container input {
-      width: 100%;
-      padding: 10px;
-      border: none;
-      outline: none;
-      font-size: 16px;
-      border-radius: 10px;
-      background: #f1f3f4;
-    }
-    
-    </style>
-    """, unsafe_allow_html=True)
+    inject_css("chat_talk")
 
     # ✅ **상단 타이틀 바**
     col1, col2, col3 = st.columns([1, 5, 1])
@@ -783,7 +486,7 @@ def page_chat_talk():
             st.rerun()
 
     with col2:
-        st.markdown(f"<h3 style='text-align: center;'>☕ 수다 떨기</h3>", unsafe_allow_html=True)
+        st.markdown("<h3 style='text-align: center;'>☕ 수다 떨기</h3>", unsafe_allow_html=True)
 
     with col3:
         if st.button("🏠", key="home_chat_btn"):
@@ -797,16 +500,20 @@ def page_chat_talk():
     if st.session_state.waiting_for_chat_response:
         messages_html += '<div class="loading-bubble">🐝 답변 생성 중...</div>'
 
-    # ✅ 기존 메시지 렌더링
-    for msg in reversed(st.session_state.chat_messages):
-        if msg["role"] == "user":
-            messages_html += f'<div class="user-bubble"><strong>Q:</strong> {msg["content"]}</div>'
-        else:
-            messages_html += f'<div class="assistant-bubble"><strong>A:</strong> {msg["content"]}</div>'
+    # ✅ 기존 메시지 렌더링 (최근 메시지 창만, 새 메시지가 없으면 캐시 재사용)
+    messages_html += st.session_state.chat_messages.render_html()
 
     messages_html += '</div>'
+
+    # ✅ 스트리밍 중인 답변을 표시할 자리 (채팅창 바로 위)
+    stream_placeholder = st.empty()
     st.markdown(messages_html, unsafe_allow_html=True)
 
+    # ✅ 화면에 없는 이전 대화는 버튼으로 한 화면씩 펼침
+    if st.session_state.chat_messages.has_older() and st.button("⬆️ 이전 대화 더 보기", key="chat_older_btn"):
+        st.session_state.chat_messages.show_older()
+        st.rerun()
+
     # ✅ **입력창을 채팅창 내부 최하단에 고정 (단일 입력창 유지)**
     user_q = st.text_input(
         "자유롭게 수다를 떨어보세요!", 
@@ -816,27 +523,20 @@ def page_chat_talk():
 
     # ✅ **질문 입력 처리**
     if user_q and user_q != st.session_state.last_chat_input:
-        st.session_state.chat_messages.append({"role": "user", "content": user_q})
+        st.session_state.chat_messages.append("user", user_q)
         st.session_state.waiting_for_chat_response = True
         st.session_state.last_chat_input = user_q
         st.rerun()
 
     # ✅ **AI 응답 생성 (자동 호출)**
     if st.session_state.waiting_for_chat_response:
-        with st.spinner("🐝 답변 생성 중..."):
-            try:
-                resp = requests.post(
-                    RAG_API_URL,
-                    json={"prompt": st.session_state.chat_messages[-1]["content"], "category": "general_chat"}
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                answer = data.get("answer", "🚨 응답 없음.")
-            except requests.exceptions.RequestException as e:
-                answer = f"오류 발생: {str(e)}"
+        answer = stream_answer(
+            stream_placeholder, st.session_state.chat_messages.last().content, "general_chat", "🚨 응답 없음.",
+            session_id=st.session_state.chat_messages.session_id
+        )
 
         # ✅ "답변 생성 중..." 제거 후 실제 응답 추가
-        st.session_state.chat_messages.append({"role": "assistant", "content": answer})
+        st.session_state.chat_messages.append("assistant", answer)
         st.session_state.waiting_for_chat_response = False
         st.rerun()
 
@@ -851,111 +551,14 @@ def page_chat_talk():
 def page_food_chat():
     # ✅ 상태 변수 설정
     if "food_messages" not in st.session_state:
-        st.session_state.food_messages = []  # 맛집 챗봇 대화 저장
+        st.session_state.food_messages = ChatHistory()  # 맛집 챗봇 대화 저장
     if "last_food_input" not in st.session_state:
         st.session_state.last_food_input = None  
     if "waiting_for_food_response" not in st.session_state:
         st.session_state.waiting_for_food_response = False
 
     # ✅ **CSS 스타일 수정 (입력창을 채팅창 내부에 완전히 포함)**
-    st.markdown("""
-    <style>
-    .chat-container {
-      width: 90%;
-      max-width: 600px;
-      height: 75vh;
-      display: flex;
-      flex-direction: column-reverse;
-      overflow-y: auto;
-      padding: 15px;
-      background: white;
-      margin: auto;
-      border-radius: 15px;
-      box-shadow: 0px 4px 10px rgba(0, 0, 0, 0.1);
-      position: relative;
-    }
-
-    .chat-header {
-      display: flex;
-      justify-content: space-between;
-      align-items: center;
-      width: 100%;
-      background: #ff9966;
-      color: white;
-      padding: 12px 16px;
-      font-size: 18px;
-      font-weight: bold;
-      border-bottom: 2px solid #ff784f;
-      border-radius: 8px 8px 0 0;
-    }
-
-    .chat-header h3 {
-      flex-grow: 1;
-      text-align: center;
-      margin: 0;
-    }
-
-    .user-bubble {
-      background: #d0f0ff;
-      padding: 12px;
-      border-radius: 20px;
-      margin: 5px 0;
-      max-width: 70%;
-      margin-left: auto;
-      text-align: left;
-      box-shadow: 2px 2px 6px rgba(0, 0, 0, 0.1);
-    }
-
-    .assistant-bubble {
-      background: #ffcc99;
-      padding: 12px;
-      border-radius: 20px;
-      margin: 5px 0;
-      max-width: 70%;
-      margin-right: auto;
-      text-align: left;
-      box-shadow: 2px 2px 6px rgba(0, 0, 0, 0.1);
-    }
-
-    .loading-bubble {
-      background: #fff2c7;
-      padding: 12px;
-      border-radius: 20px;
-      margin: 5px 0;
-      max-width: 70%;
-      margin-right: auto;
-      text-align: left;
-      box-shadow: 2px 2px 6px rgba(0, 0, 0, 0.1);
-      font-weight: bold;
-    }
-
-    /* ✅ 입력창을 채팅창 내부 최하단에 고정 */
-    .input-container {
-      width: calc(100% - 30px);
-      padding: 10px;
-      background: white;
-      border-top: 2px solid #ccc;
-      display: flex;
-      align-items: center;
-      position: absolute;
-      bottom: 0;
-      left: 15px;
-      border-radius: 0 0 15px 15px;
-      box-shadow: 0px -2px 8px rgba(0, 0, 0, 0.1);
-    }
-
-    .input-container input {
-      width: 100%;
-      padding: 10px;
-      border: none;
-      outline: none;
-      font-size: 16px;
-      border-radius: 10px;
-      background: #f1f3f4;
-    }
-    
-    </style>
-    """, unsafe_allow_html=True)
+    inject_css("food_chat")
 
     # ✅ **상단 타이틀 바**
     col1, col2, col3 = st.columns([1, 5, 1])
@@ -965,7 +568,7 @@ def page_food_chat():
             st.rerun()
 
     with col2:
-        st.markdown(f"<h3 style='text-align: center;'>🍽️ 맛집 추천 챗봇</h3>", unsafe_allow_html=True)
+        st.markdown("<h3 style='text-align: center;'>🍽️ 맛집 추천 챗봇</h3>", unsafe_allow_html=True)
 
     with col3:
         if st.button("🏠", key="home_food_btn"):
@@ -979,16 +582,20 @@ def page_food_chat():
     if st.session_state.waiting_for_food_response:
         messages_html += '<div class="loading-bubble">🐝 맛집 추천 중...</div>'
 
-    # ✅ 기존 메시지 렌더링
-    for msg in reversed(st.session_state.food_messages):
-        if msg["role"] == "user":
-            messages_html += f'<div class="user-bubble"><strong>Q:</strong> {msg["content"]}</div>'
-        else:
-            messages_html += f'<div class="assistant-bubble"><strong>A:</strong> {msg["content"]}</div>'
+    # ✅ 기존 메시지 렌더링 (최근 메시지 창만, 새 메시지가 없으면 캐시 재사용)
+    messages_html += st.session_state.food_messages.render_html()
 
     messages_html += '</div>'
+
+    # ✅ 스트리밍 중인 답변을 표시할 자리 (채팅창 바로 위)
+    stream_placeholder = st.empty()
     st.markdown(messages_html, unsafe_allow_html=True)
 
+    # ✅ 화면에 없는 이전 대화는 버튼으로 한 화면씩 펼침
+    if st.session_state.food_messages.has_older() and st.button("⬆️ 이전 대화 더 보기", key="food_older_btn"):
+        st.session_state.food_messages.show_older()
+        st.rerun()
+
     # ✅ **입력창을 채팅창 내부 최하단에 고정 (단일 입력창 유지)**
     user_q = st.text_input(
         "어떤 음식이 먹고 싶나요?", 
@@ -998,27 +605,20 @@ def page_food_chat():
 
     # ✅ **질문 입력 처리**
     if user_q and user_q != st.session_state.last_food_input:
-        st.session_state.food_messages.append({"role": "user", "content": user_q})
+        st.session_state.food_messages.append("user", user_q)
         st.session_state.waiting_for_food_response = True
         st.session_state.last_food_input = user_q
         st.rerun()
 
     # ✅ **AI 응답 생성 (자동 호출)**
     if st.session_state.waiting_for_food_response:
-        with st.spinner("🐝 맛집 추천 중..."):
-            try:
-                resp = requests.post(
-                    RAG_API_URL,
-                    json={"prompt": st.session_state.food_messages[-1]["content"], "category": "food_recommendation"}
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                answer = data.get("answer", "🚨 추천 없음.")
-            except requests.exceptions.RequestException as e:
-                answer = f"오류 발생: {str(e)}"
+        answer = stream_answer(
+            stream_placeholder, st.session_state.food_messages.last().content, "food_recommendation", "🚨 추천 없음.",
+            session_id=st.session_state.food_messages.session_id
+        )
 
         # ✅ "추천 생성 중..." 제거 후 실제 응답 추가
-        st.session_state.food_messages.append({"role": "assistant", "content": answer})
+        st.session_state.food_messages.append("assistant", answer)
         st.session_state.waiting_for_food_response = False
         st.rerun()
 ########################################
@@ -1041,3 +641,11 @@ elif page == "chat":
 elif page == "food":  # ✅ 맛집 탐방 챗봇 적용
     page_food_chat()
 ########################################
+
+# 6) 스크립트 실행(rerun) 시간 기록 (SHOW_RERUN_TIMING=1 이면 화면에도 표시)
+########################################
+rerun_ms = round((time.perf_counter() - RERUN_STARTED) * 1000, 1)
+logger.info(f"⏱️ '{page}' 페이지 스크립트 실행 {rerun_ms}ms")
+if os.getenv("SHOW_RERUN_TIMING", "0") == "1":
+    st.caption(f"⏱️ rerun {rerun_ms}ms")
+########################################
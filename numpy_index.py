@@ -0,0 +1,118 @@
+import os
+import json
+
+import numpy as np
+from langchain_core.documents import Document
+
+# 📌 numpy 벡터 인덱스 저장 위치 (vectorDB/_numpy/<카테고리>/)
+NUMPY_DIR = "_numpy"
+EMBEDDINGS_FILE = "embeddings.npy"
+DOCS_FILE = "docs.jsonl"
+DTYPES = ("float32", "float16")
+
+
+def normalize_rows(matrix):
+    """행(또는 벡터 하나)을 길이 1로 정규화 (float32)"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class NumpyVectorIndex:
+    """
+    정확한(brute-force) 코사인 유사도 벡터 인덱스 (카테고리당 수백 개 청크 규모용 Chroma 대체)
+
+    저장 파일
+    - embeddings.npy: 정규화된 청크 임베딩 (float32 또는 float16), 읽을 때는 memory-map
+    - docs.jsonl: 청크 ID / 내용 / metadata (행 순서 = embeddings 행 순서)
+
+    검색은 행렬 곱 한 번과 argpartition 으로 상위 k개를 고릅니다.
+    여러 워커 프로세스가 같은 파일을 memory-map 하면 임베딩은 page cache 한 벌만 사용합니다.
+    """
+
+    def __init__(self, embeddings, docs):
+        if len(embeddings) != len(docs):
+            raise ValueError(f"임베딩 수({len(embeddings)})와 문서 수({len(docs)})가 다릅니다.")
+        self.embeddings = embeddings
+        self.docs = docs
+        self._row_by_id = {doc["id"]: row for row, doc in enumerate(docs)}
+
+    @property
+    def ids(self):
+        return [doc["id"] for doc in self.docs]
+
+    @property
+    def dimension(self):
+        return int(self.embeddings.shape[1]) if self.embeddings.ndim == 2 else 0
+
+    @classmethod
+    def build(cls, docs, embeddings, dtype="float32"):
+        """[{"id", "page_content", "metadata"}] 와 임베딩 행렬로 인덱스 생성 (정규화 후 dtype 으로 저장)"""
+        if dtype not in DTYPES:
+            raise ValueError(f"지원하지 않는 dtype: {dtype}")
+        return cls(normalize_rows(embeddings).astype(dtype), list(docs))
+
+    def save(self, index_dir):
+        """새 파일로 쓰고 교체 (서비스 중인 프로세스가 memory-map 한 기존 파일은 그대로 유지됨)"""
+        os.makedirs(index_dir, exist_ok=True)
+        embeddings_path = os.path.join(index_dir, EMBEDDINGS_FILE)
+        docs_path = os.path.join(index_dir, DOCS_FILE)
+        with open(embeddings_path + ".tmp", "wb") as f:
+            np.save(f, np.ascontiguousarray(self.embeddings))
+        with open(docs_path + ".tmp", "w", encoding="utf-8") as f:
+            for doc in self.docs:
+                f.write(json.dumps(doc, ensure_ascii=False) + "\n")
+        os.replace(embeddings_path + ".tmp", embeddings_path)
+        os.replace(docs_path + ".tmp", docs_path)
+
+    @classmethod
+    def load(cls, index_dir, mmap=True):
+        embeddings = np.load(os.path.join(index_dir, EMBEDDINGS_FILE), mmap_mode="r" if mmap else None)
+        with open(os.path.join(index_dir, DOCS_FILE), "r", encoding="utf-8") as f:
+            docs = [json.loads(line) for line in f if line.strip()]
+        return cls(embeddings, docs)
+
+    @staticmethod
+    def _top_k(scores, k):
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])]
+
+    def search(self, query_embedding, k=5):
+        """코사인 유사도 상위 k개 → [(Document, 유사도)]"""
+        if not self.docs:
+            return []
+        scores = self.embeddings @ normalize_rows(query_embedding)
+        return [(self._document(int(i)), float(scores[i])) for i in self._top_k(scores, k)]
+
+    def search_batch(self, query_embeddings, k=5):
+        """여러 질문을 행렬 곱 한 번으로 검색 → 질문별 [(Document, 유사도)]"""
+        if not self.docs:
+            return [[] for _ in query_embeddings]
+        scores = normalize_rows(query_embeddings) @ self.embeddings.T
+        return [[(self._document(int(i)), float(row[i])) for i in self._top_k(row, k)] for row in scores]
+
+    def embeddings_by_id(self, ids):
+        """청크 ID → 저장된 정규화 임베딩 (인덱스에 없는 ID 는 제외)"""
+        return {
+            doc_id: np.asarray(self.embeddings[self._row_by_id[doc_id]], dtype=np.float32)
+            for doc_id in ids if doc_id in self._row_by_id
+        }
+
+    def _document(self, row):
+        doc = self.docs[row]
+        return Document(id=doc["id"], page_content=doc["page_content"], metadata=doc["metadata"])
+
+    # 📌 main.py 가 Chroma 와 같은 방식으로 호출하는 메서드 (per-category 전용이라 filter 는 지원하지 않음)
+    def similarity_search_by_vector(self, embedding, k=4, filter=None):
+        if filter:
+            raise ValueError("numpy 벡터 인덱스는 metadata filter 를 지원하지 않습니다. (per-category 레이아웃 전용)")
+        return [doc for doc, _ in self.search(embedding, k)]
+
+    def similarity_search_by_vector_with_relevance_scores(self, embedding, k=4, filter=None):
+        """Chroma 와 같이 거리(1 - 코사인 유사도, 작을수록 가까움)와 함께 반환"""
+        if filter:
+            raise ValueError("numpy 벡터 인덱스는 metadata filter 를 지원하지 않습니다. (per-category 레이아웃 전용)")
+        return [(doc, 1.0 - score) for doc, score in self.search(embedding, k)]
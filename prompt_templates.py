@@ -0,0 +1,53 @@
+from context_packer import count_tokens
+
+
+class PromptTemplate:
+    """
+    고정된 앞부분(prefix)과 요청마다 바뀌는 뒷부분(body)으로 나눈 프롬프트 템플릿
+
+    - prefix: 시스템 지시문처럼 모든 요청에 똑같은 부분 (생성 프로필마다 한 번만 만들고 토큰 수도 한 번만 계산)
+    - body: str.format 자리표시자({knowledge_base}, {question} 등)가 있는 부분
+    prefix 가 항상 프롬프트 맨 앞에 같은 바이트로 오므로 LLM 서버의 자동 prefix caching 에 그대로 쓸 수 있습니다.
+    요청 경로에서는 count_tokens 로 프롬프트 토큰 수를 계산해 응답과 rag_prompt_tokens_total 에 기록합니다.
+    """
+    __slots__ = ("profile", "prefix", "body", "_prefix_tokens")
+
+    def __init__(self, profile, prefix, body):
+        self.profile = profile
+        self.prefix = prefix
+        self.body = body
+        self._prefix_tokens = None
+
+    @property
+    def prefix_tokens(self):
+        """prefix 토큰 수 (처음 사용할 때 한 번만 계산, 토크나이저 로드 전에 만들 수 있도록 지연 계산)"""
+        if self._prefix_tokens is None:
+            self._prefix_tokens = count_tokens(self.prefix)
+        return self._prefix_tokens
+
+    def render(self, **values):
+        return self.prefix + self.body.format(**values)
+
+    def count_tokens(self, prompt):
+        """이 템플릿으로 만든 프롬프트의 토큰 수 (prefix 는 캐시된 값, 나머지만 새로 계산)"""
+        if prompt.startswith(self.prefix):
+            return self.prefix_tokens + count_tokens(prompt[len(self.prefix):])
+        return count_tokens(prompt)
+
+    def describe(self):
+        return {"profile": self.profile, "prefix_chars": len(self.prefix), "prefix_tokens": self.prefix_tokens}
+
+
+def register_prefixes(model, templates):
+    """
+    prefix caching 을 지원하는 LLM 클라이언트(cache_prefix 메서드)에 공통 prefix 등록 → 등록한 prefix 수
+
+    현재 cache_prefix 가 있는 클라이언트는 FakeModelInference 뿐입니다. (Watsonx ModelInference 에는 이런 API 가 없음)
+    지원하지 않는 클라이언트는 그대로 전체 프롬프트를 보냅니다. (prefix 가 같으므로 서버 측 자동 캐시가 있다면 그대로 적용됨)
+    """
+    if not hasattr(model, "cache_prefix"):
+        return 0
+    prefixes = list(dict.fromkeys(template.prefix for template in templates))
+    for prefix in prefixes:
+        model.cache_prefix(prefix)
+    return len(prefixes)
@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import random
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# 📌 RAG 백엔드 주소 (main.py 서버)
+RAG_API_BASE_URL = os.getenv("RAG_API_BASE_URL", "http://localhost:8030")
+
+# 재시도할 응답 코드 (과부하 429, 게이트웨이/일시 장애)
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+
+class RAGClientError(Exception):
+    """재시도 후에도 백엔드 호출이 실패한 경우"""
+
+
+class CircuitOpenError(RAGClientError):
+    """최근 연속 실패로 회로가 열려 있어 호출하지 않은 경우"""
+
+
+class CircuitBreaker:
+    """
+    연속 실패 시 일정 시간 호출을 막는 회로 차단기
+
+    - closed: 정상 호출
+    - open: failure_threshold 번 연속 실패 → reset_timeout 동안 바로 실패 처리
+    - half-open: reset_timeout 이 지나면 한 번만 시험 호출, 성공하면 closed
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                logger.warning(f"⛔ RAG 백엔드 회로 열림 ({self._failures}회 연속 실패, {self.reset_timeout}초 후 재시도)")
+
+
+class RAGClient:
+    """
+    Streamlit 프론트엔드용 RAG 백엔드 클라이언트
+
+    - keep-alive 연결을 재사용하는 세션 (HTTPAdapter 연결 풀)
+    - 연결/읽기 timeout
+    - 연결 오류, timeout, 429/5xx 는 지터를 준 지수 백오프로 재시도 (Retry-After 우선)
+    - 연속 실패 시 회로 차단기로 빠르게 실패
+    - /ask/stream NDJSON 프레임을 받는 대로 전달 (답변을 점진적으로 표시)
+    """
+
+    def __init__(self, base_url=RAG_API_BASE_URL, connect_timeout=3.0, read_timeout=120.0, max_retries=2,
+                 backoff_base=0.5, backoff_max=4.0, pool_size=10, breaker=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _backoff_seconds(self, attempt, response=None):
+        """Retry-After 헤더가 있으면 따르고, 없으면 full jitter 지수 백오프"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _post(self, path, payload, stream=False):
+        """재시도와 회로 차단기를 적용한 POST (스트리밍은 응답 헤더를 받을 때까지만 재시도)"""
+        if not self.breaker.allow():
+            raise CircuitOpenError("서버 연결이 불안정합니다. 잠시 후 다시 시도해 주세요.")
+
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self.session.post(self.base_url + path, json=payload, timeout=self.timeout, stream=stream)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    self.breaker.record_success()
+                    return response
+                last_error = RAGClientError(f"RAG 서버 응답 {response.status_code}")
+                response.close()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                last_error = e
+            except requests.exceptions.RequestException as e:
+                # 4xx 등 재시도해도 소용없는 오류
+                self.breaker.record_success()
+                raise RAGClientError(f"RAG 요청 실패: {str(e)}") from e
+
+            if attempt < self.max_retries:
+                delay = self._backoff_seconds(attempt, response)
+                logger.warning(f"🔁 RAG 요청 재시도 {attempt + 1}/{self.max_retries} ({delay:.2f}초 후): {str(last_error)}")
+                time.sleep(delay)
+
+        self.breaker.record_failure()
+        logger.error(f"❌ RAG 응답 오류: {str(last_error)}")
+        raise RAGClientError(f"RAG 서버에 연결할 수 없습니다: {str(last_error)}")
+
+    def ask(self, prompt, category, **extra):
+        """/ask/ 호출 → 응답 JSON"""
+        return self._post("/ask/", dict({"prompt": prompt, "category": category}, **extra)).json()
+
+    def ask_stream(self, prompt, category, **extra):
+        """/ask/stream 호출 → NDJSON 프레임(dict)을 받는 대로 yield"""
+        response = self._post("/ask/stream", dict({"prompt": prompt, "category": category}, **extra), stream=True)
+        response.encoding = "utf-8"  # application/x-ndjson 은 charset 이 없어 직접 지정
+        with response:
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if line:
+                        yield json.loads(line)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                # 스트림 도중 끊긴 경우 (이미 받은 토큰은 호출한 쪽에 전달됨)
+                self.breaker.record_failure()
+                raise RAGClientError(f"답변 스트림이 중단되었습니다: {str(e)}") from e
@@ -1,45 +1,167 @@
+"""
+평가용 응답 수집기
+
+generated_questions.json 의 질문을 /ask/batch 로 동시에 보내고, 받은 결과를 바로
+rag_evaluation_responses.jsonl 에 한 줄씩 추가합니다. 중간에 멈춰도 다시 실행하면
+이미 답변을 받은 질문은 건너뛰고 이어서 수집합니다. 끝나면 JSONL 을 CSV 로 변환하고
+질문별 검색/생성 시간 분포를 출력합니다 (평가 수집 = 지연 시간 벤치마크).
+
+    python collect_responses.py --workers 4 --batch-size 8
+"""
+import os
 import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
 import pandas as pd
-import time
+from requests.adapters import HTTPAdapter
+
+# ✅ 이 상태의 항목은 답변을 받은 것으로 보고 다시 보내지 않음 (문서 없음도 기존처럼 그대로 기록)
+ANSWERED_STATUSES = ("ok", "no_db", "no_results")
+
+
+def load_answered(jsonl_path):
+    """이미 답변을 받은 (category, question) 집합"""
+    answered = set()
+    if not os.path.exists(jsonl_path):
+        return answered
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # 중단되면서 잘린 마지막 줄
+            if row.get("status") in ANSWERED_STATUSES:
+                answered.add((row["category"], row["question"]))
+    return answered
+
+
+def create_session(workers):
+    """워커 수만큼 연결을 재사용하는 세션"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def post_batch(session, api_url, batch, timeout):
+    """질문 묶음 하나 전송 → (항목별 응답, 클라이언트 측 왕복 시간 ms)"""
+    payload = {"items": [{"prompt": entry["prompt"], "category": entry["category"]} for entry in batch]}
+    started = time.perf_counter()
+    try:
+        response = session.post(api_url, json=payload, timeout=timeout)
+        response.raise_for_status()
+        items = response.json()["items"]
+    except Exception as e:
+        print(f"❌ 요청 실패: {str(e)}")
+        items = [{"category": entry["category"], "prompt": entry["prompt"], "status": "error"} for entry in batch]
+    return items, round((time.perf_counter() - started) * 1000, 1)
+
+
+def to_row(item, client_ms):
+    timings = item.get("timings", {})
+    return {
+        "category": item["category"],
+        "question": item["prompt"],
+        "status": item["status"],
+        "retrieved_context": item.get("retrieved_context", "검색된 문서 없음"),
+        "retrieved_chunks": json.dumps(item.get("retrieved_chunks", []), ensure_ascii=False),  # 검색 지표용 청크 전문 (JSON 리스트)
+        "generated_answer": item.get("answer", "답변 없음"),
+        "ground_truth": "해당 질문에 대한 사전 정의된 기대 답변",
+        "cache": item.get("cache"),
+        "retrieval_ms": timings.get("retrieval_ms"),
+        "generation_ms": timings.get("generation_ms"),
+        "total_ms": timings.get("total_ms"),
+        "client_ms": client_ms
+    }
+
+
+def write_csv(jsonl_path, csv_path):
+    """답변을 받은 결과만 CSV 로 변환 (같은 질문은 마지막 결과 사용)"""
+    rows = {}
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if row.get("status") in ANSWERED_STATUSES:
+                rows[(row["category"], row["question"])] = row
+    df = pd.DataFrame(list(rows.values()))
+    df.to_csv(csv_path, index=False, encoding="utf-8")
+    return df
+
+
+def print_latency_summary(df):
+    """캐시를 거치지 않은 응답 기준 시간 분포"""
+    if df.empty or "cache" not in df:
+        return
+    measured = df[df["cache"].isna()]
+    print("\n⏱️ 지연 시간 (ms, 캐시 적중 제외)")
+    for column in ("retrieval_ms", "generation_ms", "total_ms", "client_ms"):
+        values = measured[column].dropna()
+        if values.empty:
+            continue
+        print(
+            f"  {column:>14}: p50={values.quantile(0.5):.1f}  p95={values.quantile(0.95):.1f}  "
+            f"mean={values.mean():.1f}  (n={len(values)})"
+        )
 
-# ✅ FastAPI RAG 모델 엔드포인트
-api_url = "http://127.0.0.1:8030/ask/"
 
-# ✅ JSON 질문 리스트 불러오기
-input_file = "generated_questions.json"
-with open(input_file, "r", encoding="utf-8") as f:
-    category_questions = json.load(f)  # 리스트 형태로 로드됨
+def main():
+    parser = argparse.ArgumentParser(description="평가용 RAG 응답 수집 (동시 요청, 이어서 수집)")
+    parser.add_argument("--api-url", default="http://127.0.0.1:8030/ask/batch")
+    parser.add_argument("--input", default="generated_questions.json")
+    parser.add_argument("--jsonl", default="rag_evaluation_responses.jsonl")
+    parser.add_argument("--output", default="rag_evaluation_data.csv")
+    parser.add_argument("--workers", type=int, default=4, help="동시에 보낼 요청 수")
+    parser.add_argument("--batch-size", type=int, default=8, help="요청 하나에 담을 질문 수 (서버 ASK_BATCH_MAX_ITEMS 이하)")
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args()
 
-# ✅ 평가 데이터 저장 리스트
-data = []
+    # ✅ JSON 질문 리스트 불러오기 (카테고리 공백 제거)
+    with open(args.input, "r", encoding="utf-8") as f:
+        category_questions = [
+            {"prompt": entry["prompt"], "category": entry["category"].strip()}
+            for entry in json.load(f)
+        ]
 
-print("\n🔹 FastAPI로 질문 전송 중...")
+    answered = load_answered(args.jsonl)
+    todo = [entry for entry in category_questions if (entry["category"], entry["prompt"]) not in answered]
+    print(f"\n🔹 전체 {len(category_questions)}개 중 {len(answered)}개는 이미 수집됨, {len(todo)}개 전송")
 
-for entry in category_questions:
-    category = entry["category"].strip()  # ✅ 공백 제거
-    question = entry["prompt"]  # ✅ 질문 가져오기
+    batches = [todo[start:start + args.batch_size] for start in range(0, len(todo), args.batch_size)]
+    session = create_session(args.workers)
+    done = 0
+    started = time.perf_counter()
 
-    payload = {"prompt": question, "category": category}  # ✅ FastAPI 요청 JSON 형식 유지
-    response = requests.post(api_url, json=payload)
+    with open(args.jsonl, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(post_batch, session, args.api_url, batch, args.timeout) for batch in batches]
+        for future in as_completed(futures):
+            items, client_ms = future.result()
+            # ✅ 결과를 받는 즉시 파일에 추가 (중단되어도 다음 실행에서 이어서 수집)
+            for item in items:
+                out.write(json.dumps(to_row(item, client_ms), ensure_ascii=False) + "\n")
+            out.flush()
+            done += len(items)
+            failed = [item["prompt"] for item in items if item["status"] not in ANSWERED_STATUSES]
+            for question in failed:
+                print(f"❌ 질문 처리 실패: {question}")
+            print(f"✅ {done}/{len(todo)} 처리 완료")
 
-    if response.status_code == 200:
-        response_json = response.json()
-        data.append({
-            "category": category,
-            "question": question,
-            "retrieved_context": response_json.get("retrieved_context", "검색된 문서 없음"),
-            "generated_answer": response_json.get("answer", "답변 없음"),
-            "ground_truth": "해당 질문에 대한 사전 정의된 기대 답변"
-        })
-    else:
-        print(f"❌ 요청 실패: {response.status_code}, {response.text}")
+    print(f"\n⏱️ 수집 시간: {time.perf_counter() - started:.1f}초")
 
-    time.sleep(1)  # ✅ 요청 간 1초 대기 (ChromaDB 안정화)
+    # ✅ CSV로 저장
+    df = write_csv(args.jsonl, args.output)
+    print_latency_summary(df)
+    print(f"\n✅ 전체 평가 데이터 저장 완료: {args.output} ({len(df)}개)")
 
-# ✅ CSV로 저장
-output_file = "rag_evaluation_data.csv"
-df = pd.DataFrame(data)
-df.to_csv(output_file, index=False, encoding="utf-8")
 
-print(f"\n✅ 전체 평가 데이터 저장 완료: {output_file}")
+if __name__ == "__main__":
+    main()
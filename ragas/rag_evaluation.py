@@ -1,62 +1,321 @@
+"""
+RAG 응답 평가
+
+    python rag_evaluation.py                       # 기존 방식: RAGAS + Hugging Face 원격 모델 (FLAN-T5-Large)
+    python rag_evaluation.py --mode local --gold gold.json --judge lexical --workers 8
+
+local 모드는 네트워크 없이 실행됩니다.
+- 검색 지표 (recall@k, MRR, context precision): gold 라벨 문장이 검색된 청크에 포함되는지로 계산 (numpy 벡터 연산)
+- 답변 지표 (answer_relevancy, faithfulness): 로컬 judge 로 계산
+  - lexical: 글자 2-gram 겹침 기반 (모델 없음, 기본값)
+  - cross-encoder:<모델 경로 또는 로컬 캐시 모델 이름>: sentence-transformers CrossEncoder
+- 행마다 병렬로 점수를 계산하고, (judge, 질문, 답변, 문서) 해시로 점수를 캐시해 바뀐 행만 다시 계산
+gold 라벨 형식은 benchmarks/bench_utils.py 의 load_gold 와 같습니다.
+"""
 import os
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from ragas import evaluate
-from ragas.metrics import faithfulness, answer_relevancy, context_precision
-from langchain_huggingface import HuggingFaceEndpoint
-from huggingface_hub import HfApi
-
-# ✅ Hugging Face API Key 설정
-os.environ["HUGGINGFACEHUB_API_TOKEN"] = "your-huggingface-api-key"
-
-# ✅ Hugging Face 인증 테스트
-api = HfApi()
-try:
-    user_info = api.whoami()
-    print("✅ Hugging Face 인증 성공:", user_info)
-except Exception as e:
-    print("❌ Hugging Face 인증 실패:", e)
-    exit(1)  # 인증 실패 시 프로그램 종료
-
-# ✅ 공개 Hugging Face 모델 사용 (FLAN-T5-Large)
-llm = HuggingFaceEndpoint(
-    repo_id="google/flan-t5-large",  # ✅ 공개 모델로 변경
-    task="text2text-generation",
-    temperature=0.7,
-    max_new_tokens=512
-)
-
-# ✅ 평가 데이터 불러오기
-input_file = "rag_evaluation_data.csv"
-df = pd.read_csv(input_file)
-
-# ✅ Hugging Face 모델로 평가 수행
-results = evaluate(
-    df,
-    metrics=[
-        answer_relevancy,
-        context_precision,
-        faithfulness
-    ],
-    llm=llm
-)
-
-# ✅ 평가 결과 저장
-output_file = "ragas_evaluation_results_hf.csv"
-results.to_csv(output_file, index=False)
-
-# ✅ 시각화: 평가 지표별 성능 비교
-plt.figure(figsize=(10, 6))
-plt.bar(results.columns, results.iloc[0], color=['blue', 'green', 'orange'])
-plt.xlabel("RAGAS Metrics")
-plt.ylabel("Score")
-plt.ylim(0, 1)
-plt.title("RAGAS Evaluation Results (Using Hugging Face Model)")
-
-# ✅ 그래프 저장 및 출력
-plt.savefig("ragas_evaluation_chart_hf.png")
-plt.show()
-
-print("\n✅ RAGAS 평가 완료 및 결과 저장 완료!")
-print(f"📂 평가 결과 파일: {output_file}")
-print("📊 시각화된 평가 결과: ragas_evaluation_chart_hf.png")
+
+# 📌 저장소 루트 모듈(lexical_index.py)과 벤치마크 공용 함수(gold 라벨 파싱)를 import 할 수 있도록 경로 추가
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, "benchmarks")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from bench_utils import normalize_space, load_gold
+
+# main.py format_retrieved_context 가 검색 문서를 이어 붙일 때 쓰는 구분자
+CONTEXT_SEPARATOR = "\n\n---\n\n"
+SCORE_CACHE_FILE = "rag_evaluation_score_cache.json"
+
+
+# ----------------------------------------------------------------------
+# 기존 방식: RAGAS + Hugging Face 원격 모델
+# ----------------------------------------------------------------------
+def run_remote_evaluation(df):
+    from ragas import evaluate
+    from ragas.metrics import faithfulness, answer_relevancy, context_precision
+    from langchain_huggingface import HuggingFaceEndpoint
+    from huggingface_hub import HfApi
+
+    # ✅ Hugging Face API Key 설정
+    os.environ["HUGGINGFACEHUB_API_TOKEN"] = "your-huggingface-api-key"
+
+    # ✅ Hugging Face 인증 테스트
+    api = HfApi()
+    try:
+        user_info = api.whoami()
+        print("✅ Hugging Face 인증 성공:", user_info)
+    except Exception as e:
+        print("❌ Hugging Face 인증 실패:", e)
+        print("💡 네트워크 없이 평가하려면 --mode local 을 사용하세요.")
+        exit(1)  # 인증 실패 시 프로그램 종료
+
+    # ✅ 공개 Hugging Face 모델 사용 (FLAN-T5-Large)
+    llm = HuggingFaceEndpoint(
+        repo_id="google/flan-t5-large",  # ✅ 공개 모델로 변경
+        task="text2text-generation",
+        temperature=0.7,
+        max_new_tokens=512
+    )
+
+    # ✅ Hugging Face 모델로 평가 수행
+    return evaluate(
+        df,
+        metrics=[
+            answer_relevancy,
+            context_precision,
+            faithfulness
+        ],
+        llm=llm
+    )
+
+
+# ----------------------------------------------------------------------
+# 검색 지표 (gold 라벨 기준, numpy 벡터 연산)
+# ----------------------------------------------------------------------
+def row_chunks(df):
+    """
+    행별 검색 청크 리스트
+
+    collect_responses.py 가 기록한 retrieved_chunks(청크 전문, JSON 리스트)를 쓰고,
+    이 값이 없는 행(이전 CSV)만 retrieved_context(청크당 500자, 전체 2000자로 잘린 요약)를 구분자로 나눠 씁니다.
+    """
+    recorded = df["retrieved_chunks"] if "retrieved_chunks" in df.columns else [None] * len(df)
+    rows = []
+    for chunks, context in zip(recorded, df["retrieved_context"]):
+        chunks = json.loads(chunks) if isinstance(chunks, str) else None
+        rows.append(chunks if chunks else str(context).split(CONTEXT_SEPARATOR))
+    return rows
+
+
+def retrieval_metrics(df, gold, k):
+    """
+    행별 recall@k / MRR / context precision (gold 라벨이 없는 행은 NaN)
+
+    relevant[i, j]: i번째 질문의 j번째 검색 청크가 정답 문장을 포함하는지
+    found[i, p]: i번째 질문의 p번째 정답 문장이 상위 k개 청크 중 하나에 포함되는지
+    """
+    rows = len(df)
+    relevant = np.zeros((rows, k), dtype=bool)
+    max_passages = max((len(passages) for passages in gold.values()), default=0)
+    found = np.zeros((rows, max(max_passages, 1)), dtype=bool)
+    passage_mask = np.zeros_like(found)
+    labelled = np.zeros(rows, dtype=bool)
+
+    for i, (category, question, retrieved) in enumerate(zip(df["category"], df["question"], row_chunks(df))):
+        passages = gold.get((category, question))
+        if not passages:
+            continue
+        labelled[i] = True
+        chunks = [normalize_space(chunk) for chunk in retrieved][:k]
+        for j, chunk in enumerate(chunks):
+            relevant[i, j] = any(passage in chunk for passage in passages)
+        for p, passage in enumerate(passages):
+            passage_mask[i, p] = True
+            found[i, p] = any(passage in chunk for chunk in chunks)
+
+    ranks = np.arange(1, k + 1)
+    recall = found.sum(axis=1) / np.maximum(passage_mask.sum(axis=1), 1)
+    first = np.where(relevant.any(axis=1), relevant.argmax(axis=1) + 1, np.inf)
+    mrr = 1.0 / first
+    # RAGAS 와 같은 정의: 관련 청크 위치마다 precision@rank 를 구해 평균
+    precision_at_rank = np.cumsum(relevant, axis=1) / ranks
+    context_precision = (precision_at_rank * relevant).sum(axis=1) / np.maximum(relevant.sum(axis=1), 1)
+
+    return pd.DataFrame({
+        f"recall@{k}": np.where(labelled, recall, np.nan),
+        "mrr": np.where(labelled, mrr, np.nan),
+        "context_precision": np.where(labelled, context_precision, np.nan)
+    }, index=df.index)
+
+
+# ----------------------------------------------------------------------
+# 답변 지표 (로컬 judge)
+# ----------------------------------------------------------------------
+def split_sentences(text):
+    sentences = [s.strip() for s in str(text).replace("\n", ". ").split(". ")]
+    return [s for s in sentences if len(s) > 5]
+
+
+class LexicalJudge:
+    """
+    모델 없는 judge: 글자 2-gram 겹침 비율
+
+    - answer_relevancy: 질문 토큰 중 답변에 나오는 비율
+    - faithfulness: 답변 문장 중 토큰 절반 이상이 검색 문서에 나오는 문장 비율
+    """
+    name = "lexical"
+
+    def __init__(self, threshold=0.5):
+        from lexical_index import tokenize
+        self.tokenize = tokenize
+        self.threshold = threshold
+
+    def coverage(self, text, reference_tokens):
+        tokens = self.tokenize(text)
+        if not tokens:
+            return 0.0
+        return sum(1 for token in tokens if token in reference_tokens) / len(tokens)
+
+    def score(self, question, answer, context):
+        answer_tokens = set(self.tokenize(answer))
+        context_tokens = set(self.tokenize(context))
+        sentences = split_sentences(answer)
+        supported = [self.coverage(sentence, context_tokens) >= self.threshold for sentence in sentences]
+        return {
+            "answer_relevancy": self.coverage(question, answer_tokens),
+            "faithfulness": sum(supported) / len(supported) if supported else 0.0
+        }
+
+
+class CrossEncoderJudge:
+    """
+    로컬 CrossEncoder judge (예: 다국어 reranker 모델)
+
+    - answer_relevancy: (질문, 답변) 점수
+    - faithfulness: 답변 문장마다 가장 잘 맞는 검색 청크와의 점수 평균
+    점수는 CrossEncoder.predict 의 출력을 그대로 씁니다. (출력이 하나인 모델은 sentence-transformers 가 이미 sigmoid 를 적용한 0~1 값)
+    """
+
+    def __init__(self, model_name):
+        from sentence_transformers import CrossEncoder
+        self.name = f"cross-encoder:{model_name}"
+        self.model = CrossEncoder(model_name)
+
+    def predict(self, pairs):
+        return np.asarray(self.model.predict(pairs, show_progress_bar=False), dtype=np.float32)
+
+    def score(self, question, answer, context):
+        relevancy = float(self.predict([(question, answer)])[0])
+        sentences = split_sentences(answer)
+        chunks = [chunk for chunk in str(context).split(CONTEXT_SEPARATOR) if chunk.strip()]
+        if not sentences or not chunks:
+            return {"answer_relevancy": relevancy, "faithfulness": 0.0}
+        scores = self.predict([(chunk, sentence) for sentence in sentences for chunk in chunks])
+        faithfulness = float(scores.reshape(len(sentences), len(chunks)).max(axis=1).mean())
+        return {"answer_relevancy": relevancy, "faithfulness": faithfulness}
+
+
+def create_judge(spec):
+    """"lexical" 또는 "cross-encoder:<모델>" → judge 객체"""
+    kind, _, model_name = spec.partition(":")
+    if kind == "lexical":
+        return LexicalJudge()
+    if kind == "cross-encoder" and model_name:
+        return CrossEncoderJudge(model_name)
+    raise ValueError(f"지원하지 않는 judge: {spec}")
+
+
+# ----------------------------------------------------------------------
+# 점수 캐시 (질문/답변/문서가 바뀐 행만 다시 계산)
+# ----------------------------------------------------------------------
+def score_key(judge_name, question, answer, context):
+    payload = json.dumps([judge_name, question, answer, context], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_score_cache(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_score_cache(path, cache):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def answer_metrics(df, judge, cache, workers):
+    """행별 답변 지표 (캐시에 없는 행만 병렬로 계산, 문서는 잘린 요약이 아닌 검색 청크 전문)"""
+    rows = [
+        (str(question), str(answer), CONTEXT_SEPARATOR.join(chunks))
+        for question, answer, chunks in zip(df["question"], df["generated_answer"], row_chunks(df))
+    ]
+    keys = [score_key(judge.name, *row) for row in rows]
+    todo = {key: row for key, row in zip(keys, rows) if key not in cache}
+    print(f"🔹 답변 지표: {len(rows)}개 중 캐시 {len(rows) - len(todo)}개, 새로 계산 {len(todo)}개")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for key, scores in zip(todo, executor.map(lambda row: judge.score(*row), todo.values())):
+            cache[key] = scores
+
+    return pd.DataFrame([cache[key] for key in keys], index=df.index)
+
+
+def run_local_evaluation(df, gold_path, judge_spec, k, workers, cache_path):
+    gold = load_gold(gold_path)
+    if not gold:
+        print("💡 gold 라벨이 없어 검색 지표(recall/MRR/context precision)는 계산하지 않습니다.")
+
+    judge = create_judge(judge_spec)
+    cache = load_score_cache(cache_path)
+    scores = pd.concat([retrieval_metrics(df, gold, k), answer_metrics(df, judge, cache, workers)], axis=1)
+    save_score_cache(cache_path, cache)
+
+    per_row = pd.concat([df[["category", "question"]], scores], axis=1)
+    per_row.to_csv("ragas_evaluation_rows_local.csv", index=False, encoding="utf-8")
+    print("📂 행별 점수 파일: ragas_evaluation_rows_local.csv")
+    return scores.mean(numeric_only=True).dropna().round(4).to_frame().T
+
+
+def plot_results(results, title, chart_file):
+    # ✅ 시각화: 평가 지표별 성능 비교
+    plt.figure(figsize=(10, 6))
+    plt.bar(results.columns, results.iloc[0], color=['blue', 'green', 'orange', 'red', 'purple', 'gray'][:len(results.columns)])
+    plt.xlabel("RAGAS Metrics")
+    plt.ylabel("Score")
+    plt.ylim(0, 1)
+    plt.title(title)
+
+    # ✅ 그래프 저장 및 출력
+    plt.savefig(chart_file)
+    plt.show()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RAG 응답 평가")
+    parser.add_argument("--mode", choices=("remote", "local"), default="remote")
+    parser.add_argument("--input", default="rag_evaluation_data.csv")
+    parser.add_argument("--gold", help="gold 라벨 JSON (local 모드 검색 지표용)")
+    parser.add_argument("--judge", default="lexical", help='local 모드 judge: "lexical" 또는 "cross-encoder:<모델>"')
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--score-cache", default=SCORE_CACHE_FILE)
+    args = parser.parse_args()
+
+    # ✅ 평가 데이터 불러오기
+    df = pd.read_csv(args.input)
+
+    if args.mode == "local":
+        results = run_local_evaluation(df, args.gold, args.judge, args.k, args.workers, args.score_cache)
+        output_file = "ragas_evaluation_results_local.csv"
+        chart_file = "ragas_evaluation_chart_local.png"
+        title = f"RAG Evaluation Results (Local, judge={args.judge})"
+    else:
+        results = run_remote_evaluation(df)
+        output_file = "ragas_evaluation_results_hf.csv"
+        chart_file = "ragas_evaluation_chart_hf.png"
+        title = "RAGAS Evaluation Results (Using Hugging Face Model)"
+
+    # ✅ 평가 결과 저장
+    results.to_csv(output_file, index=False)
+    plot_results(results, title, chart_file)
+
+    print("\n✅ RAGAS 평가 완료 및 결과 저장 완료!")
+    print(f"📂 평가 결과 파일: {output_file}")
+    print(f"📊 시각화된 평가 결과: {chart_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# 📌 CPU 에서 돌릴 수 있는 작은 다국어 cross-encoder (한국어 포함, 약 1.2억 파라미터)
+DEFAULT_RERANK_MODEL = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+
+
+class CrossEncoderReranker:
+    """
+    (질문, 청크) 쌍을 cross-encoder 로 다시 채점해 관련 있는 청크만 남기는 2단계 검색의 두 번째 단계
+
+    - 1단계(벡터/BM25)는 후보를 넓게 가져오고, 여기서 점수 순으로 다시 정렬
+    - 점수(출력이 하나인 cross-encoder 는 sigmoid 가 적용된 0~1 값)가 min_score 이상인 청크만 남기되 최소 min_k, 최대 max_k 개
+    - 여러 질문의 쌍을 한 번의 predict 로 묶어 batch_size 단위로 채점
+    모델은 처음 사용할 때(또는 load()) 로드합니다. (sentence-transformers 필요)
+    """
+
+    def __init__(self, model_name=DEFAULT_RERANK_MODEL, min_score=0.3, min_k=1, max_k=5, batch_size=32, max_length=512):
+        self.model_name = model_name
+        self.min_score = min_score
+        self.min_k = min_k
+        self.max_k = max_k
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._model = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import CrossEncoder
+
+                logger.info(f"📦 리랭커 모델 로드: {self.model_name}")
+                self._model = CrossEncoder(self.model_name, max_length=self.max_length, device="cpu")
+        return self._model
+
+    def score_batch(self, questions, candidate_lists):
+        """질문별 후보 문서 → 질문별 점수 리스트 (모든 쌍을 한 번에 채점)"""
+        pairs = [
+            (question, doc.page_content)
+            for question, docs in zip(questions, candidate_lists)
+            for doc in docs
+        ]
+        if not pairs:
+            return [[] for _ in questions]
+        flat = self.load().predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+        scores, offset = [], 0
+        for docs in candidate_lists:
+            scores.append([float(score) for score in flat[offset:offset + len(docs)]])
+            offset += len(docs)
+        return scores
+
+    def cut(self, docs, scores):
+        """점수 순 정렬 후 적응형 절단 → [(문서, 점수)]"""
+        ranked = sorted(zip(docs, scores), key=lambda pair: pair[1], reverse=True)[:self.max_k]
+        kept = [pair for pair in ranked if pair[1] >= self.min_score]
+        return kept if len(kept) >= self.min_k else ranked[:self.min_k]
+
+    def rerank_batch(self, questions, candidate_lists):
+        """여러 질문의 후보를 한 번에 다시 채점 → 질문별 [(문서, 점수)]"""
+        return [
+            self.cut(docs, scores)
+            for docs, scores in zip(candidate_lists, self.score_batch(questions, candidate_lists))
+        ]
+
+    def rerank(self, question, docs):
+        return self.rerank_batch([question], [docs])[0]
+
+    @property
+    def config(self):
+        return {
+            "model_name": self.model_name,
+            "min_score": self.min_score,
+            "min_k": self.min_k,
+            "max_k": self.max_k,
+            "batch_size": self.batch_size,
+        }
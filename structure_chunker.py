@@ -0,0 +1,156 @@
+import re
+
+from context_packer import count_tokens, truncate_to_tokens
+
+# 📌 data/*.txt 의 질문(섹션) 제목 형식
+# - "### 1. 질문" / "### 질문" (줄 중간에 이어 붙은 경우도 있음, "####" 는 섹션 안의 소제목)
+# - "**1. 질문**" 으로 시작하는 줄
+# - "1. 질문" 으로 시작하는 줄 (위 두 형식이 없는 문서에서만)
+# 번호가 있는 제목은 본문 속 번호 목록과 구분하기 위해 앞 제목 번호 + 1 인 것만 사용
+HASH_HEADING = re.compile(r"(?<!#)###(?!#)\s*(?:(\d+)\.)?")
+BOLD_HEADING = re.compile(r"^\*\*\s*(\d+)\.\s", re.M)
+PLAIN_HEADING = re.compile(r"^(\d+)\.\s+\S", re.M)
+TITLE_END = re.compile(r"\n|\s{2,}")
+
+# 섹션 안의 항목 시작 줄 ("1) 햇살론", "2. **부모님 피부양자로 등록하기**", "**3) 서류 제출 및 면접**")
+ITEM_START = re.compile(r"^\s*(?:\*\*\s*)?\d+[.)]\s|^\s*\*\*[^*\n]+\*\*\s*$|^\s*#{4,}")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def numbered_starts(matches, always=()):
+    """
+    (위치, 번호 또는 None) 목록 → 섹션 시작 위치
+
+    always 에 있는 위치(번호 없는 "###" 제목 등)는 항상 사용하고,
+    번호가 있는 제목은 앞 제목 번호 + 1 일 때만 사용합니다.
+    """
+    starts, last = [], 0
+    for start, number in sorted(matches):
+        if number is None or start in always:
+            starts.append(start)
+            last = number or last
+        elif number == last + 1:
+            starts.append(start)
+            last = number
+    return starts
+
+
+def heading_starts(text):
+    """섹션 제목이 시작하는 위치 목록"""
+    hashes = [(m.start(), int(m.group(1)) if m.group(1) else None) for m in HASH_HEADING.finditer(text)]
+    bolds = [(m.start(), int(m.group(1))) for m in BOLD_HEADING.finditer(text)]
+    if hashes or bolds:
+        return numbered_starts(hashes + bolds, always={start for start, _ in hashes})
+    return numbered_starts([(m.start(), int(m.group(1))) for m in PLAIN_HEADING.finditer(text)])
+
+
+def split_heading(section):
+    """섹션 텍스트 → (제목, 본문)"""
+    section = section.strip()
+    if section.startswith("###"):
+        section = section[3:].lstrip()
+    if section.startswith("**") and section.find("**", 2) != -1:
+        close = section.find("**", 2)
+        return section[2:close].strip(), section[close + 2:].strip()
+    match = TITLE_END.search(section)
+    if match is None:
+        return section, ""
+    return section[:match.start()].strip(), section[match.end():].strip()
+
+
+def split_sections(text):
+    """문서 → [(제목, 본문)] (첫 제목 앞의 글은 제목 없는 섹션)"""
+    text = text.replace("\ufeff", "")
+    starts = heading_starts(text)
+    sections = []
+    preamble = text[:starts[0]] if starts else text
+    if preamble.strip():
+        sections.append(("", preamble.strip()))
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        title, body = split_heading(text[start:end])
+        if title or body:
+            sections.append((title, body))
+    return sections
+
+
+def split_units(body):
+    """섹션 본문 → 항목/문단 단위 (번호 항목, 굵은 소제목, 빈 줄에서 나눔)"""
+    units, current = [], []
+    for line in body.splitlines():
+        if not line.strip():
+            if current:
+                units.append("\n".join(current))
+                current = []
+            continue
+        if current and ITEM_START.match(line):
+            units.append("\n".join(current))
+            current = []
+        current.append(line.rstrip())
+    if current:
+        units.append("\n".join(current))
+    return units
+
+
+class StructureChunker:
+    """
+    data/*.txt 구조(질문 제목, 번호 항목, 문단)를 따라 나누는 한국어 청크 분할기
+
+    - 질문 섹션 하나가 max_tokens 이내면 그대로 한 청크
+    - 길면 항목/문단 → 줄 → 문장 순으로 나눈 뒤 max_tokens 까지 채워 묶음
+    - 글자 단위 겹침 없이, 나뉜 청크마다 섹션 제목만 앞에 붙여 문맥을 유지
+    토큰 수는 context_packer.count_tokens (프롬프트 예산과 같은 기준) 로 셉니다.
+    """
+
+    def __init__(self, max_tokens=400):
+        self.max_tokens = max_tokens
+
+    @property
+    def config(self):
+        return {"type": "structure", "max_tokens": self.max_tokens}
+
+    def _pieces(self, unit, budget):
+        """예산보다 긴 항목을 (조각, 이어 붙일 구분자) 로 나눔: 줄 → 문장 → 토큰 단위로 자르기"""
+        if count_tokens(unit) <= budget:
+            return [(unit, "\n")]
+        pieces = []
+        for line in unit.splitlines():
+            if count_tokens(line) <= budget:
+                pieces.append((line, "\n"))
+                continue
+            for position, sentence in enumerate(SENTENCE_END.split(line)):
+                separator = "\n" if position == 0 else " "
+                while count_tokens(sentence) > budget:
+                    head = truncate_to_tokens(sentence, budget) or sentence[:budget]
+                    pieces.append((head, separator))
+                    sentence, separator = sentence[len(head):].lstrip(), " "
+                if sentence:
+                    pieces.append((sentence, separator))
+        return pieces
+
+    def _pack(self, title, units):
+        prefix = f"{title}\n" if title else ""
+        budget = max(1, self.max_tokens - count_tokens(prefix))
+        chunks, current, current_tokens = [], "", 0
+        for unit in units:
+            for piece, separator in self._pieces(unit, budget):
+                tokens = count_tokens(piece) + 1
+                if current and current_tokens + tokens > budget:
+                    chunks.append(prefix + current)
+                    current, current_tokens = "", 0
+                current = f"{current}{separator}{piece}" if current else piece
+                current_tokens += tokens
+        if current:
+            chunks.append(prefix + current)
+        return chunks
+
+    def split_chunks(self, text):
+        """문서 → [(청크, 섹션 metadata)]"""
+        chunks = []
+        for section_index, (title, body) in enumerate(split_sections(text)):
+            parts = self._pack(title, split_units(body)) if body else [title]
+            for part, chunk in enumerate(parts):
+                chunks.append((chunk, {"section": title, "section_index": section_index, "part": part}))
+        return chunks
+
+    def split_text(self, text):
+        return [chunk for chunk, _ in self.split_chunks(text)]
@@ -0,0 +1,81 @@
+import sys
+import subprocess
+
+import pytest
+
+from vector_registry import VectorDBRegistry
+
+# 📌 VectorDB.py 로 인덱스를 다시 만드는 상황을 흉내 내는 별도 프로세스 (같은 프로세스면 chromadb System 을 공유함)
+WRITE_CHROMA = """
+import sys, shutil, chromadb
+path, text = sys.argv[1], sys.argv[2]
+shutil.rmtree(path, ignore_errors=True)
+collection = chromadb.PersistentClient(path=path).get_or_create_collection("langchain")
+collection.add(ids=[text], documents=[text], embeddings=[[1.0, 0.0, 0.0]])
+"""
+
+
+def write_chroma(path, text):
+    subprocess.run([sys.executable, "-c", WRITE_CHROMA, str(path), text], check=True)
+
+
+def make_categories(base_dir, *names):
+    for name in names:
+        (base_dir / name).mkdir()
+        (base_dir / name / "segment.bin").write_bytes(b"x" * 1024 * 1024)
+
+
+def test_evict_reload_and_lru_close_stores(tmp_path):
+    make_categories(tmp_path, "a", "b")
+    closed = []
+    registry = VectorDBRegistry(
+        str(tmp_path), loader=lambda category, path: object(), max_resident_mb=1.5,
+        closer=lambda category, store: closed.append(category)
+    )
+
+    registry.get("a")
+    registry.get("b")  # 상한(1.5MB)을 넘어 a 가 LRU 로 해제
+    assert closed == ["a"]
+
+    registry.reload("b")
+    assert closed == ["a", "b"]
+
+    assert registry.evict("b")
+    assert not registry.evict("b")
+    assert closed == ["a", "b", "b"]
+
+
+def test_store_in_use_is_closed_after_last_user_releases_it(tmp_path):
+    make_categories(tmp_path, "a", "b")
+    closed = []
+    registry = VectorDBRegistry(
+        str(tmp_path), loader=lambda category, path: object(), max_resident_mb=1.5,
+        closer=lambda category, store: closed.append(category)
+    )
+
+    with registry.use("a") as store:
+        with registry.use("a") as same:
+            assert same is store
+            registry.get("b")  # a 가 LRU 로 해제되지만 사용 중이라 닫지 않음
+            assert closed == []
+        assert closed == []
+    assert closed == ["a"]
+    assert registry.stats()["retired_in_use"] == 0
+
+
+def test_reload_reads_index_rebuilt_by_another_process(tmp_path):
+    pytest.importorskip("chromadb")
+    pytest.importorskip("langchain_chroma")
+    from vector_registry import open_chroma_store, close_chroma_store
+
+    path = tmp_path / "welfare"
+    write_chroma(path, "old")
+    registry = VectorDBRegistry(
+        str(tmp_path), loader=lambda category, path: open_chroma_store(path, None),
+        closer=lambda category, store: close_chroma_store(store)
+    )
+    assert registry.get("welfare").get()["documents"] == ["old"]
+
+    write_chroma(path, "new")
+    assert registry.reload("welfare") == ["welfare"]
+    assert registry.get("welfare").get()["documents"] == ["new"]
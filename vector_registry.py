@@ -0,0 +1,242 @@
+import os
+import time
+import threading
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# 📌 단일 컬렉션 레이아웃에서 모든 카테고리를 담는 디렉토리 (category 는 metadata 로 구분)
+SINGLE_COLLECTION_DIR = "_all"
+
+
+def directory_size(path):
+    """디렉토리 내 파일 크기 합계 (bytes)"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+def open_chroma_store(path, embedding_function):
+    """경로 전용 chromadb PersistentClient 로 Chroma 벡터DB 열기 (close_chroma_store 로 닫을 수 있도록)"""
+    import chromadb
+    from langchain_chroma import Chroma
+
+    return Chroma(client=chromadb.PersistentClient(path=path), embedding_function=embedding_function)
+
+
+def close_chroma_store(store):
+    """
+    Chroma 벡터DB 의 chromadb System 정지
+
+    chromadb 는 경로별 System(HNSW 세그먼트 포함)을 프로세스 전역 캐시에 보관하므로
+    래퍼만 버리면 메모리도 해제되지 않고, 같은 경로를 다시 열어도 디스크의 새 인덱스 대신 이전 세그먼트를 읽습니다.
+    """
+    client = store._client
+    if hasattr(client, "close"):
+        client.close()
+        return
+    # 📌 close() 가 없는 이전 chromadb 버전은 캐시에서 직접 제거
+    from chromadb.api.shared_system_client import SharedSystemClient
+
+    system = SharedSystemClient._identifier_to_system.pop(client._identifier, None)
+    if system is not None:
+        system.stop()
+
+
+class VectorDBRegistry:
+    """
+    카테고리별 벡터DB를 프로세스 단위로 한 번만 열어두고 재사용하는 레지스트리
+
+    - loader(category, path) 로 벡터DB 객체를 생성 (예: Chroma)
+    - closer(category, store) 가 있으면 해제(evict, reload, LRU)할 때 호출해 리소스를 정리
+      use() 로 사용 중인 벡터DB 는 해제돼도 마지막 사용자가 반납할 때까지 닫지 않음 (검색 도중 닫히지 않도록)
+    - max_resident_mb 를 넘으면 가장 오래 사용하지 않은 카테고리부터 해제 (LRU)
+    - 카테고리별 로드 시간과 상주 크기(디스크 세그먼트 크기 기준 추정치)를 기록
+    """
+
+    def __init__(self, base_dir, loader, max_resident_mb=None, closer=None):
+        self.base_dir = base_dir
+        self.loader = loader
+        self.closer = closer
+        self.max_resident_bytes = int(max_resident_mb * 1024 * 1024) if max_resident_mb else None
+        self._stores = OrderedDict()  # category -> 벡터DB 객체 (LRU 순서)
+        self._stats = {}  # category -> 로드 통계
+        self._lock = threading.Lock()
+        self._category_locks = {}
+        self._users = {}  # id(벡터DB) -> use() 로 사용 중인 수
+        self._retired = {}  # id(벡터DB) -> (category, 벡터DB) 해제됐지만 아직 사용 중이라 닫지 않은 것
+
+    def categories(self):
+        """base_dir 아래에 존재하는 카테고리 목록 (_ 로 시작하는 디렉토리 제외)"""
+        if not os.path.isdir(self.base_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.base_dir)
+            if os.path.isdir(os.path.join(self.base_dir, name)) and not name.startswith("_")
+        )
+
+    def _category_lock(self, category):
+        with self._lock:
+            return self._category_locks.setdefault(category, threading.Lock())
+
+    def get(self, category):
+        """카테고리 벡터DB 반환 (없으면 None, 처음 사용 시 로드, 사용 중 고정하려면 use())"""
+        return self._get(category, pin=False)
+
+    @contextmanager
+    def use(self, category):
+        """with 블록 동안 카테고리 벡터DB 를 고정해서 사용 (없으면 None, 블록 안에서는 해제돼도 닫히지 않음)"""
+        store = self._get(category, pin=True)
+        try:
+            yield store
+        finally:
+            if store is not None:
+                self._unpin(store)
+
+    def _get(self, category, pin):
+        category = category.strip()
+        with self._lock:
+            store = self._hit(category, pin)
+            if store is not None:
+                return store
+
+        # 같은 카테고리를 동시에 두 번 로드하지 않도록 카테고리별 잠금
+        with self._category_lock(category):
+            with self._lock:
+                store = self._hit(category, pin)
+                if store is not None:
+                    return store
+            return self._load(category, pin)
+
+    def _hit(self, category, pin):
+        """상주 중인 벡터DB (잠금 안에서 호출, pin 이면 같은 잠금 안에서 고정해 해제와 경쟁하지 않음)"""
+        store = self._stores.get(category)
+        if store is not None:
+            self._stores.move_to_end(category)
+            self._stats[category]["hits"] += 1
+            if pin:
+                self._users[id(store)] = self._users.get(id(store), 0) + 1
+        return store
+
+    def _unpin(self, store):
+        with self._lock:
+            key = id(store)
+            self._users[key] -= 1
+            if self._users[key] > 0:
+                return
+            del self._users[key]
+            retired = self._retired.pop(key, None)
+        if retired is not None:
+            self._close(*retired)
+
+    def _release(self, category, store):
+        """해제된 벡터DB 닫기 (사용 중이면 마지막 사용자가 반납할 때 닫음)"""
+        with self._lock:
+            if self._users.get(id(store)):
+                self._retired[id(store)] = (category, store)
+                return
+        self._close(category, store)
+
+    def _load(self, category, pin=False):
+        category_path = os.path.join(self.base_dir, category)
+        if not os.path.isdir(category_path):
+            logger.warning(f"❌ 벡터DB 없음: {category}")
+            return None
+
+        started = time.perf_counter()
+        store = self.loader(category, category_path)
+        load_seconds = time.perf_counter() - started
+        resident_bytes = directory_size(category_path)
+
+        with self._lock:
+            stats = self._stats.setdefault(category, {"loads": 0, "hits": 0, "evictions": 0})
+            stats.update({
+                "load_seconds": round(load_seconds, 4),
+                "resident_bytes": resident_bytes,
+                "loaded_at": time.time(),
+            })
+            stats["loads"] += 1
+            self._stores[category] = store
+            self._stores.move_to_end(category)
+            if pin:
+                self._users[id(store)] = self._users.get(id(store), 0) + 1
+            victims = self._evict_over_cap(keep=category)
+
+        for victim, victim_store in victims:
+            self._release(victim, victim_store)
+        logger.info(f"✅ 벡터DB 로드 성공: {category} ({load_seconds:.2f}s, {resident_bytes / 1024 / 1024:.1f}MB)")
+        return store
+
+    def _evict_over_cap(self, keep):
+        """메모리 상한을 넘으면 LRU 순서로 해제 (잠금 안에서 호출) → [(카테고리, 벡터DB)] (잠금 밖에서 닫기 위함)"""
+        victims = []
+        if self.max_resident_bytes is None:
+            return victims
+        while self._resident_bytes() > self.max_resident_bytes:
+            victim = next((name for name in self._stores if name != keep), None)
+            if victim is None:
+                break
+            victims.append((victim, self._stores.pop(victim)))
+            self._stats[victim]["evictions"] += 1
+            logger.info(f"♻️ 벡터DB 해제 (LRU): {victim}")
+        return victims
+
+    def _close(self, category, store):
+        if self.closer is None:
+            return
+        try:
+            self.closer(category, store)
+        except Exception as e:
+            logger.error(f"❌ 벡터DB 닫기 실패: {category} - {str(e)}")
+
+    def _resident_bytes(self):
+        return sum(self._stats[name]["resident_bytes"] for name in self._stores)
+
+    def preload(self):
+        """모든 카테고리를 미리 로드 (로드에 실패한 카테고리는 건너뜀)"""
+        for category in self.categories():
+            try:
+                self.get(category)
+            except Exception as e:
+                logger.error(f"❌ 벡터DB 로드 실패: {category} - {str(e)}")
+
+    def evict(self, category):
+        category = category.strip()
+        with self._lock:
+            store = self._stores.pop(category, None)
+        if store is None:
+            return False
+        self._release(category, store)
+        return True
+
+    def reload(self, category=None):
+        """카테고리(없으면 전체) 벡터DB를 다시 로드"""
+        if category:
+            targets = [category.strip()]
+        else:
+            with self._lock:
+                targets = list(dict.fromkeys(self.categories() + list(self._stores)))
+        reloaded = []
+        for name in targets:
+            with self._category_lock(name):
+                self.evict(name)
+                if self._load(name) is not None:
+                    reloaded.append(name)
+        return reloaded
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_resident_bytes": self.max_resident_bytes,
+                "resident_bytes": self._resident_bytes(),
+                "resident_categories": list(self._stores),
+                "retired_in_use": len(self._retired),
+                "categories": {name: dict(stats, resident=name in self._stores) for name, stats in self._stats.items()},
+            }
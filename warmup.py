@@ -0,0 +1,108 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTracker:
+    """
+    서버 시작 단계별 소요 시간과 준비 상태 기록
+
+    - 포트를 열기 전 단계(import, 라우트 연결 등)와 백그라운드 워밍업 단계를 같은 표로 기록
+    - 워밍업 단계는 run_phase 로 하나씩 실행 (한 단계가 실패해도 다음 단계는 계속 실행, 오류는 errors 에 기록)
+    - 준비 조건: 워밍업이 한 번 끝났고 필수(required) 단계가 모두 성공
+      선택 단계가 실패하면 ready 이되 degraded (해당 리소스는 첫 요청 때 다시 로드 시도)
+    /healthz 는 프로세스 생존만, /readyz 는 snapshot() 의 ready 로 판단합니다.
+    """
+
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.phases = {}  # 단계 이름 → 초 (기록 순서 유지)
+        self.errors = {}  # 실패한 단계 이름 → 오류 메시지
+        self.required = set()  # 실패하면 ready 가 될 수 없는 단계
+        self.ready = False
+        self.ready_seconds = None
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.phases[name] = round(seconds, 3)
+
+    @contextmanager
+    def phase(self, name, required=True):
+        """with 블록 시간을 단계로 기록 (예외는 errors 에 남기고 다시 발생, 포트를 열기 전 단계용)"""
+        started = time.perf_counter()
+        with self._lock:
+            if required:
+                self.required.add(name)
+        try:
+            yield
+        except Exception as e:
+            with self._lock:
+                self.errors[name] = str(e)
+            raise
+        else:
+            with self._lock:
+                self.errors.pop(name, None)
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def run_phase(self, name, func, required=False):
+        """func() 를 단계로 실행 → 성공 여부 (예외는 기록만 하고 다음 단계가 계속 실행되도록 삼킴)"""
+        try:
+            with self.phase(name, required=required):
+                func()
+            return True
+        except Exception as e:
+            logger.error(f"❌ 워밍업 단계 실패 ({name}): {str(e)}")
+            return False
+
+    def mark_ready(self):
+        with self._lock:
+            failed_required = self.required & set(self.errors)
+            self.ready = not failed_required
+            self.ready_seconds = round(time.perf_counter() - self.started, 3)
+            degraded = set(self.errors) - failed_required
+        phases = ", ".join(f"{name}={seconds}s" for name, seconds in self.phases.items())
+        if not self.ready:
+            logger.error(f"❌ 필수 워밍업 단계 실패 ({', '.join(sorted(failed_required))}): {phases}")
+        elif degraded:
+            logger.warning(f"⚠️ 서버 준비 완료, 일부 단계 실패 ({', '.join(sorted(degraded))}, 첫 요청 때 다시 로드): {phases}")
+        else:
+            logger.info(f"✅ 서버 준비 완료 ({self.ready_seconds}s): {phases}")
+
+    def run_in_background(self, warm_up, retry_seconds=30):
+        """
+        warm_up() 을 데몬 스레드에서 실행하고 끝나면 준비 상태 갱신
+
+        필수 단계가 실패해 준비되지 않으면 retry_seconds 뒤에 warm_up() 을 다시 실행 (0 이면 재시도 안 함)
+        """
+        def run():
+            while True:
+                try:
+                    warm_up()
+                except Exception as e:
+                    logger.error(f"❌ 워밍업 중 오류 발생: {str(e)}")
+                self.mark_ready()
+                if self.ready or not retry_seconds:
+                    return
+                logger.info(f"🔁 {retry_seconds}초 뒤 워밍업 재시도")
+                time.sleep(retry_seconds)
+
+        thread = threading.Thread(target=run, name="warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "degraded": bool(set(self.errors) - self.required),
+                "error": "; ".join(f"{name}: {message}" for name, message in self.errors.items()) or None,
+                "errors": dict(self.errors),
+                "uptime_seconds": round(time.perf_counter() - self.started, 3),
+                "ready_seconds": self.ready_seconds,
+                "phases": dict(self.phases),
+            }